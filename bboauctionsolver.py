@@ -0,0 +1,191 @@
+import sys
+import bboscore
+
+# An exact double dummy par for the rest of an auction, by minimax over every legal call
+# (bids, doubles, redoubles and passes) with alpha-beta pruning and a transposition table.
+# It is much slower than BiddingParCalc but makes no assumptions about how the bidding goes,
+# so it is the reference the faster one can be checked against.
+#
+# The final contract is scored from the declarer's DD tricks (DealInfo.getDDTricks) with bboscore,
+# N/S try to maximize the score and E/W to minimize it.  As in the auction, the declarer for a strain
+# is whichever player of the side first bid it.
+#
+# An auction position is kept as
+#   rank     the current contract, 5 * (level - 1) + strain index in CDHSN, or -1 if no bids yet
+#   bidSide  0 for N/S, 1 for E/W, the side that bid the current contract
+#   dblFlag  0, 1 doubled, 2 redoubled
+#   lastSeat index in NESW of the last player to bid, double or redouble (before any of those,
+#            the player before the dealer)
+#   passes   passes since then
+#   declCode the declarer's tricks for every strain and side already fixed, 4 bits per (side, strain).
+#            A (side, strain) where both partners take the same tricks is fixed from the start,
+#            since it doesn't matter which of them bids it first.  This keeps positions that only
+#            differ in an irrelevant declarer the same in the transposition table.
+
+strains = bboscore.strains
+seats = 'NESW'
+numRanks = 35
+
+class AuctionSolver():
+    def __init__(self, bdnum, dealInfo):
+        self.bdnum = bdnum
+        self.dealInfo = dealInfo
+        vulIndex = dealInfo.getVulIndex()
+        self.tricks = [[dealInfo.getDDTricks(suit, seat) for suit in strains] for seat in seats]
+        # finalScores[side][rank][dblFlag][tricks], N/S score if that side plays the contract
+        self.finalScores = []
+        for side in range(2):
+            vul = bboscore.vulTable[vulIndex][seats[side]]
+            sign = 1 if side == 0 else -1
+            self.finalScores.append([[[sign * bboscore.scoreTable[vul][rank % 5][rank // 5 + 1][dblFlag][tricks]
+                                       for tricks in range(14)] for dblFlag in range(3)] for rank in range(numRanks)])
+        self.initialDeclCode = 0
+        for side in range(2):
+            for strain in range(5):
+                tricks = self.tricks[side][strain]
+                if tricks == self.tricks[side + 2][strain]:
+                    self.initialDeclCode |= (tricks + 1) << self.declShift(side, strain)
+        # position -> (lower, upper) bounds on its score
+        self.transTable = {}
+        self.numNodes = 0
+
+    @staticmethod
+    def declShift(side, strain):
+        return 4 * (5 * side + strain)
+
+    # the position after the bids in bidList (bids as from linToPbnBidList, eg. '1N', 'P', 'D', 'R')
+    def positionAfter(self, bidList):
+        rank = -1
+        bidSide = 0
+        dblFlag = 0
+        lastSeat = (self.dealInfo.getDealerIndex() + 3) % 4
+        passes = 0
+        declCode = self.initialDeclCode
+        seat = self.dealInfo.getDealerIndex()
+        for bid in bidList:
+            side = seat % 2
+            if bid == 'P':
+                passes += 1
+            else:
+                if bid == 'D':
+                    dblFlag = 1
+                elif bid == 'R':
+                    dblFlag = 2
+                else:
+                    (levstr, suit) = bid
+                    strain = strains.index(suit)
+                    rank = 5 * (int(levstr) - 1) + strain
+                    bidSide = side
+                    dblFlag = 0
+                    shift = self.declShift(side, strain)
+                    if (declCode >> shift) & 15 == 0:
+                        declCode |= (self.tricks[seat][strain] + 1) << shift
+                lastSeat = seat
+                passes = 0
+            seat = (seat + 1) % 4
+        return (rank, bidSide, dblFlag, lastSeat, passes, declCode)
+
+    def isFinished(self, position):
+        (rank, bidSide, dblFlag, lastSeat, passes, declCode) = position
+        return passes == 4 or (rank >= 0 and passes == 3)
+
+    # N/S score of the contract the auction ends in when the position is finished
+    def finishedScore(self, position):
+        (rank, bidSide, dblFlag, lastSeat, passes, declCode) = position
+        if rank < 0:
+            return 0
+        tricks = ((declCode >> self.declShift(bidSide, rank % 5)) & 15) - 1
+        return self.finalScores[bidSide][rank][dblFlag][tricks]
+
+    # the calls that can be made from a position, with the position each leads to
+    def nextPositions(self, position):
+        (rank, bidSide, dblFlag, lastSeat, passes, declCode) = position
+        seat = (lastSeat + passes + 1) % 4
+        side = seat % 2
+        yield ('P', (rank, bidSide, dblFlag, lastSeat, passes + 1, declCode))
+        if rank >= 0 and dblFlag == 0 and bidSide != side:
+            yield ('D', (rank, bidSide, 1, seat, 0, declCode))
+        if dblFlag == 1 and bidSide == side:
+            yield ('R', (rank, bidSide, 2, seat, 0, declCode))
+        for newRank in range(rank + 1, numRanks):
+            strain = newRank % 5
+            shift = self.declShift(side, strain)
+            newCode = declCode
+            if (declCode >> shift) & 15 == 0:
+                newCode |= (self.tricks[seat][strain] + 1) << shift
+            yield (f'{newRank // 5 + 1}{strains[strain]}', (newRank, side, 0, seat, 0, newCode))
+
+    # the score if the auction ended after a call, with a contract that goes down doubled, to try the best calls first
+    def guessScore(self, child):
+        (call, (rank, bidSide, dblFlag, lastSeat, passes, declCode)) = child
+        if rank < 0:
+            return 0
+        tricks = ((declCode >> self.declShift(bidSide, rank % 5)) & 15) - 1
+        if dblFlag == 0 and tricks < rank // 5 + 7:
+            dblFlag = 1
+        return self.finalScores[bidSide][rank][dblFlag][tricks]
+
+    # the minimax N/S score from a position, exact if it is strictly between alpha and beta,
+    # otherwise a bound on the wrong side of alpha or beta
+    def search(self, position, alpha, beta):
+        self.numNodes += 1
+        if self.isFinished(position):
+            return self.finishedScore(position)
+        (lower, upper) = self.transTable.get(position, (-sys.maxsize, sys.maxsize))
+        if lower >= beta:
+            return lower
+        if upper <= alpha:
+            return upper
+        if lower == upper:
+            return lower
+        (origAlpha, origBeta) = (alpha, beta) = (max(alpha, lower), min(beta, upper))
+        (rank, bidSide, dblFlag, lastSeat, passes, declCode) = position
+        maximizing = (lastSeat + passes + 1) % 2 == 0
+        best = -sys.maxsize if maximizing else sys.maxsize
+        children = sorted(self.nextPositions(position), key=self.guessScore, reverse=maximizing)
+        for (call, nextPosition) in children:
+            value = self.search(nextPosition, alpha, beta)
+            if maximizing:
+                if value > best:
+                    best = value
+                    alpha = max(alpha, value)
+            else:
+                if value < best:
+                    best = value
+                    beta = min(beta, value)
+            if alpha >= beta:
+                break
+        if best <= origAlpha:
+            upper = best
+        elif best >= origBeta:
+            lower = best
+        else:
+            lower = upper = best
+        self.transTable[position] = (lower, upper)
+        return best
+
+    # the exact par (N/S score) after the bids in bidList
+    def solve(self, bidList):
+        return self.search(self.positionAfter(bidList), -sys.maxsize, sys.maxsize)
+
+    # the par before any bids and after each bid, like the parScores of BiddingParCalc.calcParsForBidList.
+    # Positions seen for the earlier bids stay in the transposition table for the later ones.
+    def parScoresForBidList(self, bidList):
+        return [self.solve(bidList[:numBids]) for numBids in range(len(bidList) + 1)]
+
+    # one way the rest of the auction can go that gets the par, as a list of calls.
+    # Passing is tried first, then doubles and the highest bids, so the par contract
+    # tends to be bid straight away rather than worked up to.
+    def bestCalls(self, bidList):
+        position = self.positionAfter(bidList)
+        score = self.search(position, -sys.maxsize, sys.maxsize)
+        calls = []
+        while not self.isFinished(position):
+            children = list(self.nextPositions(position))
+            numOthers = len([child for child in children if child[0] in 'PDR'])
+            for (call, nextPosition) in children[:numOthers] + children[numOthers:][::-1]:
+                if self.search(nextPosition, score - 1, score + 1) == score:
+                    break
+            calls.append(call)
+            position = nextPosition
+        return calls
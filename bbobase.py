@@ -1,4 +1,3 @@
-from bs4 import BeautifulSoup
 import json
 import os
 import re
@@ -6,11 +5,25 @@ import time
 import argparse
 import tabulate
 from abc import ABC, abstractmethod
-import csv
+import collections
+import io
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 
 from pprint import pprint
 import sys
 from bborobotfix import BboRobotFixer
+from bbotravextract import TravTableExtractor
+from bbotravcache import TravCache
+from bbocsvsections import CsvSectionReader
+from bbolin import parseLin
+from bbowatch import BboWatcher
+
+# BeautifulSoup is only needed for the bs4 html parser backend
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
 
 
 class BboBase(object):
@@ -20,19 +33,51 @@ class BboBase(object):
 
     # the main work routine which reads in the traveler files into travTableData[]
     # and then calls the child to do the rest of the work
-    def genReport(self):
-        self.parseArguments()
+    # argv defaults to sys.argv[1:], the batch driver passes its own list
+    def genReport(self, argv=None):
+        self.resetRunState()
+        self.parseArguments(argv)
         if self.args.debug:
             print(self.args.__dict__)
 
         #read all traveler files into travTableData
         self.travTableData = self.readAllTravFiles()
-        self.childGenReport()
+        if self.args.watch is None:
+            self.boardFragments = None
+            self.childGenReport()
+        else:
+            # per-board output is kept between refreshes and only regenerated for changed boards
+            self.boardFragments = {}
+            BboWatcher(self).run()
 
     # to be overridden
     def childGenReport(self):
         pass
 
+    # False if printBoardFragment already has saved output for this board
+    def boardNeedsOutput(self, bdnum):
+        return self.boardFragments is None or bdnum not in self.boardFragments
+
+    # children call this for output that depends only on one board's travellers.
+    # normally it just calls printFunc(bdnum) but in --watch mode
+    # the output is saved and reused until BboWatcher sees that board change
+    def printBoardFragment(self, bdnum, printFunc):
+        if self.boardFragments is None:
+            printFunc(bdnum)
+            return
+        fragment = self.boardFragments.get(bdnum)
+        if fragment is None:
+            buf = io.StringIO()
+            with contextlib.redirect_stdout(buf):
+                printFunc(bdnum)
+            fragment = self.boardFragments[bdnum] = buf.getvalue()
+        sys.stdout.write(fragment)
+
+    # clear any class or module level state left by an earlier run in this process
+    # children with their own per-run state should extend this
+    def resetRunState(self):
+        BboTravLineBase.resetRunState()
+
     @classmethod
     def subSuitSym(cls, str):
         useSuitSym = True
@@ -55,7 +100,10 @@ class BboBase(object):
         # init, array for each bdnum
         for bdnum in range(1, self.args.boards+1):
             travTableData[bdnum] = []
-        self.travParser.doParsing(travTableData)
+        if self.travCache is None or not self.travCache.load(travTableData):
+            self.travParser.doParsing(travTableData)
+            if self.travCache is not None:
+                self.travCache.save(travTableData)
         
         # if robotScores are supplied, use that to try to differentiate between two robot pairs
         if self.args.robotScores is not None:
@@ -68,11 +116,13 @@ class BboBase(object):
     
     def determineTravParser(self):
         # for now, look in args.dir for file types
-        for f in os.listdir(self.args.dir):
+        # the parser keeps this listing so it doesn't have to list the directory again
+        dirFiles = os.listdir(self.args.dir)
+        for f in dirFiles:
             if f.endswith('.html'):
-                return TravParserHtml(self.args)
+                return TravParserHtml(self.args, dirFiles)
             elif f.endswith('.csv'):
-                return TravParserCsv(self.args)
+                return TravParserCsv(self.args, dirFiles)
         # if we got this far, we failed.
         print('--dir directory must contain either .html or .csv files', file=sys.stderr)
         sys.exit(1)
@@ -80,7 +130,7 @@ class BboBase(object):
     def appDescription(self):
         return 'BBO Base'
     
-    def parseArguments(self):
+    def parseArguments(self, argv=None):
         parser = argparse.ArgumentParser(self.appDescription())
         # note: we could detect boards per round from the data but support args overrides in case
         # but we do have some built-in defaults for common board counts
@@ -95,17 +145,42 @@ class BboBase(object):
         parser.add_argument('--playTricksLeftRight', default=False, action='store_true', help='set to get trick order in sequence from left to right') 
         parser.add_argument('--tableBorders', default=False, action='store_true', help='add borders to tables for debugging') 
         parser.add_argument('--debug', default=False, action='store_true', help='print some debug info') 
+        parser.add_argument('--jobs', type=int, default=1, help='number of worker processes used to parse traveller files')
+        parser.add_argument('--htmlParser', default='stream', choices=['stream', 'bs4'], help='backend used to read html traveller files')
+        parser.add_argument('--noCache', default=False, action='store_true', help='do not use the parsed traveller cache')
+        parser.add_argument('--refreshCache', default=False, action='store_true', help='ignore any existing parsed traveller cache and rebuild it')
+        parser.add_argument('--cacheFile', default=None, help=f'parsed traveller cache file (default is {TravCache.cacheFileName} in --dir)')
+        parser.add_argument('--cacheStats', default=False, action='store_true', help='report parsed traveller cache hits and misses')
+        parser.add_argument('--ddStore', default=None, help='file holding double dummy results from earlier runs (default is .bbodd.sqlite in --dir)')
+        parser.add_argument('--noDDStore', default=False, action='store_true', help='do not read or save double dummy results on disk')
+        parser.add_argument('--ddBackend', default=os.environ.get('BBO_DD_BACKEND', 'dds'), choices=['dds', 'replay'], help='where double dummy results come from, libdds or results recorded with --ddRecord (default from BBO_DD_BACKEND, else dds)')
+        parser.add_argument('--ddFixture', default=os.environ.get('BBO_DD_FIXTURE'), help='recorded double dummy results for --ddBackend replay (default from BBO_DD_FIXTURE)')
+        parser.add_argument('--ddThreads', type=int, default=1, help='number of DDS threads to use if the number libdds set up can\'t be read')
+        parser.add_argument('--ddRecord', default=None, help='save every double dummy result used by the report in this file, for --ddBackend replay')
+        parser.add_argument('--watch', type=float, default=None, metavar='SECS', help='keep running, every SECS re-process any new or changed traveller files and regenerate the report')
+        parser.add_argument('--watchOut', default=None, help='in --watch mode, file rewritten with each new report (default is to print each report)')
 
         # allow child to add args
         self.addParserArgs(parser)
         
-        self.args = parser.parse_args()
+        self.args = parser.parse_args(argv)
         # handle some common fixups
         # with no explicit boards count, count files in directory
 
+        if self.args.watch is not None and self.args.robotScores is not None:
+            print('--robotScores cannot be used with --watch', file=sys.stderr)
+            sys.exit(1)
+        # in --watch mode a board count from the data can grow as files appear
+        self.boardsGiven = self.args.boards is not None
+
         self.travParser = self.determineTravParser()
+        self.travCache = None if self.args.noCache else TravCache(self.args, self.travParser)
         if self.args.boards is None:
-            self.args.boards = self.travParser.getNumBoards()
+            # a valid cache entry already knows the board count
+            if self.travCache is not None:
+                self.args.boards = self.travCache.getNumBoards()
+            if self.args.boards is None:
+                self.args.boards = self.travParser.getNumBoards()
 
         # detect defaults for bpr
         if self.args.bpr is None:
@@ -186,30 +261,56 @@ class BboBase(object):
 partnerDir = {'North' : 'South',
                'East' : 'West'}
 
+# the parsed form of a traveller Result cell, eg. 4\N{BLACK HEART SUIT}xS-1
+# for passed out or averaged boards contract, level, trumpstr, dblstr and decl are None
+ParsedResult = collections.namedtuple('ParsedResult', ['resultStr', 'contract', 'level', 'trumpstr', 'dblstr',
+                                                       'decl', 'result', 'tricks', 'isNoPlay'])
+
+suitmap = {'\N{BLACK SPADE SUIT}' : 'S',
+           '\N{BLACK HEART SUIT}' : 'H',
+           '\N{BLACK DIAMOND SUIT}' :  'D',
+           '\N{BLACK CLUB SUIT}' :  'C',
+           'N'       :  'N' }
+resultPattern = re.compile(r'([0-9])(.*?)(x{0,2})([NSEW])(=|\+[0-9]*|\-[0-9]*)')
+tagPattern = re.compile(r'\<.*?\>')
+
 class BboTravLineBase(object):
+    # there can be a lot of these so they use slots, interned name ids
+    # and a shared ParsedResult rather than an instance __dict__
+    __slots__ = ('bdnum', 'travParser', 'row', 'nameIds', 'origNorthId', 'origEastId',
+                 'nsPoints', 'nsScore', 'linStr', 'linRecord', 'parsedResult')
+
     @classmethod
     def importArgs(cls, args):
         cls.args = args
 
+    # the name ids and parsedResults are just interning tables so they can be kept across runs
+    @classmethod
+    def resetRunState(cls):
+        cls.origPartners.clear()
+
     origPartners = {}   # class variable
+    parsedResults = {}  # class variable, raw Result cell -> ParsedResult
+    playerNames = []    # class variable, name id -> name
+    playerIds = {}      # class variable, name -> name id
     def __init__(self, bdnum, row, travParser):
         self.bdnum = bdnum
         self.travParser = travParser
-        # row fields mostly handled here but saved in case needed later
-        self.row = row  
-        self.north = n = self.nameForDirection(row, 'North')
-        self.south = s = self.nameForDirection(row, 'South')
-        self.east  = e = self.nameForDirection(row, 'East')
-        self.west  = w = self.nameForDirection(row, 'West')
-        self.playerDir = [self.north, self.east, self.south, self.west]
+        # row fields are all handled here, the row is only kept for debugging
+        self.row = row if self.args.debug else None
+        n = self.nameForDirection(row, 'North')
+        s = self.nameForDirection(row, 'South')
+        e = self.nameForDirection(row, 'East')
+        w = self.nameForDirection(row, 'West')
+        self.nameIds = (self.nameId(n), self.nameId(e), self.nameId(s), self.nameId(w))
         if bdnum == 1:
             # record original partners in case a substitution happens later
             self.origPartners[n] = s
             self.origPartners[s] = n
             self.origPartners[e] = w
             self.origPartners[w] = e
-        self.origNorth = self.origNameForDirection(row, 'North')
-        self.origEast = self.origNameForDirection(row, 'East')
+        self.origNorthId = self.nameId(self.origNameForDirection(row, 'North'))
+        self.origEastId = self.nameId(self.origNameForDirection(row, 'East'))
 
         try:
             self.nsPoints = int(self.travParser.getNSPoints(row))
@@ -217,46 +318,123 @@ class BboTravLineBase(object):
             self.nsPoints = None
         self.nsScore  = float(self.travParser.getMPPct(row).rstrip('%'))
         self.linStr = self.travParser.getLinStr(row)
-        # parse different parts of result
-        resstr = row['Result']
-        resstr = re.sub(r'\<.*?\>', '', resstr)
-        self.resultStr = resstr
+        self.linRecord = None   # parsed from linStr when first needed
+        # parse different parts of result (shared with any other line with the same result cell)
+        self.parsedResult = self.parseResult(row['Result'])
         if self.args.debug:
-            print(resstr, len(resstr))
-        self.isNoPlay = False
+            print(self.resultStr, len(self.resultStr))
+            pprint(self.slotDict())
+            # sys.exit(1)
+
+    # slots objects have no __dict__, this builds the equivalent for debug printing
+    def slotDict(self):
+        d = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                d[name] = getattr(self, name, None)
+        return d
+
+    @classmethod
+    def nameId(cls, name):
+        nameId = cls.playerIds.get(name)
+        if nameId is None:
+            nameId = cls.playerIds[name] = len(cls.playerNames)
+            cls.playerNames.append(name)
+        return nameId
+
+    @property
+    def north(self):
+        return self.playerNames[self.nameIds[0]]
+
+    @property
+    def east(self):
+        return self.playerNames[self.nameIds[1]]
+
+    @property
+    def south(self):
+        return self.playerNames[self.nameIds[2]]
+
+    @property
+    def west(self):
+        return self.playerNames[self.nameIds[3]]
+
+    # names in N, E, S, W order, a new list each time so per-name helpers use nameIds instead
+    @property
+    def playerDir(self):
+        return [self.playerNames[nameId] for nameId in self.nameIds]
+
+    @property
+    def origNorth(self):
+        return self.playerNames[self.origNorthId]
+
+    @property
+    def origEast(self):
+        return self.playerNames[self.origEastId]
+
+    # the result fields are read from the shared ParsedResult
+    @property
+    def resultStr(self):
+        return self.parsedResult.resultStr
+
+    @property
+    def contract(self):
+        return self.parsedResult.contract
+
+    @property
+    def level(self):
+        return self.parsedResult.level
+
+    @property
+    def trumpstr(self):
+        return self.parsedResult.trumpstr
+
+    @property
+    def dblstr(self):
+        return self.parsedResult.dblstr
+
+    @property
+    def decl(self):
+        return self.parsedResult.decl
+
+    @property
+    def result(self):
+        return self.parsedResult.result
+
+    @property
+    def tricks(self):
+        return self.parsedResult.tricks
+
+    @property
+    def isNoPlay(self):
+        return self.parsedResult.isNoPlay
+
+    # a board only has a few distinct results repeated across many tables
+    # so each distinct Result cell is only parsed once
+    @classmethod
+    def parseResult(cls, rawResult):
+        parsedResult = cls.parsedResults.get(rawResult)
+        if parsedResult is None:
+            parsedResult = cls.parsedResults[rawResult] = cls.parseResultStr(rawResult)
+        return parsedResult
+
+    @staticmethod
+    def parseResultStr(rawResult):
+        resstr = tagPattern.sub('', rawResult)
         if resstr.startswith('PASS') or resstr.startswith('A'):
             # special case for passed out or averages
-            self.contract = self.dblstr = self.decl = self.trumpstr = None
-            self.result = 0
-            self.tricks = 0
-            if resstr.startswith('A=='):
-                self.isNoPlay = True
-        else:
-            # normal (not passed out) hands
-            m = re.search(r'([0-9])(.*?)(x{0,2})([NSEW])(=|\+[0-9]*|\-[0-9]*)', resstr)
-            if m is None:
-                print(f'Could Not Parse "{resstr}"')
-                sys.exit(1)
-            (level, suitstr, dblstr, decl, result) = m.groups()
-            suitstr = suitstr.lstrip('&')
-            # print(level, suitstr, dblstr, decl, result)
-            # translate suitstr
-            suitmap = {'\N{BLACK SPADE SUIT}' : 'S',
-                       '\N{BLACK HEART SUIT}' : 'H',
-                       '\N{BLACK DIAMOND SUIT}' :  'D',
-                       '\N{BLACK CLUB SUIT}' :  'C',
-                       'N'       :  'N' }
-            if suitstr in suitmap.keys():
-                suitstr = suitmap[suitstr]
-            self.trumpstr = suitstr
-            self.contract = f'{level}{suitstr}'
-            self.dblstr = dblstr
-            self.decl  = decl
-            self.result = 0 if result == '=' else int(result)
-            self.tricks = int(level) + 6 + self.result
-        if self.args.debug:
-            pprint(self.__dict__)
-            # sys.exit(1)
+            return ParsedResult(resstr, None, None, None, None, None, 0, 0, resstr.startswith('A=='))
+        # normal (not passed out) hands
+        m = resultPattern.search(resstr)
+        if m is None:
+            print(f'Could Not Parse "{resstr}"')
+            sys.exit(1)
+        (level, suitstr, dblstr, decl, result) = m.groups()
+        suitstr = suitstr.lstrip('&')
+        # translate suitstr
+        suitstr = suitmap.get(suitstr, suitstr)
+        result = 0 if result == '=' else int(result)
+        return ParsedResult(resstr, f'{level}{suitstr}', int(level), suitstr, dblstr,
+                            decl, result, int(level) + 6 + result, False)
 
     # handles gib-gib partnership as special case
     def nameForDirection(self, row, dir):
@@ -277,8 +455,14 @@ class BboTravLineBase(object):
             # and if doesn't exist in dict, just return name
             return self.origPartners.get(pard, name)  
 
+    # the structured LIN record, parsed once per line
+    def getLinRecord(self):
+        if self.linRecord is None:
+            self.linRecord = parseLin(self.linStr)
+        return self.linRecord
+
     def directionForName(self, name):
-        return 'NESW'[self.playerDir.index(name)]
+        return 'NESW'[self.nameIds.index(self.playerIds.get(name))]
     
     def pctScoreForName(self, name):
         return self.nsScore if self.directionForName(name) in 'NS' else (100 - self.nsScore)
@@ -289,7 +473,7 @@ class BboTravLineBase(object):
         return time.mktime(time.strptime(str, '%Y-%m-%d %H:%M'))
 
     def hasPlayer(self, name):
-        return name in self.playerDir
+        return self.playerIds.get(name) in self.nameIds
 
     def checkAndAppend(self, travellers):
         if self.args.names is not None:
@@ -324,10 +508,17 @@ class Bucket(object):
 
 
 class TravParserBase(ABC):
-    def __init__(self, args):
+    def __init__(self, args, dirFiles=None):
         self.args = args
+        self.dirFiles = dirFiles
         self.initParser()
 
+    # names of the files in args.dir, only listed once
+    def getDirFiles(self):
+        if self.dirFiles is None:
+            self.dirFiles = os.listdir(self.args.dir)
+        return self.dirFiles
+
     @abstractmethod
     def initParser(self):
         pass
@@ -356,12 +547,35 @@ class TravParserBase(ABC):
     def supportsTimeField(self):
         pass
 
+    # list of files that doParsing reads, used to validate the parsed traveller cache
+    @abstractmethod
+    def getSourceFiles(self):
+        pass
+
+    # anything besides the source files which changes what doParsing produces
+    def getCacheKey(self):
+        return ()
+
+    # parser state set up by doParsing which must be restored on a cache hit
+    def getCacheState(self):
+        return {}
+
+    def setCacheState(self, state):
+        pass
+
+    # forget the directory listing (and anything read from it) so changes can be seen
+    def rescan(self):
+        self.dirFiles = None
+
+    # used by --watch after some source files changed, fills travTableData for the affected boards
+    # and returns the list of those boards. By default the whole tournament is parsed again.
+    def reparseSourceFiles(self, fnames, travTableData):
+        self.doParsing(travTableData)
+        return list(travTableData.keys())
+
     def removePercentSyms(self, s):
         # subsitute % symbols
-        s = re.sub('%7C', '|', s)
-        s = re.sub('%2C', ',', s)
-        s = re.sub('%20', ' ', s)
-        return s
+        return s.replace('%7C', '|').replace('%2C', ',').replace('%20', ' ')
 
 # class to read the html files as pulled over by BBO-2-Brian Helper
 class TravParserHtml(TravParserBase):
@@ -369,8 +583,17 @@ class TravParserHtml(TravParserBase):
         pass
     
     def doParsing(self, travTableData):
-        for bdnum in range(1, self.args.boards+1):
-            table_data = self.parseOneFile(bdnum)
+        bdnums = range(1, self.args.boards+1)
+        if self.args.jobs > 1:
+            # parse the board files concurrently in worker processes.
+            # executor.map hands back the results in bdnum order so the rows
+            # land in travTableData exactly as they do in the serial case
+            chunksize = max(1, len(bdnums) // self.args.jobs)
+            with ProcessPoolExecutor(max_workers=self.args.jobs) as executor:
+                tables = list(executor.map(self.parseOneFile, bdnums, chunksize=chunksize))
+        else:
+            tables = map(self.parseOneFile, bdnums)
+        for (bdnum, table_data) in zip(bdnums, tables):
             for row in table_data:
                 travTableData[bdnum].append(row)                    
 
@@ -378,11 +601,15 @@ class TravParserHtml(TravParserBase):
         s = row['LinStr']
         s = self.removePercentSyms(s)
         # everything before pn goes
-        s = re.sub('^.*?pn\|', '|pn|', s)
+        idx = s.find('pn|')
+        if idx != -1:
+            s = '|pn|' + s[idx+3:]
         # get rid of single quotes
-        s = re.sub("'", "", s)
+        s = s.replace("'", "")
         # get rid of end
-        s = re.sub('\);this.*?$', '', s)
+        idx = s.find(');this')
+        if idx != -1:
+            s = s[:idx]
         return s
     
     def getMPPct(self, row):
@@ -393,14 +620,29 @@ class TravParserHtml(TravParserBase):
 
     def getNumBoards(self):
         # html directories have one file per board
-        return len([name for name in os.listdir(self.args.dir) if os.path.isfile(os.path.join(self.args.dir, name)) and name.endswith('.html')])
+        return len([name for name in self.getDirFiles() if os.path.isfile(os.path.join(self.args.dir, name)) and name.endswith('.html')])
 
     # html files always contain time field
     def supportsTimeField(self):
         return True
+
+    def getSourceFiles(self):
+        return sorted([os.path.join(self.args.dir, name) for name in self.getDirFiles() if name.endswith('.html')])
     
-    # this routine reads the html file for one traveller and uses BeautifulSoup
-    # to return an array of rows, each a dict for a single row of the html file
+    # the board number for a traveller file name, see parseOneFile
+    def boardForFileName(self, fname):
+        m = re.match(r'(?:hands \((\d+)\)|T(\d+))\.html$', os.path.basename(fname))
+        return None if m is None else int(m.group(1) or m.group(2))
+
+    # only the boards whose files changed need to be parsed again
+    def reparseSourceFiles(self, fnames, travTableData):
+        bdnums = sorted({self.boardForFileName(fname) for fname in fnames} & travTableData.keys())
+        for bdnum in bdnums:
+            travTableData[bdnum].extend(self.parseOneFile(bdnum))
+        return bdnums
+
+    # this routine reads the html file for one traveller and
+    # returns an array of rows, each a dict for a single row of the html file
     def parseOneFile(self, n):
         # two different naming options supported
         fname1 = f'{self.args.dir}/hands ({n}).html'
@@ -416,7 +658,42 @@ class TravParserHtml(TravParserBase):
         if self.args.debug:
             print(f'---- Handling Traveller File {fname} for Board {n} ----')
 
+        if self.args.htmlParser == 'bs4':
+            return self.parseWithSoup(html_doc)
+        else:
+            return self.parseWithExtractor(html_doc)
+
+    # the streaming backend, only looks at the first table and never builds a DOM
+    def parseWithExtractor(self, html_doc):
+        fields = []
+        table_data = []
+        rows = TravTableExtractor.extractRows(html_doc)
+        # get rid of rows[0]
+        rows.pop(0)
+        for tr in rows:
+            #build fields array
+            for cell in tr:
+                if cell.tag == 'th':
+                    fields.append(cell.text)
+        for tr in rows:
+            datum = {}
+            tds = [cell for cell in tr if cell.tag == 'td']
+            for i, td in enumerate(tds):
+                # skip some useless fields
+                if fields[i] not in ['N\u00ba', 'Movie']:
+                    datum[fields[i]] = td.text
+                #special case for Movie element (lin info encoded in onclick)
+                if fields[i] == 'Movie':
+                    datum['LinStr'] = td.anchorAttrs['onclick']
+            if datum:
+                table_data.append(datum)
+        return table_data
 
+    # the original BeautifulSoup backend, kept as a fallback
+    def parseWithSoup(self, html_doc):
+        if BeautifulSoup is None:
+            print('Error: --htmlParser bs4 requires the bs4 package', file=sys.stderr)
+            sys.exit(1)
         soup = BeautifulSoup(html_doc, 'html.parser')
 
         fields = []
@@ -455,6 +732,7 @@ class TravParserCsv(TravParserBase):
     csvTimeFieldName = 'tdate'
     def initParser(self):
         self.csvKeys = None
+        self.sectionReader = None
         # calculate  GMT offset from localtime in case needed
         while True:
             self.gmOffsetSecs = time.mktime(time.gmtime()) - time.mktime(time.localtime())
@@ -476,20 +754,21 @@ class TravParserCsv(TravParserBase):
 
     def getNumBoards(self):
         # csv directories have one .csv file
-        # look in that for a #Boards line
-        fname = self.getCsvFileName()
-        with open(fname, 'r') as read_obj:
-            line = next(read_obj).rstrip()
-            while line:
-                fields = line.split(',')
-                if fields[0] == '#BoardCount':
-                    return int(fields[1])
-                line = next(read_obj).rstrip()
-        return None
+        # look in that for a #BoardCount line
+        return self.getSectionReader().getBoardCount()
+
+    def rescan(self):
+        super(TravParserCsv, self).rescan()
+        self.sectionReader = None
+
+    # the whole csv file is read in one pass the first time it is needed
+    def getSectionReader(self):
+        if self.sectionReader is None:
+            self.sectionReader = CsvSectionReader(self.getCsvFileName())
+        return self.sectionReader
 
     def getCsvFileName(self):
-        fname = None
-        for fn in os.listdir(self.args.dir):
+        for fn in self.getDirFiles():
             if fn.endswith('.csv'):
                 return f'{self.args.dir}/{fn}'
         return None
@@ -498,6 +777,19 @@ class TravParserCsv(TravParserBase):
     def supportsTimeField(self):
         return self.csvTimeFieldName in self.csvKeys
 
+    def getSourceFiles(self):
+        return [self.getCsvFileName()]
+
+    # the Time field is only computed when the reporter has a tstart arg
+    def getCacheKey(self):
+        return ('tstart' in self.args.__dict__.keys(), self.args.__dict__.get('tstart'))
+
+    def getCacheState(self):
+        return {'csvKeys' : None if self.csvKeys is None else list(self.csvKeys)}
+
+    def setCacheState(self, state):
+        self.csvKeys = state['csvKeys']
+
     # time value is a little strange
     # some of the html tables read use GMT rather than local time
     def calcTimeVal(self, row):
@@ -513,47 +805,20 @@ class TravParserCsv(TravParserBase):
         
 
     def doParsing(self, travTableData):
-        fname = self.getCsvFileName()    
-        with open(fname, 'r') as read_obj:
-            found = False
-            travlines = []
-            while True:
-                line = next(read_obj, None)
-                if line is None:
-                    break
-                line = line.rstrip()
-                if line.startswith('#Title'):
-                    fields = line.split(',')
-                    self.args.title = fields[1]
-                # print(line)
-                if found:
-                    travlines.append(line.lstrip('#'))
-                if line == '#TravellerLines':
-                    found = True
-                if found and (line == '' or line == '#Substitutions'):
-                    break
+        reader = self.getSectionReader()
+        title = reader.getTitle()
+        if title is not None:
+            self.args.title = title
 
         # first find if there are any robot pairs (~~mxxxxx)
         # we only support one such backup robot name pair
-        self.backupRobNE = self.backupRobSW = None
-        csv_reader = csv.DictReader(travlines)
-        for row in csv_reader:
-            if row['North'].startswith('~~M'):
-                self.backupRobNE = row['North']
-                self.backupRobSW = row['South']
-                break;
-            if row['East'].startswith('~~M'):
-                self.backupRobNE = row['East']
-                self.backupRobSW = row['West']
-                break;
+        (self.backupRobNE, self.backupRobSW) = reader.getBackupRobotNames()
 
         if self.backupRobNE is not None:
             print(f'found robot names {self.backupRobNE} + {self.backupRobSW}', file=sys.stderr)
                 
-        # now travlines can be read by csvreader
-        csv_reader = csv.DictReader(travlines)
         # Iterate over each row after the header in the csv
-        for row in csv_reader:
+        for row in reader.travRows:
             # sometimes the csv contains the name GiB rather than the unique robot name
             # if this happens and there is only one robot pair, translate it
             for dir in ['North', 'East']:
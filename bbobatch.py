@@ -0,0 +1,107 @@
+import sys
+import os
+import time
+import glob
+import argparse
+import importlib
+import traceback
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+# runs one of the reporters over many tournament directories in a single process
+# (or a pool of worker processes) instead of starting python once per tournament.
+# Each tournament gets its own output file in --outDir, named <reporter>-<tournament>.out,
+# and anything the reporter writes to stderr goes to a matching .err file.
+# <tournament> is the directory name, or if two directories have the same name,
+# enough of their parent directories to tell them apart (eg. club1_2020-08-04).
+# Any args not recognized here are passed thru to the reporter, for example
+#    python3 bbobatch.py --reporter time --glob 'travs/2020-08-*' --outDir outs --simclocked
+
+# reporter name -> (module, class)
+reporters = {
+    'time'   : ('bbotime', 'BboTimeReporter'),
+    'stats'  : ('bbostats', 'BboStatsReporter'),
+    'ddpar'  : ('bboddpar', 'BboDDParReporter'),
+    'ddbid'  : ('bboddbid', 'BboDDBidReporter'),
+    'ddplay' : ('bboddplay', 'BboDDPlayReporter'),
+    'blame'  : ('bboblame', 'BboBlameReporter'),
+}
+
+def parseArguments():
+    parser = argparse.ArgumentParser('BBO batch report driver')
+    parser.add_argument('--reporter', required=True, choices=reporters.keys(), help='which report to generate')
+    parser.add_argument('--dir', nargs='+', default=[], help='tournament directories')
+    parser.add_argument('--glob', nargs='+', default=[], help='glob patterns matching tournament directories')
+    parser.add_argument('--outDir', default='.', help='directory for the output files')
+    parser.add_argument('--batchJobs', type=int, default=1, help='number of tournaments to run at once (worker processes)')
+    (args, reporterArgs) = parser.parse_known_args()
+    dirs = list(args.dir)
+    for pattern in args.glob:
+        dirs.extend(sorted(d for d in glob.glob(pattern) if os.path.isdir(d)))
+    if len(dirs) == 0:
+        parser.error('no tournament directories given (use --dir or --glob)')
+    # a directory given twice (eg. by --dir and a --glob) is only run once
+    seen = set()
+    uniqueDirs = []
+    for dir in dirs:
+        if os.path.abspath(dir) not in seen:
+            seen.add(os.path.abspath(dir))
+            uniqueDirs.append(dir)
+    return (args, uniqueDirs, reporterArgs)
+
+# the output file base for each directory, see the comment at the top
+def outFileBases(args, dirs):
+    parts = [os.path.abspath(dir).strip(os.sep).split(os.sep) for dir in dirs]
+    names = [dirParts[-1] for dirParts in parts]
+    numParts = 1
+    while len(set(names)) < len(names):
+        numParts += 1
+        counts = {}
+        for name in names:
+            counts[name] = counts.get(name, 0) + 1
+        names = [name if counts[name] == 1 else '_'.join(dirParts[-numParts:])
+                 for (name, dirParts) in zip(names, parts)]
+    return [os.path.join(args.outDir, f'{args.reporter}-{name}') for name in names]
+
+# runs the reporter for one tournament, returns (dir, error message or None, secs)
+# the reporter modules are imported the first time a process needs them and then reused
+def runOne(reporterName, dir, reporterArgs, outBase):
+    (moduleName, className) = reporters[reporterName]
+    reporterClass = getattr(importlib.import_module(moduleName), className)
+    startTime = time.time()
+    error = None
+    with open(f'{outBase}.out', 'w') as outFile, open(f'{outBase}.err', 'w') as errFile:
+        with contextlib.redirect_stdout(outFile), contextlib.redirect_stderr(errFile):
+            try:
+                reporterClass().genReport(['--dir', dir] + reporterArgs)
+            except SystemExit as ex:
+                # reporters call sys.exit on bad data, that only ends this tournament
+                if ex.code not in (None, 0):
+                    error = f'exit code {ex.code}'
+            except Exception as ex:
+                traceback.print_exc()
+                error = f'{type(ex).__name__}: {ex}'
+    return (dir, error, time.time() - startTime)
+
+def main():
+    (args, dirs, reporterArgs) = parseArguments()
+    os.makedirs(args.outDir, exist_ok=True)
+    jobArgs = [(args.reporter, dir, reporterArgs, outBase) for (dir, outBase) in zip(dirs, outFileBases(args, dirs))]
+    if args.batchJobs > 1:
+        with ProcessPoolExecutor(max_workers=args.batchJobs) as executor:
+            results = list(executor.map(runOne, *zip(*jobArgs)))
+    else:
+        results = [runOne(*jobArg) for jobArg in jobArgs]
+
+    numFailed = 0
+    for (dir, error, secs) in results:
+        status = 'ok' if error is None else f'FAILED ({error})'
+        print(f'{dir:<40} {secs:7.2f} secs  {status}')
+        if error is not None:
+            numFailed += 1
+    if numFailed > 0:
+        print(f'{numFailed} of {len(results)} tournaments failed, see the .err files in {args.outDir}', file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
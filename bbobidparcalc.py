@@ -20,8 +20,15 @@ def dbgprint(*args):
             print(f'{leadspace}{arg}', end='', file=sys.stderr)
         print(file = sys.stderr)
 
+suitIdxs = {suit : i for (i, suit) in enumerate(rankedSuits)}
+
 def suitIndex(suit):
-    return rankedSuits.index(suit)
+    return suitIdxs[suit]
+
+# the par raw score (see getParRawScore) at each level 0-7 for a suit, player and trix.
+# These only depend on the vulnerability so are shared by every auction,
+# keyed by (vulIndex, suit, player, trix)
+parScoreCache = {}
 
 class ScoreObj():
     def __init__(self, bdnum, level, suit, dblFlag, player, trix, rawscore):
@@ -42,35 +49,76 @@ class ScoreObj():
     def __str__(self):
         if self.level == 0:
             return f'0, Pass Out'
-        ovunder = self.trix - (self.level + 6)
-        ovunderStr = f'make {self.level + ovunder}' if ovunder >= 0 else f'down {-1*ovunder}'
-        dblStr = ' ' if self.dblFlag == 0 else '*' * self.dblFlag
-        return f'{self.rawscore:+5}, {self.level}{self.suit}{dblStr} by {self.player:<2} {ovunderStr}'
+        return f'{self.rawscore:+5}, {contractText(self)}'
+
+# the text for a contract, either a ScoreObj or a ParContract
+def contractText(contract):
+    if contract.level == 0:
+        return 'Pass Out'
+    ovunder = contract.trix - (contract.level + 6)
+    ovunderStr = f'make {contract.level + ovunder}' if ovunder >= 0 else f'down {-1*ovunder}'
+    dblStr = ' ' if contract.dblFlag == 0 else '*' * contract.dblFlag
+    return f'{contract.level}{contract.suit}{dblStr} by {contract.player:<2} {ovunderStr}'
+
+# a contract with the par score in a BidParRec, player is the declarer (eg. 'N') or pair ('NS')
+ParContract = collections.namedtuple('ParContract', ['level', 'suit', 'dblFlag', 'player', 'trix'])
 
+# the par after a bid (or before any bids, when bid is None).
+# parScore is from N/S's point of view, bidderIdx the index in NESW of the bidder,
+# contracts a tuple of the ParContracts that get the par score.
+# Any text is only made when a report asks for it.
 class BidParRec():
-    def __init__(self, bid, bidder, scoreList):
+    __slots__ = ('bid', 'bidderIdx', 'parScore', 'contracts')
+
+    def __init__(self, bid, bidderIdx, parScore, contracts):
         self.bid = bid
-        self.bidder = bidder
-        self.scoreList = scoreList
-        self.textList = []
-        # extract numeric score
-        self.parScore = None
-        for scoreObj in scoreList:
-            (valtxt, txt) = f'{scoreObj}'.split(', ')
-            self.parScore = int(valtxt)
-            self.textList.append(txt)
+        self.bidderIdx = bidderIdx
+        self.parScore = parScore
+        self.contracts = contracts
+
+    @classmethod
+    def fromScoreList(cls, bid, bidder, scoreList):
+        bidderIdx = None if bidder is None else 'NESW'.index(bidder)
+        contracts = tuple([ParContract(scoreObj.level, scoreObj.suit, scoreObj.dblFlag, scoreObj.player, scoreObj.trix)
+                           for scoreObj in scoreList])
+        return cls(bid, bidderIdx, scoreList[-1].rawscore, contracts)
+
+    @property
+    def bidder(self):
+        return None if self.bidderIdx is None else 'NESW'[self.bidderIdx]
 
     def bidString(self):
         return 'Pre-Bid: ' if self.bid is None else f'{self.bid:<2} by {self.bidder}: '
 
     def notesString(self):
-        return f'{self.parScore:+5}, {" or ".join(self.textList)}'
-    
+        return f'{self.parScore:+5}, {" or ".join([contractText(contract) for contract in self.contracts])}'
+
     def __str__(self):
         strout = self.bidString()
         strout += self.notesString()
         return strout
 
+    # for the json export, parDelta is the change in the par score since the previous record (N/S view)
+    def toDict(self, parDelta):
+        return {
+            'bid' : self.bid,
+            'bidder' : self.bidder,
+            'parScore' : self.parScore,
+            'parDelta' : parDelta,
+            'contracts' : [contract._asdict() for contract in self.contracts],
+        }
+
+# one node per auction prefix on a board, the children keyed by the next bid.
+# state is from BiddingParCalc.getBidState after the prefix's last bid,
+# bidParRec is the BidParRec for that bid (the pre-bid one at the root)
+class BidParTrieNode():
+    __slots__ = ('state', 'bidParRec', 'children')
+
+    def __init__(self):
+        self.state = None
+        self.bidParRec = None
+        self.children = {}
+
 class BiddingParCalc():
     def __init__(self, bdnum, dealInfo):
         self.bdnum = bdnum
@@ -136,6 +184,50 @@ class BiddingParCalc():
                 # (this is very common)
                 if len(trixset) == 1:
                     self.trixdict[pair][suit] = {pair : trixset.pop()}
+        self.frontier = {'NS' : [None] * 5, 'EW' : [None] * 5}
+        self.reachable = {'NS' : [None] * 5, 'EW' : [None] * 5}
+        self.floors = {'NS' : [None] * 5, 'EW' : [None] * 5}
+        for suit in rankedSuits:
+            for pair in ['NS', 'EW']:
+                self.buildFrontier(pair, suit)
+        self.updateReachable(0, 0, None)
+
+    # The frontier holds what calcCurrentPar needs about each possible declarer, by pair and suit index:
+    # a list of (player, trix, lowest level worth bidding, par raw score by level) in trixdict order.
+    # A bid only changes the trixdict (and so the frontier) for its own side and suit.
+    # Rebuilding an entry list clears its floor so updateReachable redoes it.
+    def buildFrontier(self, pair, suit):
+        vulIndex = self.dealInfo.getVulIndex()
+        entries = []
+        for (player, trix) in self.trixdict[pair][suit].items():
+            key = (vulIndex, suit, player, trix)
+            parScores = parScoreCache.get(key)
+            if parScores is None:
+                parScores = parScoreCache[key] = tuple([0] + [self.getParRawScore(suit, level, player, trix) for level in range(1, 8)])
+            baseLevel = 1 if trix <= 6 else self.startingLevel(suit, trix)
+            entries.append((player, trix, baseLevel, parScores))
+        self.frontier[pair][suitIdxs[suit]] = entries
+        self.floors[pair][suitIdxs[suit]] = None
+
+    # The reachable entries are the frontier entries with their level raised to the floor
+    # the auction has got to for that pair and suit index, without those that would need level 8.
+    # The floor is the last bid level (one more below the last bid's suit), except that a side
+    # can keep its own current contract.  A bid only raises the floors of the suits it jumps over,
+    # so only those (and any frontier just rebuilt) are redone, the rest are kept from the last bid.
+    def updateReachable(self, savedLevel, savedSuitIdx, savedSide):
+        for pair in ['NS', 'EW']:
+            floors = self.floors[pair]
+            for suitidx in range(5):
+                floor = 1
+                if savedLevel != 0:
+                    ownContract = pair == savedSide and suitidx == savedSuitIdx
+                    floor = savedLevel if suitidx > savedSuitIdx or ownContract else savedLevel + 1
+                if floor == floors[suitidx]:
+                    continue
+                floors[suitidx] = floor
+                self.reachable[pair][suitidx] = [(player, trix, max(baseLevel, floor), parScores)
+                                                 for (player, trix, baseLevel, parScores) in self.frontier[pair][suitidx]
+                                                 if baseLevel < 8 and floor < 8]
 
     def isPassedOut(self):
         return ((self.lastBid is not None and self.numConsecPasses == 3)
@@ -210,7 +302,7 @@ class BiddingParCalc():
             checkedDouble = False
             checkedRedouble = False # avoid for now has bug
         while not finished:
-            if True or self.sawChange:
+            if DEBUG:
                 dbgprint(f'current side is {pair}, scoreToBeat is {scoreToBeat}')
             self.sawChange = False
             # note accepting the current scoreToBeat is like passing
@@ -243,27 +335,39 @@ class BiddingParCalc():
                 scoreToBeat = self.checkScoreHigher(testScoreToBeat, scoreToBeat, pair)
                 checkedRedouble = True
             # go thru the suits starting with the next higher over scoreToBeat
-            suitidx = rankedSuits.index(scoreToBeat.suit)
+            # We must always be higher than the highest scoreToBeat from the other side
+            # and we must always be higher than  (or equal to) the last level-suit bid
+            # (neither of which changes while this side is trying its suits,
+            # the reachable entries already have their levels raised for the last bid)
+            otherSide = 'EW' if pair == 'NS' else 'NS'
+            scoreToBeatOtherSide = self.scoreToBeatBySide.get(otherSide)
+            savedSide = sideMap[self.savedScoreToBeat.player]
+            savedLevel = self.savedScoreToBeat.level
+            savedSuitIdx = suitIdxs[self.savedScoreToBeat.suit]
+            pairNS = pair == 'NS'
+            suitidx = suitIdxs[scoreToBeat.suit]
             for n in range(5):  # 5 suits
                 suitidx = (suitidx + 1) % 5
                 suit = rankedSuits[suitidx]
-                for player in self.trixdict[pair][suit].keys():
-                    trix = self.trixdict[pair][suit][player]
+                # the side's own current contract can be kept as it is (with any doubles)
+                # or bid higher, eg. to get out of a redouble, but not bid lower
+                ownContract = pair == savedSide and suitidx == savedSuitIdx
+                minLevel = 1
+                if scoreToBeatOtherSide is not None:
+                    minLevel = self.higherContractThan(scoreToBeatOtherSide.level, scoreToBeatOtherSide.suit, suit)
+                for (player, trix, floorLevel, parScores) in self.reachable[pair][suitidx]:
                     # find a level to test for this suit
-                    level =  1 if trix <= 6 else self.startingLevel(suit, trix)
-                    # We must always be higher than the highest scoreToBeat from the other side 
-                    # and we must always be higher than  (or equal to) the last level-suit bid
-                    otherSide = 'EW' if pair == 'NS' else 'NS'
-                    scoreToBeatOtherSide = self.scoreToBeatBySide.get(otherSide)
-                    savedSide = sideMap[self.savedScoreToBeat.player]
-                    if not (pair == savedSide and suit == self.savedScoreToBeat.suit):
-                        level = max(level, self.higherContractThan(self.savedScoreToBeat.level, self.savedScoreToBeat.suit, suit))
-                    if scoreToBeatOtherSide is not None:
-                        level = max(level, self.higherContractThan(scoreToBeatOtherSide.level, scoreToBeatOtherSide.suit, suit))
-                            
-                    dbgprint('will be trying contract:', level, suit)
+                    level = max(floorLevel, minLevel)
+                    if DEBUG:
+                        dbgprint('will be trying contract:', level, suit)
+                    if ownContract and level == savedLevel:
+                        scoreToBeat = self.checkScoreHigher(self.savedScoreToBeat, scoreToBeat, pair)
+                        level += 1
                     if level < 8:
-                        rawscore = self.getParRawScore(suit, level, player, trix)
+                        rawscore = parScores[level]
+                        # a worse score can never change anything, so skip making its ScoreObj
+                        if (rawscore < scoreToBeat.rawscore) if pairNS else (rawscore > scoreToBeat.rawscore):
+                            continue
                         dblFlag = 1 if trix < level+6 else 0
                         testScoreToBeat = ScoreObj(self.bdnum, level, suit, dblFlag, player, trix, rawscore)
                         scoreToBeat = self.checkScoreHigher(testScoreToBeat, scoreToBeat, pair)
@@ -327,6 +431,7 @@ class BiddingParCalc():
                 else:
                     newSuitDict[player] = trix
             self.trixdict[side][suit] = newSuitDict    
+            self.buildFrontier(side, suit)
             # print(f'after : {self.trixdict[side][suit]}', file=sys.stderr)
             # print('declMap:', self.declMap, file=sys.stderr)
                 
@@ -334,54 +439,102 @@ class BiddingParCalc():
     def addToBidParsList(self):
         # build tuple
         bid = None if len(self.bidParsList) == 0 else self.bidList[len(self.bidParsList) - 1]
-        rec = BidParRec(bid, self.bidder, self.bestScoreList)
+        rec = BidParRec.fromScoreList(bid, self.bidder, self.bestScoreList)
         self.bidParsList.append(rec)
         # print(self.bidParsList, file=sys.stderr)
         
-    def calcParsForBidList(self, bidList):
-        self.bidList = bidList
-        self.buildInitialTrixDict()
-        self.declMap = {'NS':{}, 'EW':{}}
-        self.bidder = None
-        self.lastBid = None
-        self.lastBidder = None
-        self.numConsecPasses = 0
-        dbgprint(f'bd {self.bdnum}: Initial Par Pre-Bidding')
-        self.bidParsList = []
+    # the calc state after a bid, everything needed to carry on with the next bid.
+    # The trixdict, frontier, reachable, floors and declMap entries are replaced rather than changed in place
+    # as bids are applied, so copying down to that level is enough.
+    def getBidState(self):
+        return (self.bidder, self.lastBid, self.lastBidder, self.numConsecPasses,
+                self.savedScoreToBeat, getattr(self, 'lastNormalBid', None), getattr(self, 'lastNormalBidder', None),
+                {pair : dict(suitDict) for (pair, suitDict) in self.trixdict.items()},
+                {pair : list(entries) for (pair, entries) in self.frontier.items()},
+                {pair : list(entries) for (pair, entries) in self.reachable.items()},
+                {pair : list(floors) for (pair, floors) in self.floors.items()},
+                {pair : dict(decls) for (pair, decls) in self.declMap.items()})
+
+    def setBidState(self, state):
+        (self.bidder, self.lastBid, self.lastBidder, self.numConsecPasses,
+         self.savedScoreToBeat, self.lastNormalBid, self.lastNormalBidder,
+         trixdict, frontier, reachable, floors, declMap) = state
+        self.trixdict = {pair : dict(suitDict) for (pair, suitDict) in trixdict.items()}
+        self.frontier = {pair : list(entries) for (pair, entries) in frontier.items()}
+        self.reachable = {pair : list(entries) for (pair, entries) in reachable.items()}
+        self.floors = {pair : list(floors) for (pair, floors) in floors.items()}
+        self.declMap = {pair : dict(decls) for (pair, decls) in declMap.items()}
+
+    def processBid(self, bidnum, bid, bidderIdx):
+        self.bidder = 'NESW'[bidderIdx]
+        if bid != 'P':
+            self.lastBid = bid
+            self.lastBidder = self.bidder
+            self.numConsecPasses = 0
+        else:
+            self.numConsecPasses += 1
+
+        dbgprint(f'processing bid[{bidnum+1}] {bid} by {self.bidder}')
+        self.applyBidToTrixDict(bid, self.bidder)
+        # calculate scoreToBeat for next calcCurrentPar call
+        if len(bid) > 1:
+            (levstr, suit) = bid
+            level = int(levstr)
+            player = self.declMap[sideMap[self.bidder]][suit]
+            trix = self.dealInfo.getDDTricks(suit, player)
+            rawscore = self.getRawScoreSigned(suit, level, 0, player, trix)
+            self.savedScoreToBeat = ScoreObj(self.bdnum, level, suit, 0, player, trix, rawscore)
+            self.updateReachable(level, suitIdxs[suit], sideMap[player])
+        elif bid in 'DR':
+            level = self.savedScoreToBeat.level
+            suit  = self.savedScoreToBeat.suit
+            player = self.savedScoreToBeat.player
+            trix = self.savedScoreToBeat.trix
+            dblflag = 1 if bid == 'D' else 2
+            rawscore = self.getRawScoreSigned(suit, level, dblflag, player, trix)
+            self.savedScoreToBeat = ScoreObj(self.bdnum, level, suit, dblflag, player, trix, rawscore)
+
         self.calcCurrentPar()
         self.addToBidParsList()
-        dbgprint(f'bd:{self.bdnum}, bids={bidList}')
-        bidderIdx = self.dealInfo.getDealerIndex()
-        for (bidnum, bid) in enumerate(bidList):
-            self.bidder = 'NESW'[bidderIdx]
-            if bid != 'P':
-                self.lastBid = bid
-                self.lastBidder = self.bidder
-                self.numConsecPasses = 0
-            else:
-                self.numConsecPasses += 1
-                
-            dbgprint(f'processing bid[{bidnum+1}] {bid} by {self.bidder}')
-            self.applyBidToTrixDict(bid, self.bidder)
-            # calculate scoreToBeat for next calcCurrentPar call
-            if len(bid) > 1:
-                (levstr, suit) = bid
-                level = int(levstr)
-                player = self.declMap[sideMap[self.bidder]][suit]
-                trix = self.dealInfo.getDDTricks(suit, player)
-                rawscore = self.getRawScoreSigned(suit, level, 0, player, trix)
-                self.savedScoreToBeat = ScoreObj(self.bdnum, level, suit, 0, player, trix, rawscore)
-            elif bid in 'DR':
-                level = self.savedScoreToBeat.level
-                suit  = self.savedScoreToBeat.suit
-                player = self.savedScoreToBeat.player
-                trix = self.savedScoreToBeat.trix
-                dblflag = 1 if bid == 'D' else 2
-                rawscore = self.getRawScoreSigned(suit, level, dblflag, player, trix)
-                self.savedScoreToBeat = ScoreObj(self.bdnum, level, suit, dblflag, player, trix, rawscore)
 
+    # bidTrie, if given, is the BidParTrieNode root for this board (see DealInfo.bidParTrie).
+    # It remembers the state and BidParRec after every auction prefix already calculated,
+    # so only the bids after the longest prefix shared with an earlier table are calculated.
+    def calcParsForBidList(self, bidList, bidTrie=None):
+        self.bidList = bidList
+        self.bidParsList = []
+        if bidTrie is None or bidTrie.state is None:
+            self.buildInitialTrixDict()
+            self.declMap = {'NS':{}, 'EW':{}}
+            self.bidder = None
+            self.lastBid = None
+            self.lastBidder = None
+            self.numConsecPasses = 0
+            dbgprint(f'bd {self.bdnum}: Initial Par Pre-Bidding')
             self.calcCurrentPar()
             self.addToBidParsList()
+            if bidTrie is not None:
+                bidTrie.state = self.getBidState()
+                bidTrie.bidParRec = self.bidParsList[-1]
+        dbgprint(f'bd:{self.bdnum}, bids={bidList}')
+        bidsDone = 0
+        node = bidTrie
+        if node is not None:
+            # skip along the prefix we already have
+            self.bidParsList = [node.bidParRec]
+            while bidsDone < len(bidList) and bidList[bidsDone] in node.children:
+                node = node.children[bidList[bidsDone]]
+                self.bidParsList.append(node.bidParRec)
+                bidsDone += 1
+            self.setBidState(node.state)
+        bidderIdx = (self.dealInfo.getDealerIndex() + bidsDone) % 4
+        for bidnum in range(bidsDone, len(bidList)):
+            bid = bidList[bidnum]
+            self.processBid(bidnum, bid, bidderIdx)
+            if node is not None:
+                node = node.children[bid] = BidParTrieNode()
+                node.state = self.getBidState()
+                node.bidParRec = self.bidParsList[-1]
             # calc next bidder
             bidderIdx = (bidderIdx + 1) % 4
             
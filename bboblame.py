@@ -29,6 +29,9 @@ class BboBlameReporter(BboBase):
         parser.add_argument('--bdebug', default=False, action='store_true', help='print some blame debug info') 
         pass
 
+    def resetRunState(self):
+        BboDDParTravLine.resetRunState()
+
     def childGenReport(self):
         BboDDParTravLine.importArgs(self.args)
         travellers = {}
@@ -61,20 +64,21 @@ class BboBlameReporter(BboBase):
                          'EW' : PointMap(bdnum, 'EW')}
             pctScores = {}
             for tline in travellers[bdnum]:
-                # print(tline.__dict__)
-                for player in tline.playerDir[:2]:
+                # print(tline.slotDict())
+                playerDir = tline.playerDir
+                for player in playerDir[:2]:
                     if bdnum == 1:
                         wlt[player] = WLTCounter()
                     if tline.nsPoints is not None:
-                        playerIdx = tline.playerDir.index(player)
+                        playerIdx = playerDir.index(player)
                         points = tline.nsPoints if playerIdx in [0, 2] else (-1 * tline.nsPoints)
                         pctScore = tline.nsScore if playerIdx in [0, 2] else (100 - tline.nsScore)
                         if playerIdx == 0:
                             pointMaps['NS'].points[player] = points
-                            pointMaps['NS'].opps[player] = tline.playerDir[1]
+                            pointMaps['NS'].opps[player] = playerDir[1]
                         else:
                             pointMaps['EW'].points[player] = points
-                            pointMaps['EW'].opps[player] = tline.playerDir[0]
+                            pointMaps['EW'].opps[player] = playerDir[0]
                         pctScores[player] = pctScore
             for dir in ['NS', 'EW']:
                 maxval = max(pointMaps[dir].points.values())
@@ -159,4 +163,5 @@ class BboBlameReporter(BboBase):
 
 #-------- main stuff starts here -----------
 
-BboBlameReporter().genReport()
+if __name__ == '__main__':
+    BboBlameReporter().genReport()
@@ -0,0 +1,49 @@
+# cards as bits.
+# A suit holding is a 13-bit mask, bit 0 for the 2 up to bit 12 for the ace,
+# so a hand is 4 of these in S, H, D, C order (as in pbn).
+# A card index (0-51) is 13 * suit index + rank index.
+# DDS holdings (the equals fields etc.) use bits 2-14 for the same ranks, ie. our mask << 2.
+
+suitChrs = 'SHDC'
+rankChrs = '23456789TJQKA'
+suitIdxs = {c : i for (i, c) in enumerate(suitChrs)}
+rankIdxs = {c : i for (i, c) in enumerate(rankChrs)}
+fullSuit = (1 << 13) - 1
+
+# the pbn rank string (high to low) for every suit mask
+maskStrs = ['']
+for rankIdx in range(13):
+    # the masks with this rank as the highest bit are this rank followed by the lower masks
+    maskStrs += [rankChrs[rankIdx] + lowerStr for lowerStr in maskStrs]
+
+def maskFromStr(rankStr):
+    mask = 0
+    for c in rankStr:
+        mask |= 1 << rankIdxs[c]
+    return mask
+
+def maskToStr(mask):
+    return maskStrs[mask]
+
+def maskRanks(mask):
+    return [rankIdx for rankIdx in range(13) if mask >> rankIdx & 1]
+
+# a hand's 4 suit masks from a pbn hand string like 'AK5.QJ2.T9876.4'
+def handFromPbnStr(handStr):
+    return [maskFromStr(suitStr) for suitStr in handStr.split('.')]
+
+def handToPbnStr(suitMasks):
+    return '.'.join([maskStrs[mask] for mask in suitMasks])
+
+# card is a 2 char string like 'SA'
+def cardIndex(card):
+    return 13 * suitIdxs[card[0]] + rankIdxs[card[1]]
+
+# given the cards played to a trick (2 char strings, the lead first) return the one that wins.
+# trumpIdx is the suit index of trumps, anything else (eg. 4 for NT) means no trumps
+def trickWinner(cards, trumpIdx):
+    played = [0, 0, 0, 0]
+    for card in cards:
+        played[suitIdxs[card[0]]] |= 1 << rankIdxs[card[1]]
+    winSuit = trumpIdx if trumpIdx < 4 and played[trumpIdx] != 0 else suitIdxs[cards[0][0]]
+    return suitChrs[winSuit] + rankChrs[played[winSuit].bit_length() - 1]
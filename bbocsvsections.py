@@ -0,0 +1,90 @@
+import os
+import csv
+import mmap
+
+# single pass reader for the csv files created by BBO Extractor.
+# The file is a series of sections, each starting with a line beginning with '#',
+# for example
+#    #Title,Some Tournament
+#    #BoardCount,27
+#
+#    #TravellerLines
+#    #Board,North,South,...
+#    1,alice,bob,...
+#
+#    #Substitutions
+# The file is read once (memory-mapped if it is large), every #Section line is indexed
+# by its offset and the title, board count and traveller rows are all taken from that one read.
+class CsvSectionReader(object):
+    mmapThreshold = 1 << 20
+    encoding = 'utf-8'
+    travellerSection = 'TravellerLines'
+
+    def __init__(self, fname):
+        self.fname = fname
+        self.sectionOffsets = {}   # section name -> list of offsets of its '#' line
+        self.sectionFields = {}    # section name -> fields of its first '#' line
+        self.travLines = []
+        with open(fname, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size >= self.mmapThreshold:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    self.indexSections(buf)
+            elif size > 0:
+                self.indexSections(f.read())
+        # the traveller lines are the header line plus the data lines
+        self.travRows = list(csv.DictReader(self.travLines))
+
+    def readLine(self, buf, start):
+        end = buf.find(b'\n', start)
+        if end == -1:
+            end = len(buf)
+        return (buf[start:end].decode(self.encoding).rstrip(), end + 1)
+
+    def indexSections(self, buf):
+        start = 0 if buf[0:1] == b'#' else self.nextSectionStart(buf, 0)
+        while start != -1:
+            (line, nextStart) = self.readLine(buf, start)
+            fields = line.split(',')
+            name = fields[0][1:]
+            self.sectionOffsets.setdefault(name, []).append(start)
+            self.sectionFields.setdefault(name, fields)
+            if name == self.travellerSection and len(self.sectionOffsets[name]) == 1:
+                # traveller body runs until a blank line or the #Substitutions section
+                nextStart = self.readTravellerLines(buf, nextStart)
+            start = self.nextSectionStart(buf, nextStart - 1) if nextStart <= len(buf) else -1
+
+    @staticmethod
+    def nextSectionStart(buf, pos):
+        idx = buf.find(b'\n#', pos)
+        return -1 if idx == -1 else idx + 1
+
+    # returns offset just past the traveller body
+    def readTravellerLines(self, buf, start):
+        while start < len(buf):
+            (line, nextStart) = self.readLine(buf, start)
+            if line == '' or line == '#Substitutions':
+                break
+            self.travLines.append(line.lstrip('#'))
+            start = nextStart
+        return start
+
+    def getSectionValue(self, name):
+        fields = self.sectionFields.get(name)
+        return None if fields is None or len(fields) < 2 else fields[1]
+
+    def getBoardCount(self):
+        val = self.getSectionValue('BoardCount')
+        return None if val is None else int(val)
+
+    def getTitle(self):
+        return self.getSectionValue('Title')
+
+    # the first pair of backup robot names (~~Mxxxx) seen in the traveller rows
+    def getBackupRobotNames(self):
+        for row in self.travRows:
+            if row['North'].startswith('~~M'):
+                return (row['North'], row['South'])
+            if row['East'].startswith('~~M'):
+                return (row['East'], row['West'])
+        return (None, None)
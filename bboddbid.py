@@ -8,10 +8,10 @@ import os
 import collections
 from pprint import pprint
 import re
+import json
 sys.path.append('./python-dds/examples')
 
 import dds
-import ctypes
 import functions
 import hands
 
@@ -29,13 +29,15 @@ class BboDDBidReporter(BboBase):
         return 'BBO Tourney Double Dummy Par Analysis'
 
     def addParserArgs(self, parser):
-        pass
+        parser.add_argument('--bidParJson', default=None, help='also write the par after each bid of every table to this file, one json object per table')
+
+    def resetRunState(self):
+        BboDDParTravLine.resetRunState()
 
     def childGenReport(self):
         BboDDParTravLine.importArgs(self.args)
-        if self.args.debug:
-            bbobidparcalc.DEBUG = True
-            
+        bbobidparcalc.DEBUG = self.args.debug
+
         self.travellers = {}
 
         for bdnum in range (1, self.args.boards + 1):
@@ -51,15 +53,49 @@ class BboDDBidReporter(BboBase):
         for bdnum in range (1, self.args.boards + 1):
             if self.args.onlyBoard is not None and bdnum != self.args.onlyBoard:
                 continue
-            print(f'Board {bdnum}', file=sys.stderr)
-            BboDDParTravLine.printHandPlusDDTable(bdnum)
-            for tline in self.travellers[bdnum]:
-                self.printBidDetailsTable(tline)
-            if False:
-                self.showOptimumLeadsAllContracts(bdnum)
-                print()
-                self.printResultsTable(bdnum)
+            self.printBoardFragment(bdnum, self.printBoard)
         self.printHTMLClosing()
+        if self.args.bidParJson is not None:
+            self.writeBidParJson(self.args.bidParJson)
+
+    # newline delimited json, one line per table with the par before bidding and after each bid.
+    # parDelta is the change in the par (N/S view) made by each bid, and cost what that bid
+    # cost the bidder's side (negative if it gained), for adding up across events.
+    def writeBidParJson(self, fname):
+        with open(fname, 'w') as f:
+            for bdnum in range (1, self.args.boards + 1):
+                if self.args.onlyBoard is not None and bdnum != self.args.onlyBoard:
+                    continue
+                dealInfo = BboDDParTravLine.dealInfos[bdnum]
+                for tline in self.travellers[bdnum]:
+                    bidParsList = tline.calcBiddingParList()
+                    bids = []
+                    for (prevRec, bidparrec) in zip(bidParsList, bidParsList[1:]):
+                        parDelta = bidparrec.parScore - prevRec.parScore
+                        bidDict = bidparrec.toDict(parDelta)
+                        bidDict['cost'] = -parDelta if bidparrec.bidder in 'NS' else parDelta
+                        bids.append(bidDict)
+                    tableDict = {
+                        'board' : bdnum,
+                        'dealer' : dealInfo.getDealerStr(),
+                        'vul' : dealInfo.getVulStr(),
+                        'players' : dict(zip('NESW', tline.playerDir)),
+                        'result' : tline.resultStr,
+                        'nsPoints' : tline.nsPoints,
+                        'preBid' : bidParsList[0].toDict(None),
+                        'bids' : bids,
+                    }
+                    print(json.dumps(tableDict), file=f)
+
+    def printBoard(self, bdnum):
+        print(f'Board {bdnum}', file=sys.stderr)
+        BboDDParTravLine.printHandPlusDDTable(bdnum)
+        for tline in self.travellers[bdnum]:
+            self.printBidDetailsTable(tline)
+        if False:
+            BboDDParTravLine.showOptimumLeadsAllContracts(bdnum, self.travellers[bdnum])
+            print()
+            self.printResultsTable(bdnum)
 
     def printBidDetailsTable(self, tline):
         print(tline.summaryLine())
@@ -113,14 +149,10 @@ class BboDDBidReporter(BboBase):
         print(tableHtml)
         
     def htmlNotesString(self, bidparrec):
-        str = bidparrec.notesString()
-        strlist = list(str)
-        for (i, c) in enumerate(strlist):
-            if c == ' ':
-                strlist[i] = '&nbsp;'
-            else:
-                break
-        return ''.join(strlist)
+        notes = bidparrec.notesString()
+        text = notes.lstrip(' ')
+        # keep the leading spaces that line up the scores
+        return '&nbsp;' * (len(notes) - len(text)) + text
         
     @staticmethod
     def tlineScore(tline):
@@ -143,70 +175,6 @@ class BboDDBidReporter(BboBase):
             r += 1
         print(BboBase.genHtmlTable(tab, self.args, colalignlist=calist))
 
-    def showOptimumLeadsAllContracts(self, bdnum):
-        print('Optimum Leads for Bid Contracts')
-        print('-------------------------------')
-        # only need to show "different" contracts
-        # where "different" means just trump and declarer (level insignificant)
-        contractMap = {}
-        for tline in self.travellers[bdnum]:
-            if tline.trumpstr is not None:
-                trumpStr = self.subSuitSym(tline.trumpstr)
-                trumpStr = 'NT' if trumpStr == 'N' else f' {trumpStr}'
-                key = f'{trumpStr} by {tline.decl}'
-                contractMap[key] = tline
-
-        # now for each different contract show optimum leads
-        for key in contractMap.keys():
-            tline = contractMap[key]
-            futs = tline.getOptimumLeads()
-            optLeadStr = self.getOptLeadStr(futs, tline)
-            print(f' {key}: {optLeadStr}')
-        print()
-
-    def getOptLeadStr(self, futs, tline):
-        futcon = ctypes.pointer(futs).contents
-        cardMap = {}
-        for suit in 'SHDC':
-            cardMap[suit] = 0
-        for i in range(futcon.cards):
-            res = ctypes.create_string_buffer(15)
-            # add the returned rank into the "Holding"
-            holdingVal = futcon.equals[i] | (1 << futcon.rank[i])
-            suitChr = self.getSuitChr(futcon.suit[i])
-            cardMap[suitChr] |= holdingVal
-            # print(suitChr, self.getRankChr(futcon.rank[i]), futcon.rank[i], futcon.equals[i], holdingVal, cardMap[suitChr])
-
-        totalOpts = 0
-        optStr = ''
-        for suit in 'SHDC':
-            holdingVal = cardMap[suit]
-            if holdingVal != 0:
-                holdingStr = self.holdingToStr(holdingVal)
-                holdingSet = set(holdingStr)
-                handSet = BboDDParTravLine.dealInfos[tline.bdnum].pbnDeal.getCardSet(tline.getLeaderIndex(), suit)
-                cardStr = 'any' if holdingSet == handSet else holdingStr
-                suitSym = self.subSuitSym(suit)
-                optStr += f'{suitSym}:{cardStr} '
-                totalOpts += len(holdingStr)
-                
-        return 'any card' if totalOpts >= 13 else optStr
-
-    @staticmethod
-    def getSuitChr(idx):
-        return 'SHDCN'[idx]
-
-    @staticmethod
-    def getRankChr(idx):
-        return 'xx23456789TJQKA'[idx]
-
-    def holdingToStr(self, holding):
-        str = ''
-        for i in range(14, 1, -1):
-            if holding & (1 << i) != 0:
-                str += self.getRankChr(i)
-        return str
-
 #-------- main stuff starts here -----------
 
 if __name__ == '__main__':
@@ -11,7 +11,6 @@ import re
 sys.path.append('./python-dds/examples')
 
 import dds
-import ctypes
 import functions
 import hands
 
@@ -31,6 +30,9 @@ class BboDDParReporter(BboBase):
     def addParserArgs(self, parser):
         pass
 
+    def resetRunState(self):
+        BboDDParTravLine.resetRunState()
+
     def childGenReport(self):
         BboDDParTravLine.importArgs(self.args)
         self.travellers = {}
@@ -43,27 +45,33 @@ class BboDDParReporter(BboBase):
                 # tline.getDDTable()
                 tline.checkAndAppend(self.travellers)
         # print('travTableData and travellers are set up')
+        # the play analysis for every board to be printed is done in one batch
+        BboDDParTravLine.queuePlayAnalysis([tline for bdnum in self.boardList if self.boardNeedsOutput(bdnum)
+                                            for tline in self.travellers[bdnum]])
 
         # hand, ddtable and par display
         self.printHTMLOpening()
         self.printButtonScript()
-        bidReporter = BboDDBidReporter()
-        playReporter = BboDDPlayReporter()
-        bidReporter.args = playReporter.args = self.args
+        self.bidReporter = BboDDBidReporter()
+        self.playReporter = BboDDPlayReporter()
+        self.bidReporter.args = self.playReporter.args = self.args
         self.printPairResultsTables()
         for bdnum in self.boardList:
-            print(f'Board {bdnum}', file=sys.stderr)
-            BboDDParTravLine.printHandPlusDDTable(bdnum)
-            self.showOptimumLeadsAllContracts(bdnum)
-            print()
-            self.printBoardTraveller(bdnum)
-            for tline in sorted(self.travellers[bdnum], reverse=True, key=self.tlineScore):
-                self.printDivOpening(tline)
-                bidReporter.printBidDetailsTable(tline)
-                playReporter.printPlayDetailsTable(bdnum, tline)
-                self.printDivClosing()
+            self.printBoardFragment(bdnum, self.printBoard)
         self.printHTMLClosing()
 
+    def printBoard(self, bdnum):
+        print(f'Board {bdnum}', file=sys.stderr)
+        BboDDParTravLine.printHandPlusDDTable(bdnum)
+        BboDDParTravLine.showOptimumLeadsAllContracts(bdnum, self.travellers[bdnum])
+        print()
+        self.printBoardTraveller(bdnum)
+        for tline in sorted(self.travellers[bdnum], reverse=True, key=self.tlineScore):
+            self.printDivOpening(tline)
+            self.bidReporter.printBidDetailsTable(tline)
+            self.playReporter.printPlayDetailsTable(bdnum, tline)
+            self.printDivClosing()
+
     def printDivOpening(self, tline):
         divId = self.getDivId(tline)
         print(f'<div id="{divId}" style="display:none">')
@@ -144,70 +152,6 @@ class BboDDParReporter(BboBase):
         print(BboBase.genHtmlTable(tab, self.args, colalignlist=calist))
         print('</b>')
 
-    def showOptimumLeadsAllContracts(self, bdnum):
-        print('Optimum Leads for Bid Contracts')
-        print('-------------------------------')
-        # only need to show "different" contracts
-        # where "different" means just trump and declarer (level insignificant)
-        contractMap = {}
-        for tline in self.travellers[bdnum]:
-            if tline.trumpstr is not None:
-                trumpStr = self.subSuitSym(tline.trumpstr)
-                trumpStr = 'NT' if trumpStr == 'N' else f' {trumpStr}'
-                key = f'{trumpStr} by {tline.decl}'
-                contractMap[key] = tline
-
-        # now for each different contract show optimum leads
-        for key in contractMap.keys():
-            tline = contractMap[key]
-            futs = tline.getOptimumLeads()
-            optLeadStr = self.getOptLeadStr(futs, tline)
-            print(f' {key}: {optLeadStr}')
-        print()
-
-    def getOptLeadStr(self, futs, tline):
-        futcon = ctypes.pointer(futs).contents
-        cardMap = {}
-        for suit in 'SHDC':
-            cardMap[suit] = 0
-        for i in range(futcon.cards):
-            res = ctypes.create_string_buffer(15)
-            # add the returned rank into the "Holding"
-            holdingVal = futcon.equals[i] | (1 << futcon.rank[i])
-            suitChr = self.getSuitChr(futcon.suit[i])
-            cardMap[suitChr] |= holdingVal
-            # print(suitChr, self.getRankChr(futcon.rank[i]), futcon.rank[i], futcon.equals[i], holdingVal, cardMap[suitChr])
-
-        totalOpts = 0
-        optStr = ''
-        for suit in 'SHDC':
-            holdingVal = cardMap[suit]
-            if holdingVal != 0:
-                holdingStr = self.holdingToStr(holdingVal)
-                holdingSet = set(holdingStr)
-                handSet = BboDDParTravLine.dealInfos[tline.bdnum].pbnDeal.getCardSet(tline.getLeaderIndex(), suit)
-                cardStr = 'any' if holdingSet == handSet else holdingStr
-                suitSym = self.subSuitSym(suit)
-                optStr += f'{suitSym}:{cardStr} '
-                totalOpts += len(holdingStr)
-                
-        return 'any card' if totalOpts >= 13 else optStr
-
-    @staticmethod
-    def getSuitChr(idx):
-        return 'SHDCN'[idx]
-
-    @staticmethod
-    def getRankChr(idx):
-        return 'xx23456789TJQKA'[idx]
-
-    def holdingToStr(self, holding):
-        str = ''
-        for i in range(14, 1, -1):
-            if holding & (1 << i) != 0:
-                str += self.getRankChr(i)
-        return str
-
     @staticmethod
     def getDivId(tline):
         return f'B{tline.bdnum}-{tline.north}'
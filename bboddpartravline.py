@@ -12,7 +12,15 @@ import ctypes
 import functions
 
 from bbobase import BboBase, BboTravLineBase
-from bbobidparcalc import BiddingParCalc
+from bbobidparcalc import BiddingParCalc, BidParTrieNode
+import bbocards
+import bboscore
+# numpy is only needed to compute all the par scores at once
+try:
+    import bboparcalc
+except ImportError:
+    bboparcalc = None
+from bboddsolver import makeSolver
 
 
 def nested_dict():
@@ -20,35 +28,57 @@ def nested_dict():
 
 
 class BboDDParTravLine(BboTravLineBase):
+    __slots__ = ('solvedPlayContents',)
+
     # class data of DealInfo objects keyed by bdnum
     dealInfos = {}
+    # lines queued by the reporter for play analysis, they are all solved
+    # together the first time any line needs its play analysis
+    pendingPlayAnalysis = []
+    # where all DD results come from (see bboddsolver.py), made when first needed
+    solver = None
+
+    @classmethod
+    def resetRunState(cls):
+        super(BboDDParTravLine, cls).resetRunState()
+        cls.dealInfos.clear()
+        cls.pendingPlayAnalysis.clear()
+        if cls.solver is not None:
+            cls.solver.close()
+            cls.solver = None
+
+    @classmethod
+    def getSolver(cls):
+        if cls.solver is None:
+            cls.solver = makeSolver(cls.args)
+        return cls.solver
 
     def __init__(self, bdnum, row, travParser):
         super(BboDDParTravLine, self).__init__(bdnum, row, travParser)
         # convert the captured LIN string into a pbn deal specification
         if self.dealInfos.get(bdnum) is None:
             self.dealInfos[bdnum] = self.DealInfo(self.bdnum, self.linToPbnDeal())
-        (self.playString, self.claimed) = self.linToPbnPlayString()
-        # print(f'bdnum {bdnum}, playstring={self.playString}')
-        self.playCount = int(len(self.playString)/2)
-        
-    def linToPbnDeal(self):
-        s = self.linStr
-        # print(s)
-        # get rid of everything up to deal info
-        s = re.sub('^.*md\|\d', '', s)
-        # and everything after
-        s = re.sub('\|rh\|.*$', '', s)
-        # replace suits with separators
-        s = re.sub('S', '', s)
-        s = re.sub('[HDC]', '.', s)
-        s = s.lstrip(' ')
-        s = s.rstrip(' ')
-        str3Hands = s.split(',')[0:3]
+        self.solvedPlayContents = None
 
+    # the play info comes straight from the LIN record rather than being stored per line
+    # (the record joins the play string once, formatPlayAnalysis reads it for every card)
+    @property
+    def playString(self):
+        return self.getLinRecord().playString
+
+    @property
+    def claimed(self):
+        return self.getLinRecord().claim
+
+    @property
+    def playCount(self):
+        return len(self.getLinRecord().plays)
+
+    def linToPbnDeal(self):
         # build hands structure to create Deal
         # the created Deal will fill in the missing 4th hand
-        # the three hands from str3Hands are always in order S, W, N (E missing)
+        # the three hands in the LIN md record are always in order S, W, N (E missing)
+        str3Hands = self.getLinRecord().hands
         hands = {}
         for i in range(3):
             hands['SWN'[i]] = self.Deal.Hand.fromPbnHandStr(str3Hands[i])
@@ -56,34 +86,14 @@ class BboDDParTravLine(BboTravLineBase):
         return mydeal
     
     def linToPbnPlayString(self):
-        s = self.linStr
-        # get rid of everything up to play info
-        s = re.sub('^.*?pc\|', '|pc|', s)
-        # strip down to only the cards played (get rid of |pc|)
-        s = re.sub('\|pc\|', '', s)
-        # get rid of any zz and following records at the end
-        s = re.sub('\|zz\|.*?$', '', s)
-        # string returned could have claim info at end, if so break that out
-        splits = re.split('\|mc\|', s)
-        if len(splits) == 1:
-            splits.append(None)   # no claim info
-        else:
-            barsplits = splits[1].split('|')
-            splits[1] = int(barsplits[0])  # amount claimed
-        return splits
+        # returns [playString, amount claimed or None]
+        linRecord = self.getLinRecord()
+        return [linRecord.playString, linRecord.claim]
         
     def linToPbnBidList(self):
-        s = self.linStr
-        splits = re.split('\|mb\|', s)
-        splits = splits[1:-1]
-        splits.append('P')
-        # get rid of any alert parts
-        for n in range(len(splits)):
-            splits[n] = re.sub('\|an.*', '', splits[n])
-            splits[n] = re.sub('%21', '', splits[n])
-            splits[n] = splits[n].upper()
-        # print(splits, file=sys.stderr)
-        return splits
+        # the auction always ends with a pass, so the last bid is just taken as 'P'
+        bids = self.getLinRecord().bids
+        return list(bids[:-1]) + ['P']
         
     def getDDTable(self):
         dealInfo = self.dealInfos[self.bdnum]
@@ -98,37 +108,35 @@ class BboDDParTravLine(BboTravLineBase):
         declIdx = 'NESW'.index(self.decl)
         return (declIdx + 1) % 4
 
-    def buildDealPBN(self, dlPBN):
-        dlPBN.trump = self.getTrumpIndex()
-        # dlPBN.first is the index of the hand leading to the first trick
-        # where N=0, E=1, S=2, W=3
-        dlPBN.first = self.getLeaderIndex()
-        dealInfo = self.dealInfos[self.bdnum]
-        for n in range(3):
-            dlPBN.currentTrickSuit[n] = dlPBN.currentTrickRank[n] = 0
-        dlPBN.remainCards = dealInfo.pbnDealString.encode('utf-8')
-        
+    @classmethod
+    def queuePlayAnalysis(cls, tlines):
+        cls.pendingPlayAnalysis.extend(tlines)
+
     def getPlayAnalysis(self):
-        if self.decl is None:
+        if self.decl is None or self.solvedPlayContents is not None:
             return
-        dlPBN = dds.dealPBN()
-        DDplayPBN = dds.playTracePBN()
-        solved = dds.solvedPlay()
-        # fill in dlPBN fields
-        self.buildDealPBN(dlPBN)
-        # print(dlPBN.trump,  dlPBN.first, dlPBN.remainCards)
-        DDplayPBN.number = self.playCount
-        if self.args.debug:
-            print('playstring len is ', len(self.playString), self.playString)
-        DDplayPBN.cards = self.playString.encode('utf-8')
-        # print(DDplayPBN.number, DDplayPBN.cards, file=sys.stderr)
-        threadIndex = 0
-        res = dds.AnalysePlayPBN(
-            dlPBN,
-            DDplayPBN,
-            ctypes.pointer(solved),
-            threadIndex)
-        self.solvedPlayContents = ctypes.pointer(solved).contents
+        tlines = [self] + [tline for tline in self.pendingPlayAnalysis if tline is not self]
+        self.pendingPlayAnalysis.clear()
+        self.analyseAllPlays([tline for tline in tlines if tline.decl is not None and tline.solvedPlayContents is None])
+
+    # the solver does the lines all together, the DDS solver spreads them over all the DDS threads
+    @classmethod
+    def analyseAllPlays(cls, tlines):
+        if cls.args.debug:
+            for tline in tlines:
+                print('playstring len is ', len(tline.playString), tline.playString)
+        plays = [tline.getPlayKey() for tline in tlines]
+        for (tline, solved) in zip(tlines, cls.getSolver().analysePlays(plays)):
+            tline.setSolvedPlay(solved)
+
+    # a play analysis depends on the deal, the contract strain, who leads and the cards played
+    def getPlayKey(self):
+        dealInfo = self.dealInfos[self.bdnum]
+        return (dealInfo.pbnDealString, self.getTrumpIndex(), self.getLeaderIndex(), self.playCount, self.playString)
+
+    def setSolvedPlay(self, solved):
+        # our own copy, the padding below changes it
+        self.solvedPlayContents = dds.solvedPlay.from_buffer_copy(solved)
         # if there are 52 cards in the playstring, the solvedPlayContents stop at 48
         # (because on the last trick there are no choices to be made)
         # But when we format the play analysis, we would like to show all the tricks
@@ -163,7 +171,7 @@ class BboDDParTravLine(BboTravLineBase):
     def coloredName(self, myLetter):
         myColor = self.colorForDir(myLetter)
         myIndex = 'NESW'.index(myLetter)
-        myName = self.playerDir[myIndex]
+        myName = self.playerNames[self.nameIds[myIndex]]
         myStyledName = myName if myColor is None else f'<span style="background-color:{myColor}">{myName}</span>'
         return myStyledName
 
@@ -270,58 +278,75 @@ class BboDDParTravLine(BboTravLineBase):
         tableHtml = BboBase.genHtmlTable(tab, self.args, headers=myHeaders)
         print(tableHtml, end='')
 
+    # the opening lead analysis for our contract, from the board's lead table
     def getOptimumLeads(self):
-        dlPBN = dds.dealPBN()
-        fut2 = dds.futureTricks()
-        threadIndex = 0
-        line = ctypes.create_string_buffer(80)
-        dds.SetMaxThreads(0)
-        # fill in dlPBN fields
-        self.buildDealPBN(dlPBN)
-        target = -1
-        solutions = 2
-        mode = 0
-        res = dds.SolveBoardPBN(
-            dlPBN,
-            target,
-            solutions,
-            mode,
-            ctypes.pointer(fut2),
-            0)
-        
-        if res != dds.RETURN_NO_FAULT:
-            dds.ErrorMessage(res, line)
-            print("DDS error {}".format(line.value.decode("utf-8")))
+        return self.dealInfos[self.bdnum].getOptimumLeads(self.trumpstr, self.decl)
+
+    @classmethod
+    def showOptimumLeadsAllContracts(cls, bdnum, tlines):
+        print('Optimum Leads for Bid Contracts')
+        print('-------------------------------')
+        # only need to show "different" contracts
+        # where "different" means just trump and declarer (level insignificant)
+        contractMap = {}
+        for tline in tlines:
+            if tline.trumpstr is not None:
+                trumpStr = BboBase.subSuitSym(tline.trumpstr)
+                trumpStr = 'NT' if trumpStr == 'N' else f' {trumpStr}'
+                key = f'{trumpStr} by {tline.decl}'
+                contractMap[key] = tline
+
+        # now for each different contract show optimum leads
+        for key in contractMap.keys():
+            tline = contractMap[key]
+            futs = tline.getOptimumLeads()
+            optLeadStr = cls.getOptLeadStr(futs, tline)
+            print(f' {key}: {optLeadStr}')
+        print()
+
+    @classmethod
+    def getOptLeadStr(cls, futs, tline):
+        futcon = ctypes.pointer(futs).contents
+        cardMap = {}
+        for suit in 'SHDC':
+            cardMap[suit] = 0
+        for i in range(futcon.cards):
+            # add the returned rank into the "Holding"
+            holdingVal = futcon.equals[i] | (1 << futcon.rank[i])
+            suitChr = cls.getSuitChr(futcon.suit[i])
+            cardMap[suitChr] |= holdingVal
+            # print(suitChr, cls.getRankChr(futcon.rank[i]), futcon.rank[i], futcon.equals[i], holdingVal, cardMap[suitChr])
+
+        totalOpts = 0
+        optStr = ''
+        for suit in 'SHDC':
+            holdingVal = cardMap[suit]
+            if holdingVal != 0:
+                holdingStr = cls.holdingToStr(holdingVal)
+                handMask = cls.dealInfos[tline.bdnum].pbnDeal.getSuitMask(tline.getLeaderIndex(), suit)
+                cardStr = 'any' if holdingVal == handMask << 2 else holdingStr
+                suitSym = BboBase.subSuitSym(suit)
+                optStr += f'{suitSym}:{cardStr} '
+                totalOpts += len(holdingStr)
+                
+        return 'any card' if totalOpts >= 13 else optStr
+
+    @staticmethod
+    def getSuitChr(idx):
+        return 'SHDCN'[idx]
 
-        if False:
-            line = f'{self.bdnum}: Optimum Leads against {self.contract} by {self.decl}'
-            functions.PrintFut(line, ctypes.pointer(fut2))
+    @staticmethod
+    def getRankChr(idx):
+        return 'xx23456789TJQKA'[idx]
 
-        return fut2
+    # a DDS holding has the 2 in bit 2
+    @classmethod
+    def holdingToStr(cls, holding):
+        return bbocards.maskToStr(holding >> 2)
 
     # given four cards played to a trick, return the one that wins the trick
     def trickWinner(self, cards):
-        # print(cards, self.trumpstr, file=sys.stderr)
-        ledSuit = None
-        highestTrump = 0
-        highestLedSuit = 0
-        for (i, card) in enumerate(cards):
-            (suit, rankchr) = card
-            rank = self.Deal.Hand.cardRank(rankchr)
-            if ledSuit is None:
-                ledSuit = suit
-            if suit == self.trumpstr:
-                highestTrump = max(highestTrump, rank)
-                # print('trump:', rank, highestTrump, file=sys.stderr)
-            elif suit == ledSuit:
-                highestLedSuit = max(highestLedSuit, rank)
-                # print('ledsuit:', rank, highestLedSuit, file=sys.stderr)
-        if highestTrump > 0:
-            winner = f'{self.trumpstr}{"23456789TJQKA"[highestTrump]}'
-        else:
-            winner = f'{ledSuit}{"23456789TJQKA"[highestLedSuit]}'
-        # print(winner, file=sys.stderr)
-        return winner
+        return bbocards.trickWinner(cards, self.getTrumpIndex())
     
     # print hand and DD table using outer html table
     @classmethod
@@ -337,9 +362,10 @@ class BboDDParTravLine(BboTravLineBase):
         print(BboBase.genHtmlTable(outtab, cls.args))
 
     def calcBiddingParList(self):
-        calc = BiddingParCalc(self.bdnum, self.dealInfos[self.bdnum])
+        dealInfo = self.dealInfos[self.bdnum]
+        calc = BiddingParCalc(self.bdnum, dealInfo)
         bidList = self.linToPbnBidList()
-        return calc.calcParsForBidList(bidList)
+        return calc.calcParsForBidList(bidList, dealInfo.bidParTrie)
         
     # inner class DealInfo
     class DealInfo(object):
@@ -349,50 +375,72 @@ class BboDDParTravLine(BboTravLineBase):
             pbnDealString = pbnDeal.toPbnString()
             # print('dealpbn= ', pbnDealString)
             self.bdnum = bdnum
-            self.DDdealsPBN = dds.ddTableDealsPBN()
-            self.DDdealsPBN.noOfTables = 1
-            
-            self.DDdealsPBN.deals[0].cards = pbnDealString.encode('utf-8')
-            self.pbnDealString = pbnDealString  #saved in case we need it later
+            self.pbnDealString = pbnDealString
             self.pbnDeal = pbnDeal
             
             # other fields left for later computation
-            self.cddTable = None
+            self.ddTableResults = None
             self.parResults = None
+            self.nsPar = None
+            self.leadTable = None   # (strain, declarer) -> futureTricks for the opening lead
+            # bidding par results by auction prefix, shared by all the tables (see calcParsForBidList)
+            self.bidParTrie = BidParTrieNode()
 
         def getDDTable(self):
-            if self.cddTable is None:
+            if self.ddTableResults is None:
                 # print(f'...computing DD Table for bdnum {bdnum}')
-                self.computeDDTable()
-            return self.cddTable
+                # every other board still waiting for its DD table gets solved in the same batch
+                pending = [dealInfo for dealInfo in BboDDParTravLine.dealInfos.values() if dealInfo.ddTableResults is None]
+                if self not in pending:
+                    pending.append(self)
+                self.computeDDTables(pending)
+            return self.ddTableResults
         
-        def computeDDTable(self):
-            if self.Testing:
+        # the solver gets the DD tables for a list of DealInfos all at once
+        @classmethod
+        def computeDDTables(cls, dealInfos):
+            if cls.Testing:
                 return
-            self.cddTable = dds.ddTablesRes()
-            self.pres = dds.allParResults()
-
-            mode = 0
-            tFilter = ctypes.c_int * dds.DDS_STRAINS
-            trumpFilter = tFilter(0, 0, 0, 0, 0)
-            line = ctypes.create_string_buffer(80)
-
-            dds.SetMaxThreads(0)
-
-            res = dds.CalcAllTablesPBN(ctypes.pointer(self.DDdealsPBN), mode, trumpFilter, ctypes.pointer(self.cddTable), ctypes.pointer(self.pres))
-            table = ctypes.pointer(self.cddTable.results[0])
-            suits = 5
-            dirs = 4
-            self.pyddTable = [[0 for i in range(dirs)] for j in range(suits)]
-            for suitidx in range(suits):
-                for diridx in range(dirs):
-                    self.pyddTable[suitidx][diridx] = table.contents.resTable[suitidx][diridx]
-
+            solver = BboDDParTravLine.getSolver()
+            tables = solver.calcDDTables([dealInfo.pbnDealString for dealInfo in dealInfos])
+            for (dealInfo, tableResults) in zip(dealInfos, tables):
+                dealInfo.setDDTable(tableResults)
+
+        # every opening lead position, all strains by all declarers
+        leadPositions = [(strain, decl) for strain in 'SHDCN' for decl in 'NESW']
+
+        def getOptimumLeads(self, strain, decl):
+            if self.leadTable is None:
+                # like the DD tables, every board still waiting for its lead table is solved in the same batch
+                pending = [dealInfo for dealInfo in BboDDParTravLine.dealInfos.values() if dealInfo.leadTable is None]
+                if self not in pending:
+                    pending.append(self)
+                self.computeLeadTables(pending)
+            return self.leadTable[(strain, decl)]
+
+        # all 20 lead positions of each of a list of DealInfos go to the solver together
+        @classmethod
+        def computeLeadTables(cls, dealInfos):
+            if cls.Testing:
+                return
+            # the hand on declarer's left leads, where N=0, E=1, S=2, W=3
+            positions = [(dealInfo, strain, decl) for dealInfo in dealInfos for (strain, decl) in cls.leadPositions]
+            leads = [(dealInfo.pbnDealString, 'SHDCN'.index(strain), ('NESW'.index(decl) + 1) % 4)
+                     for (dealInfo, strain, decl) in positions]
+            for dealInfo in dealInfos:
+                dealInfo.leadTable = {}
+            for ((dealInfo, strain, decl), futs) in zip(positions, BboDDParTravLine.getSolver().solveLeads(leads)):
+                dealInfo.leadTable[(strain, decl)] = futs
+
+        def setDDTable(self, tableResults):
+            self.ddTableResults = tableResults
+            # indexed [suitidx][diridx]
+            self.pyddTable = [list(suitRow) for suitRow in self.ddTableResults.resTable]
 
         def getHandString(self):
             title = f'Board:{self.bdnum}    Vul:{self.getVulStr()}   Dlr:{self.getDealerStr()}'
             # call helper function with no title
-            handStr = functions.getHandStringPBN(None, self.DDdealsPBN.deals[0].cards)
+            handStr = functions.getHandStringPBN(None, self.pbnDealString.encode('utf-8'))
             handStr = BboBase.subSuitSym(handStr)
             return f'{title}\n{handStr}'
 
@@ -427,7 +475,7 @@ class BboDDParTravLine(BboTravLineBase):
         def printDDTableClassic(self):
             self.getDDTable()
             print('Table Classic\n-------')
-            functions.PrintTable(ctypes.pointer(self.cddTable.results[0]))
+            functions.PrintTable(ctypes.pointer(self.ddTableResults))
 
         def getDealerIndex(self):
             return (self.bdnum-1) % 4
@@ -450,54 +498,40 @@ class BboDDParTravLine(BboTravLineBase):
         # get raw score possible for a suit and level and double situation
         # given that dd computed we can take trix number of tricks
         def getRawScore(self, suit, level, dblFlag, player, trix):
-            downDblNotVulList = (0, 100, 300, 500, 800, 1100, 1400, 1700, 2000, 2300, 2600, 2900, 3200, 3500)
-            downDblVulList    = (0, 200, 500, 800, 1100, 1400, 1700, 2000, 2300, 2600, 2900, 3200, 3500, 3800)
-
-            vulIndex = self.getVulIndex()
-            isVul = vulIndex == 1 or (player in 'NS' and vulIndex == 2) or (player in 'EW' and vulIndex == 3)
-            # print(suit, level+6, trix, file=sys.stderr)
-            if trix < level+6:
-                # going down
-                down = (level+6) - trix
-                if dblFlag == 0:
-                    score = down * 50 if not isVul else down * 100
-                elif dblFlag == 1 or dblFlag == 2:
-                    downList = downDblNotVulList if not isVul else downDblVulList
-                    score = downList[down] * dblFlag
-                return -1*score
-            else:
-                # making something
-                gamebonus = 50
-                slambonus = 0
-                # making contract
-                overtrix = (trix-6) - level
-                ptsPerTrick = 20 if suit in 'DC' else 30
-                trickOneBonus = 10 if suit == 'N' else 0
-                bidTrickVal = (trickOneBonus + level * ptsPerTrick) * (2 ** dblFlag)
-                if dblFlag == 0:
-                    overTrickVal = overtrix * ptsPerTrick
-                else:
-                    overTrickVal = overtrix * (100 if not isVul else 200) * (dblFlag)
-                if bidTrickVal >= 100:
-                    gamebonus = 300 if not isVul else 500
-                if level == 6:
-                    slambonus = 500 if not isVul else 750
-                elif level == 7:
-                    slambonus = 1000 if not isVul else 1500
-                insultVal = 50 * dblFlag
-                return bidTrickVal + overTrickVal + gamebonus + slambonus + insultVal
+            return bboscore.rawScore(self.getVulIndex(), suit, level, dblFlag, player, trix)
 
         def getNSPar(self):
-            self.getDDTable()
-            if self.parResults is None:
-                self.computePar()
-            pcontents = ctypes.pointer(self.parResults).contents
-            return int(pcontents.score)
+            if self.nsPar is None:
+                # every other board still waiting for its par score is done at the same time
+                pending = [dealInfo for dealInfo in BboDDParTravLine.dealInfos.values() if dealInfo.nsPar is None]
+                if self not in pending:
+                    pending.append(self)
+                self.computeNSPars(pending)
+            return self.nsPar
+
+        # with numpy, bboparcalc gets the par scores for a list of DealInfos all at once,
+        # otherwise each one comes from its DealerPar
+        @staticmethod
+        def computeNSPars(dealInfos):
+            if bboparcalc is None:
+                for dealInfo in dealInfos:
+                    dealInfo.nsPar = int(dealInfo.computePar().score)
+                return
+            tricks = bboparcalc.tricksFromDDTables([dealInfo.getDDTable() for dealInfo in dealInfos])
+            dealers = [dealInfo.getDealerIndex() for dealInfo in dealInfos]
+            vuls = [dealInfo.getVulIndex() for dealInfo in dealInfos]
+            for (dealInfo, nsPar) in zip(dealInfos, bboparcalc.calcParScores(tricks, dealers, vuls)):
+                dealInfo.nsPar = int(nsPar)
         
+        # only done when the par contracts are needed, getNSPar alone does not need DealerPar
         def computePar(self):
-            self.getDDTable()
-            self.parResults = dds.parResultsDealer()
-            res = dds.DealerPar(ctypes.pointer(self.cddTable.results[0]), ctypes.pointer(self.parResults), self.getDealerIndex(), self.getVulIndex())
+            if self.parResults is None:
+                self.getDDTable()
+                solver = BboDDParTravLine.getSolver()
+                self.parResults = solver.dealerPar(self.pbnDealString, self.ddTableResults,
+                                                   self.getDealerIndex(), self.getVulIndex())
+                # pars come one at a time, save each one in any store
+                solver.flush()
             return self.parResults
         
         def printPar(self):
@@ -529,89 +563,67 @@ class BboDDParTravLine(BboTravLineBase):
             
     # inner class Deal
     class Deal(object):
-        # a set of 4 hands
+        # a set of 4 hands, plus the owner of each card by card index (see bbocards.py)
         def __init__(self, hands):
             self.hands = hands
             if len(hands) == 3:
                 # fill in missing hand (from BBO generally E)
                 missDir = (set('NSEW') - set(self.hands.keys())).pop()
-                missHand = self.Hand.allCards()
+                missMasks = [bbocards.fullSuit] * 4
                 for hand in self.hands.values():
-                    for i in range(len(hand.suits)):
-                        missHand.suits[i] -= hand.suits[i]
-                self.hands[missDir] = missHand
+                    for i in range(4):
+                        missMasks[i] &= ~hand.suitMasks[i]
+                self.hands[missDir] = self.Hand.fromSuitMasks(missMasks)
+            self.owner = [None] * 52
+            for (dir, hand) in self.hands.items():
+                for (suitIdx, mask) in enumerate(hand.suitMasks):
+                    for rankIdx in bbocards.maskRanks(mask):
+                        self.owner[13 * suitIdx + rankIdx] = dir
 
         def handOrder(self):
             return 'SWNE'
         
         def toPbnString(self):
-            result = 'S:'  # BBO deals always start with 'S'
-            for dir in self.handOrder():
-                sep = ' ' if dir != 'S' else ''
-                result += sep + self.hands[dir].toPbnString()
-            return result
+            # BBO deals always start with 'S'
+            return 'S:' + ' '.join([self.hands[dir].toPbnString() for dir in self.handOrder()])
 
         def getSuitIdx(self, suit):
-            return 'SHDC'.index(suit)
+            return bbocards.suitIdxs[suit]
             
-        def getCardSet(self, playerIdx, suit):
+        def getSuitMask(self, playerIdx, suit):
             # in dds, player indices are N=0, E=1, S=2, W=3
             dir = 'NESW'[playerIdx]
-            # within a hand, suits are always S, H, D, C
-            suitIdx = self.getSuitIdx(suit)
-            return self.hands[dir].suits[suitIdx]
+            return self.hands[dir].suitMasks[self.getSuitIdx(suit)]
 
         def playerHoldingCard(self, suit, rank):
-            # suit and rank are both strings
-            suitIdx = self.getSuitIdx(suit)
-            for dir in self.hands.keys():
-                if rank in self.hands[dir].suits[suitIdx]:
-                    return dir
-            # if we got this far, we didn't find it
-            return None
+            # suit and rank are both strings, None if no one has it
+            return self.owner[13 * self.getSuitIdx(suit) + bbocards.rankIdxs[rank]]
                     
         # inner class Deal.Hand
         class Hand(object):
-            def __init__(self):
-                self.suits = []
+            __slots__ = ('suitMasks',)
 
-            @staticmethod
-            def cardRank(c):
-                return '23456789TJQKA'.index(c)
+            def __init__(self):
+                self.suitMasks = []
 
             @classmethod
             def fromPbnHandStr(cls, handstr):
-                newHand = cls()
-                for suitstr in handstr.split('.'):
-                    newHand.suits.append(set(suitstr))
-                return newHand
+                return cls.fromSuitMasks(bbocards.handFromPbnStr(handstr))
 
             @classmethod
-            def fromSuitSets(cls, suitsets):
+            def fromSuitMasks(cls, suitMasks):
                 newHand = cls()
-                for suitset in suitsets:
-                    newHand.suits.append(suitset)
+                newHand.suitMasks = list(suitMasks)
                 return newHand
 
             @classmethod
             def allCards(cls):
-                newHand = cls()
-                for n in range(4):
-                    newHand.suits.append(set('23456789TJQKA'))
-                return newHand
+                return cls.fromSuitMasks([bbocards.fullSuit] * 4)
 
             def toPbnString(self):
-                result = ''
-                for (n, suit) in enumerate(self.suits):
-                    if n != 0:
-                        result = result + '.'
-                    result = result + ''.join(sorted(suit, reverse=True, key=self.cardRank))
-                return result
+                return bbocards.handToPbnStr(self.suitMasks)
 
             def __str__(self):
-                result = ''
-                for s in self.suits:
-                    result = result + f'{s} '
-                return result
+                return self.toPbnString()
 
 
@@ -27,6 +27,9 @@ class BboDDPlayReporter(BboBase):
     def addParserArgs(self, parser):
         pass
 
+    def resetRunState(self):
+        BboDDParTravLine.resetRunState()
+
     def childGenReport(self):
         BboDDParTravLine.importArgs(self.args)
         travellers = {}
@@ -37,14 +40,21 @@ class BboDDPlayReporter(BboBase):
             for row in self.travTableData[bdnum]:
                 tline = BboDDParTravLine(bdnum, row, self.travParser)
                 tline.checkAndAppend(travellers)
+        self.travellers = travellers
+        # the play analysis for every board to be printed is done in one batch
+        BboDDParTravLine.queuePlayAnalysis([tline for bdnum in travellers.keys() if self.boardNeedsOutput(bdnum)
+                                            for tline in travellers[bdnum]])
 
         for bdnum in range (1, self.args.boards + 1):
-            BboDDParTravLine.printHandPlusDDTable(bdnum)
-            for tline in travellers[bdnum]:
-                self.printPlayDetailsTable(bdnum, tline, addReplayButton=True)
-            print()
+            self.printBoardFragment(bdnum, self.printBoard)
         self.printHTMLClosing()
 
+    def printBoard(self, bdnum):
+        BboDDParTravLine.printHandPlusDDTable(bdnum)
+        for tline in self.travellers[bdnum]:
+            self.printPlayDetailsTable(bdnum, tline, addReplayButton=True)
+        print()
+
     def printPlayDetailsTable(self, bdnum, tline, addReplayButton=False):
         if self.args.debug:
             print(bdnum, tline.playerDir, tline.playCount, tline.playString, tline.claimed)
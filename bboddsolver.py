@@ -0,0 +1,549 @@
+import sys
+import os
+import ctypes
+import threading
+import queue
+import contextlib
+import collections
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append('./python-dds/examples')
+
+# only the structures, libdds itself is loaded the first time a DDS function is used
+import dds
+from bboddstore import DDStore, DDFixture
+import bbocards
+
+# layout of the DDS 2.9 DDSInfo struct, only used to find out how many threads DDS set up.
+# Other DDS versions may lay it out differently, so it is only trusted for this version (see DDSScheduler)
+class DDSInfo(ctypes.Structure):
+    layoutVersion = (2, 9)
+
+    _fields_ = [("major", ctypes.c_int),
+                ("minor", ctypes.c_int),
+                ("patch", ctypes.c_int),
+                ("versionString", ctypes.c_char * 10),
+                ("system", ctypes.c_int),
+                ("numBits", ctypes.c_int),
+                ("compiler", ctypes.c_int),
+                ("constructor", ctypes.c_int),
+                ("numCores", ctypes.c_int),
+                ("threading", ctypes.c_int),
+                ("noOfThreads", ctypes.c_int),
+                ("threadSizes", ctypes.c_char * 128),
+                ("systemString", ctypes.c_char * 1024),
+                # room for a later version's struct to be bigger without writing past the end
+                ("spare", ctypes.c_char * 1024)]
+
+# owns the DDS threads for the process.
+# SetMaxThreads is called once, and every DDS call goes thru here so that
+#   * single play analysis calls (AnalysePlayPBN) each get a DDS thread index
+#     that no other call is using, and run on a thread pool so several can be in flight at once
+#     (ctypes drops the GIL for the length of the call)
+#   * the batch calls (CalcAllTablesPBN, SolveAllBoards, AnalyseAllPlaysPBN), which use all
+#     the DDS threads themselves, wait until they have every thread index
+# The methods take the same arguments as the DDS functions, less the thread index, and return the DDS result code.
+# If the loaded libdds is not the version DDSInfo is laid out for, its noOfThreads can't be trusted,
+# so DDS is told to use fallbackThreads (from --ddThreads) instead.
+class DDSScheduler(object):
+    instance = None
+
+    @classmethod
+    def get(cls, fallbackThreads=1):
+        if cls.instance is None:
+            cls.instance = cls(fallbackThreads)
+        return cls.instance
+
+    def __init__(self, fallbackThreads=1):
+        dds.SetMaxThreads(0)
+        info = DDSInfo()
+        dds.dds.GetDDSInfo(ctypes.pointer(info))
+        if (info.major, info.minor) == DDSInfo.layoutVersion and info.noOfThreads > 0:
+            self.numThreads = info.noOfThreads
+        else:
+            # DDS never uses more threads than cores
+            self.numThreads = max(1, min(fallbackThreads, os.cpu_count() or 1))
+            print(f'can\'t read the number of DDS threads from libdds {info.major}.{info.minor}, '
+                  f'using {self.numThreads}', file=sys.stderr)
+            dds.SetMaxThreads(self.numThreads)
+        self.freeIndices = queue.Queue()
+        for threadIndex in range(self.numThreads):
+            self.freeIndices.put(threadIndex)
+        # so two batch calls can't each end up holding some of the indices
+        self.allThreadsLock = threading.Lock()
+        self.executor = None
+
+    @contextlib.contextmanager
+    def oneThread(self):
+        threadIndex = self.freeIndices.get()
+        try:
+            yield threadIndex
+        finally:
+            self.freeIndices.put(threadIndex)
+
+    @contextlib.contextmanager
+    def allThreads(self):
+        with self.allThreadsLock:
+            indices = [self.freeIndices.get() for n in range(self.numThreads)]
+        try:
+            yield
+        finally:
+            for threadIndex in indices:
+                self.freeIndices.put(threadIndex)
+
+    def submit(self, func, *args):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.numThreads)
+        return self.executor.submit(func, *args)
+
+    # ---- single play analysis, returns a future for the DDS result code
+
+    def submitAnalysePlayPBN(self, dlPBN, playPBN, solved):
+        return self.submit(self.analysePlayPBN, dlPBN, playPBN, solved)
+
+    def analysePlayPBN(self, dlPBN, playPBN, solved):
+        with self.oneThread() as threadIndex:
+            return dds.AnalysePlayPBN(dlPBN, playPBN, ctypes.pointer(solved), threadIndex)
+
+    # ---- batch calls, these run in the calling thread
+
+    def calcAllTablesPBN(self, dealsPBN, mode, trumpFilter, tablesRes, pres):
+        with self.allThreads():
+            return dds.CalcAllTablesPBN(ctypes.pointer(dealsPBN), mode, trumpFilter, ctypes.pointer(tablesRes), ctypes.pointer(pres))
+
+    def solveAllBoards(self, bopPBN, solved):
+        with self.allThreads():
+            return dds.SolveAllBoards(ctypes.pointer(bopPBN), ctypes.pointer(solved))
+
+    def analyseAllPlaysPBN(self, bopPBN, playsPBN, solved, chunkSize):
+        with self.allThreads():
+            return dds.AnalyseAllPlaysPBN(ctypes.pointer(bopPBN), ctypes.pointer(playsPBN), ctypes.pointer(solved), chunkSize)
+
+    # no DDS thread state is used
+    def dealerPar(self, tableResults, parResults, dealer, vul):
+        return dds.DealerPar(ctypes.pointer(tableResults), ctypes.pointer(parResults), dealer, vul)
+
+    def errorMessage(self, res):
+        line = ctypes.create_string_buffer(80)
+        dds.ErrorMessage(res, line)
+        return line.value.decode("utf-8")
+
+
+# The DD reporters get all their double dummy results from a solver object with these methods,
+# each taking and returning a list so a solver can batch the work however it likes:
+#   calcDDTables(pbnDeals) -> list of dds.ddTableResults
+#   dealerPar(pbnDeal, ddTable, dealer, vul) -> dds.parResultsDealer
+#   solveLeads(leads) -> list of dds.futureTricks for the opening lead, each lead is (pbnDeal, trump, first)
+#   analysePlays(plays) -> list of dds.solvedPlay, each play is (pbnDeal, trump, first, playCount, playString)
+# where trump is the index in SHDCN and first is the index in NESW of the hand on lead.
+# makeSolver picks the solver from the args.
+class DDSolverBase(ABC):
+    # result structure for each kind of result kept in a store or fixture
+    resultTypes = {
+        'ddtable' : dds.ddTableResults,
+        'par'     : dds.parResultsDealer,
+        'lead'    : dds.futureTricks,
+        'play'    : dds.solvedPlay,
+    }
+
+    # store keys are (dealKey, kind, subkey), the dealKey is just the pbn deal string
+    @staticmethod
+    def tableKey(pbnDeal):
+        return (pbnDeal, 'ddtable', '')
+
+    @staticmethod
+    def parKey(pbnDeal, dealer, vul):
+        return (pbnDeal, 'par', f'{dealer}{vul}')
+
+    @staticmethod
+    def leadKey(lead):
+        (pbnDeal, trump, first) = lead
+        return (pbnDeal, 'lead', f'{trump}{first}')
+
+    @staticmethod
+    def playKey(play):
+        (pbnDeal, trump, first, playCount, playString) = play
+        return (pbnDeal, 'play', f'{trump}{first}:{playString}')
+
+    @abstractmethod
+    def calcDDTables(self, pbnDeals):
+        pass
+
+    @abstractmethod
+    def dealerPar(self, pbnDeal, ddTable, dealer, vul):
+        pass
+
+    @abstractmethod
+    def solveLeads(self, leads):
+        pass
+
+    @abstractmethod
+    def analysePlays(self, plays):
+        pass
+
+    # write out anything not yet saved
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+# one node per position in the play trie of a deal, contract strain and opening leader,
+# the children are keyed by the card played next.
+# tricks is the DD tricks for declarer after the play that led here, as in solvedPlay.tricks
+class PlayTrieNode(object):
+    __slots__ = ('tricks', 'children')
+
+    def __init__(self):
+        self.tricks = None
+        self.children = {}
+
+    def child(self, card):
+        node = self.children.get(card)
+        if node is None:
+            node = self.children[card] = PlayTrieNode()
+        return node
+
+# the position at the start of a trick, enough to set up a dealPBN and turn
+# AnalysePlay tricks from there into declarer's DD tricks
+PlayPosition = collections.namedtuple('PlayPosition', 'remainCards, trump, leader, declWon, tricksLeft, declSide')
+
+# solves with libdds thru ctypes, using the batch calls with as few calls as possible
+class CtypesDDSolver(DDSolverBase):
+    # CalcAllTablesPBN solves 5 strains per table and at most MAXNOOFBOARDS strains per call
+    maxTablesPerCall = dds.MAXNOOFBOARDS // dds.DDS_STRAINS
+    # AnalyseAllPlaysPBN takes at most this many play traces per call
+    maxPlaysPerCall = len(dds.playTracesPBN().plays)
+
+    # like AnalysePlay, positions are only solved up to the start of the last trick
+    maxPlayPositions = 48
+
+    # fallbackThreads is only used if the number of DDS threads can't be read from libdds
+    def __init__(self, fallbackThreads=1):
+        self.fallbackThreads = fallbackThreads
+        self.scheduler = None
+        # pbnDeal -> (trump, first) -> root PlayTrieNode
+        self.playTries = {}
+
+    # libdds is loaded here, the first time anything is solved
+    def getScheduler(self):
+        if self.scheduler is None:
+            self.scheduler = DDSScheduler.get(self.fallbackThreads)
+        return self.scheduler
+
+    def checkResult(self, res):
+        if res != dds.RETURN_NO_FAULT:
+            print("DDS error {}".format(self.getScheduler().errorMessage(res)), file=sys.stderr)
+            sys.exit(1)
+
+    @staticmethod
+    def fillDealPBN(dlPBN, pbnDeal, trump, first):
+        dlPBN.trump = trump
+        dlPBN.first = first
+        for n in range(3):
+            dlPBN.currentTrickSuit[n] = dlPBN.currentTrickRank[n] = 0
+        dlPBN.remainCards = pbnDeal.encode('utf-8')
+
+    def calcDDTables(self, pbnDeals):
+        scheduler = self.getScheduler()
+        mode = -1   # no par from CalcAllTablesPBN, the dealer par is asked for separately
+        tFilter = ctypes.c_int * dds.DDS_STRAINS
+        trumpFilter = tFilter(0, 0, 0, 0, 0)
+        results = []
+        for start in range(0, len(pbnDeals), self.maxTablesPerCall):
+            chunk = pbnDeals[start : start + self.maxTablesPerCall]
+            DDdealsPBN = dds.ddTableDealsPBN()
+            DDdealsPBN.noOfTables = len(chunk)
+            for (i, pbnDeal) in enumerate(chunk):
+                DDdealsPBN.deals[i].cards = pbnDeal.encode('utf-8')
+            cddTables = dds.ddTablesRes()
+            pres = dds.allParResults()
+            self.checkResult(scheduler.calcAllTablesPBN(DDdealsPBN, mode, trumpFilter, cddTables, pres))
+            # copies, the batch results structure is large
+            results.extend(dds.ddTableResults.from_buffer_copy(cddTables.results[i]) for i in range(len(chunk)))
+        return results
+
+    def dealerPar(self, pbnDeal, ddTable, dealer, vul):
+        parResults = dds.parResultsDealer()
+        self.getScheduler().dealerPar(ddTable, parResults, dealer, vul)
+        return parResults
+
+    def solveLeads(self, leads):
+        scheduler = self.getScheduler()
+        target = -1
+        solutions = 2
+        mode = 0
+        results = []
+        for start in range(0, len(leads), dds.MAXNOOFBOARDS):
+            chunk = leads[start : start + dds.MAXNOOFBOARDS]
+            bopPBN = dds.boardsPBN()
+            solved = dds.solvedBoards()
+            bopPBN.noOfBoards = len(chunk)
+            for (i, (pbnDeal, trump, first)) in enumerate(chunk):
+                self.fillDealPBN(bopPBN.deals[i], pbnDeal, trump, first)
+                bopPBN.target[i] = target
+                bopPBN.solutions[i] = solutions
+                bopPBN.mode[i] = mode
+            self.checkResult(scheduler.solveAllBoards(bopPBN, solved))
+            results.extend(dds.futureTricks.from_buffer_copy(solved.solvedBoards[i]) for i in range(len(chunk)))
+        return results
+
+    # Many tables play a board in the same contract with the same start to the play, so rather than
+    # analyse each whole play, the DD tricks after each card are kept in a per-board trie of plays.
+    # Only the part of a play past what the trie already has is analysed, from the start of the
+    # trick where it branches off, and these suffixes all go to AnalyseAllPlaysPBN together.
+    # A play the trie cannot handle (eg. a card not in the hand on play) is analysed whole
+    # with AnalyseAllPlaysPBN, just as before.
+    def analysePlays(self, plays):
+        walks = [self.walkPlay(play) for play in plays]
+        # each unsolved node is analysed for the first play that reaches it
+        claimed = set()
+        suffixes = []
+        for (play, walk) in zip(plays, walks):
+            if walk is None:
+                continue
+            (nodes, positions) = walk
+            todo = [k for (k, node) in enumerate(nodes) if node.tricks is None and node not in claimed]
+            if len(todo) == 0:
+                continue
+            claimed.update(nodes[todo[0]:])
+            start = todo[0] - todo[0] % 4
+            (pbnDeal, trump, first, playCount, playString) = play
+            suffixes.append((nodes[start:], positions[start // 4], playString[2*start : 2*playCount]))
+        self.analyseSuffixes(suffixes)
+
+        wholePlays = [play for (play, walk) in zip(plays, walks) if not self.walkSolved(walk)]
+        wholeResults = iter(self.analyseWholePlays(wholePlays))
+        results = []
+        for walk in walks:
+            if not self.walkSolved(walk):
+                results.append(next(wholeResults))
+                continue
+            nodes = walk[0]
+            solved = dds.solvedPlay()
+            solved.number = len(nodes)
+            for (k, node) in enumerate(nodes):
+                solved.tricks[k] = node.tricks
+            results.append(solved)
+        return results
+
+    @staticmethod
+    def walkSolved(walk):
+        return walk is not None and all(node.tricks is not None for node in walk[0])
+
+    # returns (nodes, positions) for a play, nodes are the trie nodes after each card
+    # (the first is before any card is played) and positions the PlayPosition at the start of each trick.
+    # None if some card is not in the hand of the player on play
+    def walkPlay(self, play):
+        (pbnDeal, trump, first, playCount, playString) = play
+        node = self.playTries.setdefault(pbnDeal, {}).setdefault((trump, first), PlayTrieNode())
+        # hands[dir][suit] as suit masks, dir in NESW, suit in SHDC
+        hands = [None] * 4
+        firstDir = 'NESW'.index(pbnDeal[0])
+        for (i, handStr) in enumerate(pbnDeal[2:].split()):
+            hands[(firstDir + i) % 4] = bbocards.handFromPbnStr(handStr)
+        # declarer is on the leader's right
+        declSide = (first + 1) % 2
+        leader = first
+        trick = []
+        declWon = 0
+        nodes = []
+        positions = []
+        for k in range(min(playCount, self.maxPlayPositions) + 1):
+            if k > 0:
+                card = playString[2*k-2 : 2*k]
+                suit = bbocards.suitIdxs[card[0]]
+                cardBit = 1 << bbocards.rankIdxs[card[1]]
+                player = (leader + len(trick)) % 4
+                if hands[player][suit] & cardBit == 0:
+                    return None
+                hands[player][suit] &= ~cardBit
+                trick.append(card)
+                if len(trick) == 4:
+                    leader = (leader + trick.index(bbocards.trickWinner(trick, trump))) % 4
+                    if leader % 2 == declSide:
+                        declWon += 1
+                    trick = []
+                node = node.child(card)
+            nodes.append(node)
+            if k % 4 == 0:
+                remainCards = 'N:' + ' '.join([bbocards.handToPbnStr(hand) for hand in hands])
+                positions.append(PlayPosition(remainCards, trump, leader, declWon, 13 - k // 4, declSide))
+        return (nodes, positions)
+
+    # AnalysePlay counts tricks from the suffix start for the side on the right of its leader,
+    # turn that into declarer's DD tricks for the whole play
+    @staticmethod
+    def positionTricks(position, tricks):
+        if (position.leader + 1) % 2 == position.declSide:
+            return position.declWon + tricks
+        return position.declWon + position.tricksLeft - tricks
+
+    # each suffix is (nodes, position, playString) where the nodes and playString start at the position,
+    # any suffix DDS cannot analyse leaves its nodes unsolved
+    def analyseSuffixes(self, suffixes):
+        if len(suffixes) == 0:
+            return
+        scheduler = self.getScheduler()
+        for start in range(0, len(suffixes), self.maxPlaysPerCall):
+            chunk = suffixes[start : start + self.maxPlaysPerCall]
+            plays = [(position.remainCards, position.trump, position.leader, len(playString) // 2, playString)
+                     for (nodes, position, playString) in chunk]
+            bopPBN = dds.boardsPBN()
+            DDplaysPBN = dds.playTracesPBN()
+            solved = dds.solvedPlays()
+            self.fillPlaysPBN(bopPBN, DDplaysPBN, plays)
+            chunkSize = 1
+            res = scheduler.analyseAllPlaysPBN(bopPBN, DDplaysPBN, solved, chunkSize)
+            if res == dds.RETURN_NO_FAULT:
+                solvedList = [solved.solved[i] for i in range(len(chunk))]
+            else:
+                # one bad play trace fails the whole call, so do this chunk one suffix at a time
+                print("DDS error {}, analysing suffixes singly".format(scheduler.errorMessage(res)), file=sys.stderr)
+                submitted = [self.submitPlay(scheduler, play) for play in plays]
+                solvedList = [solvedPlay if future.result() == dds.RETURN_NO_FAULT else None
+                              for (future, solvedPlay) in submitted]
+            for ((nodes, position, playString), solvedPlay) in zip(chunk, solvedList):
+                if solvedPlay is None:
+                    continue
+                for k in range(min(solvedPlay.number, len(nodes))):
+                    nodes[k].tricks = self.positionTricks(position, solvedPlay.tricks[k])
+
+    def fillPlaysPBN(self, bopPBN, DDplaysPBN, plays):
+        bopPBN.noOfBoards = DDplaysPBN.noOfBoards = len(plays)
+        for (i, (pbnDeal, trump, first, playCount, playString)) in enumerate(plays):
+            self.fillDealPBN(bopPBN.deals[i], pbnDeal, trump, first)
+            DDplaysPBN.plays[i].number = playCount
+            DDplaysPBN.plays[i].cards = playString.encode('utf-8')
+
+    # AnalyseAllPlaysPBN on each whole play
+    def analyseWholePlays(self, plays):
+        scheduler = self.getScheduler()
+        results = []
+        for start in range(0, len(plays), self.maxPlaysPerCall):
+            chunk = plays[start : start + self.maxPlaysPerCall]
+            bopPBN = dds.boardsPBN()
+            DDplaysPBN = dds.playTracesPBN()
+            solved = dds.solvedPlays()
+            self.fillPlaysPBN(bopPBN, DDplaysPBN, chunk)
+            chunkSize = 1
+            res = scheduler.analyseAllPlaysPBN(bopPBN, DDplaysPBN, solved, chunkSize)
+            if res != dds.RETURN_NO_FAULT:
+                # one bad play trace fails the whole call, so do this chunk one play at a time,
+                # the plays still run side by side on the DDS threads
+                print("DDS error {}, analysing lines singly".format(scheduler.errorMessage(res)), file=sys.stderr)
+                submitted = [self.submitPlay(scheduler, play) for play in chunk]
+                for (future, solvedPlay) in submitted:
+                    future.result()
+                    results.append(solvedPlay)
+            else:
+                results.extend(dds.solvedPlay.from_buffer_copy(solved.solved[i]) for i in range(len(chunk)))
+        return results
+
+    # starts the analysis of a single play on a DDS thread,
+    # returns (future, solvedPlay), the solvedPlay is filled in once the future is done
+    def submitPlay(self, scheduler, play):
+        (pbnDeal, trump, first, playCount, playString) = play
+        dlPBN = dds.dealPBN()
+        DDplayPBN = dds.playTracePBN()
+        solved = dds.solvedPlay()
+        self.fillDealPBN(dlPBN, pbnDeal, trump, first)
+        DDplayPBN.number = playCount
+        DDplayPBN.cards = playString.encode('utf-8')
+        return (scheduler.submitAnalysePlayPBN(dlPBN, DDplayPBN, solved), solved)
+
+# serves results recorded earlier (see --ddRecord) and never solves anything,
+# so the DD reports can be run without libdds and always give the same output
+class ReplayDDSolver(DDSolverBase):
+    def __init__(self, fixture):
+        self.fixture = fixture
+
+    def lookup(self, key):
+        (dealKey, kind, subkey) = key
+        data = self.fixture.get(dealKey, kind, subkey)
+        if data is None:
+            print(f'no recorded {kind} result in {self.fixture.fname} for {dealKey} {subkey}', file=sys.stderr)
+            sys.exit(1)
+        return self.resultTypes[kind].from_buffer_copy(data)
+
+    def calcDDTables(self, pbnDeals):
+        return [self.lookup(self.tableKey(pbnDeal)) for pbnDeal in pbnDeals]
+
+    def dealerPar(self, pbnDeal, ddTable, dealer, vul):
+        return self.lookup(self.parKey(pbnDeal, dealer, vul))
+
+    def solveLeads(self, leads):
+        return [self.lookup(self.leadKey(lead)) for lead in leads]
+
+    def analysePlays(self, plays):
+        return [self.lookup(self.playKey(play)) for play in plays]
+
+# wraps another solver, results found in the store are used as is and only
+# the rest are passed on to the other solver, whose results are then saved in the store.
+# The store is a DDStore or a DDFixture.
+class CachingDDSolver(DDSolverBase):
+    def __init__(self, solver, store):
+        self.solver = solver
+        self.store = store
+
+    def load(self, key):
+        (dealKey, kind, subkey) = key
+        data = self.store.get(dealKey, kind, subkey)
+        return None if data is None else self.resultTypes[kind].from_buffer_copy(data)
+
+    # solveFunc is the wrapped solver's method for this kind of result
+    def cached(self, items, keyFunc, solveFunc):
+        keys = [keyFunc(item) for item in items]
+        results = [self.load(key) for key in keys]
+        missing = [i for (i, result) in enumerate(results) if result is None]
+        if len(missing) > 0:
+            solved = solveFunc([items[i] for i in missing])
+            for (i, result) in zip(missing, solved):
+                results[i] = result
+                self.store.put(*keys[i], result)
+            self.flush()
+        return results
+
+    def calcDDTables(self, pbnDeals):
+        return self.cached(pbnDeals, self.tableKey, self.solver.calcDDTables)
+
+    # pars come one at a time, they are saved by the next flush
+    def dealerPar(self, pbnDeal, ddTable, dealer, vul):
+        key = self.parKey(pbnDeal, dealer, vul)
+        result = self.load(key)
+        if result is None:
+            result = self.solver.dealerPar(pbnDeal, ddTable, dealer, vul)
+            self.store.put(*key, result)
+        return result
+
+    def solveLeads(self, leads):
+        return self.cached(leads, self.leadKey, self.solver.solveLeads)
+
+    def analysePlays(self, plays):
+        return self.cached(plays, self.playKey, self.solver.analysePlays)
+
+    def flush(self):
+        self.store.commit()
+        self.solver.flush()
+
+    def close(self):
+        self.store.close()
+        self.solver.close()
+
+# --ddBackend picks the solver that does the work, the on-disk DD store caches
+# its results (except for replay, which has them all already),
+# and --ddRecord saves every result given to the reporter in a fixture for replay
+def makeSolver(args):
+    if args.ddBackend == 'replay':
+        if args.ddFixture is None or not os.path.exists(args.ddFixture):
+            print(f'replay backend needs an existing --ddFixture file, got {args.ddFixture}', file=sys.stderr)
+            sys.exit(1)
+        solver = ReplayDDSolver(DDFixture(args.ddFixture))
+    else:
+        solver = CtypesDDSolver(args.ddThreads)
+        store = DDStore.fromArgs(args)
+        if store is not None:
+            solver = CachingDDSolver(solver, store)
+    if args.ddRecord is not None:
+        solver = CachingDDSolver(solver, DDFixture(args.ddRecord))
+    return solver
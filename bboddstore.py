@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import sqlite3
+
+# on-disk store of double dummy results so a deal is only ever solved once.
+# Results are keyed by the deal key (the pbn deal string), a kind ('ddtable', 'par', 'lead', 'play')
+# and a subkey within that kind (eg. dealer+vulnerability for a par, strain+leader for a lead),
+# see DDSolverBase in bboddsolver.py.
+# The data is just the bytes of the DDS result structure, so this module knows nothing about DDS.
+class DDStore(object):
+    storeFileName = '.bbodd.sqlite'
+    # bump this if the key or data layout changes, old stores are then ignored and rebuilt
+    formatVersion = 2
+
+    def __init__(self, fname):
+        self.fname = fname
+        self.conn = sqlite3.connect(fname, timeout=30)
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != self.formatVersion:
+            with self.conn:
+                self.conn.execute('DROP TABLE IF EXISTS ddresults')
+                self.conn.execute(f'PRAGMA user_version = {self.formatVersion}')
+        with self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS ddresults '
+                              '(dealKey TEXT, kind TEXT, subkey TEXT, data BLOB, PRIMARY KEY (dealKey, kind, subkey))')
+        self.pending = []
+
+    @classmethod
+    def fromArgs(cls, args):
+        if args.noDDStore:
+            return None
+        fname = args.ddStore if args.ddStore is not None else os.path.join(args.dir, cls.storeFileName)
+        try:
+            return cls(fname)
+        except sqlite3.Error as ex:
+            print(f'cannot use DD store {fname}: {ex}', file=sys.stderr)
+            return None
+
+    def get(self, dealKey, kind, subkey=''):
+        row = self.conn.execute('SELECT data FROM ddresults WHERE dealKey = ? AND kind = ? AND subkey = ?',
+                                (dealKey, kind, subkey)).fetchone()
+        return None if row is None else row[0]
+
+    # puts are only written by commit, which callers do after each batch of solver results
+    def put(self, dealKey, kind, subkey, data):
+        self.pending.append((dealKey, kind, subkey, bytes(data)))
+
+    def commit(self):
+        if len(self.pending) == 0:
+            return
+        try:
+            with self.conn:
+                self.conn.executemany('INSERT OR REPLACE INTO ddresults VALUES (?, ?, ?, ?)', self.pending)
+        except sqlite3.Error as ex:
+            print(f'could not write DD store {self.fname}: {ex}', file=sys.stderr)
+        self.pending = []
+
+    def close(self):
+        self.commit()
+        self.conn.close()
+
+# the same get/put/commit as DDStore but kept in a json file (data in hex) that is
+# meant to be checked in, for the replay solver (--ddBackend replay --ddFixture)
+# A fixture is written with --ddRecord, a run adds to the fixture if it already exists.
+# The data is the raw bytes of the ctypes result structs (ddTableResults, parResultsDealer, ...),
+# so a fixture is tied to the struct layouts in dds.py and has to be recorded again
+# if those change (see ddreplaytest.py --record for the one in testdata/replay).
+class DDFixture(object):
+    def __init__(self, fname):
+        self.fname = fname
+        self.results = {}
+        if os.path.exists(fname):
+            with open(fname) as f:
+                self.results = json.load(f)
+        self.changed = False
+
+    def get(self, dealKey, kind, subkey=''):
+        data = self.results.get(dealKey, {}).get(kind, {}).get(subkey)
+        return None if data is None else bytes.fromhex(data)
+
+    def put(self, dealKey, kind, subkey, data):
+        self.results.setdefault(dealKey, {}).setdefault(kind, {})[subkey] = bytes(data).hex()
+        self.changed = True
+
+    def commit(self):
+        if not self.changed:
+            return
+        tmpName = f'{self.fname}.tmp'
+        with open(tmpName, 'w') as f:
+            json.dump(self.results, f, indent=1, sort_keys=True)
+        os.replace(tmpName, self.fname)
+        self.changed = False
+
+    def close(self):
+        self.commit()
@@ -0,0 +1,55 @@
+import sys
+import collections
+
+# structured form of a BBO LIN string, built in one pass over the string.
+#   players: names from the pn record, in LIN order (S, W, N, E)
+#   dealer:  dealer digit from the md record (1=S, 2=W, 3=N, 4=E) or None
+#   hands:   the three hands given in the md record (always S, W, N) as pbn hand strings
+#   bids:    the mb records, upper case with any alert marks (! or %21) removed
+#   plays:   the pc records (cards played) up to any zz record
+#   playString: the same cards joined into one pbn play string (eg. SAS3S4SQ)
+#   claim:   tricks claimed in the mc record, or None
+LinRecord = collections.namedtuple('LinRecord', ['players', 'dealer', 'hands', 'bids', 'plays', 'playString', 'claim'])
+
+# md hands look like SAK2HQ3D85CJT964, the suit letters become pbn separators
+mdHandTrans = str.maketrans({'S' : '', 'H' : '.', 'D' : '.', 'C' : '.'})
+
+def isLinKey(token):
+    return len(token) == 2 and token.isalpha() and token.islower()
+
+def parseLin(linStr):
+    players = ()
+    dealer = None
+    hands = ()
+    bids = []
+    plays = []
+    claim = None
+    tokens = linStr.split('|')
+    # LIN is key|value|key|value..., find the first key (the string might start with a '|')
+    idx = 0
+    while idx < len(tokens) and not isLinKey(tokens[idx]):
+        idx += 1
+    while idx + 1 < len(tokens):
+        key = tokens[idx]
+        val = tokens[idx + 1]
+        idx += 2
+        if key == 'pc':
+            # intern cards so all the lines share the same 52 strings
+            plays.append(sys.intern(val))
+        elif key == 'mb':
+            bid = val.replace('%21', '').replace('!', '').upper()
+            bids.append(sys.intern(bid))
+        elif key == 'mc':
+            if claim is None:
+                claim = int(val)
+        elif key == 'md':
+            if val[0:1].isdigit():
+                dealer = int(val[0])
+                val = val[1:]
+            hands = tuple(val.translate(mdHandTrans).strip(' ').split(',')[0:3])
+        elif key == 'pn':
+            players = tuple(val.split(','))
+        elif key == 'zz':
+            # anything after a zz record is not part of this hand
+            break
+    return LinRecord(players, dealer, hands, tuple(bids), tuple(plays), ''.join(plays), claim)
@@ -0,0 +1,139 @@
+# par scores and par contracts for many deals at once, computed with numpy from their DD tables.
+# This gives the same results as DDS DealerPar (see parcalctest.py) without a ctypes call per deal,
+# so a whole archive of deals can be done in one go.
+#
+# tricks is an (N, 5, 4) array of DD tricks, indexed like ddTableResults.resTable,
+# ie. strain in SHDCN order and declarer in NESW order.
+# dealer is an N array of dealer indexes (NESW), vul an N array of vulnerabilities as in DDS
+# (0 None, 1 Both, 2 N/S, 3 E/W, the same as DealInfo.getVulIndex).
+# Scores are always from N/S's point of view unless said otherwise.
+
+import numpy
+import bboscore
+
+ddsStrains = 'SHDCN'
+hands = 'NESW'
+sideSeats = ((0, 2), (1, 3))
+
+# the 35 contracts in bidding order, 1C up to 7N, with their level and strain (index in bboscore.strains)
+numRanks = 35
+rankLevels = numpy.arange(numRanks) // 5 + 1
+rankStrains = numpy.arange(numRanks) % 5
+rankDDSStrains = numpy.array([ddsStrains.index(bboscore.strains[strain]) for strain in range(5)])[rankStrains]
+
+# whether each seat is vulnerable, by vul
+seatVulTable = numpy.array([[bboscore.vulTable[vul][hand] for hand in hands] for vul in range(4)])
+
+# beyond any real score, for the best score of an empty set of contracts
+noScore = 100000
+
+# the better of two scores for a side (0 for N/S, 1 for E/W), side can be an array
+def better(side, a, b):
+    return numpy.where(side == 0, numpy.maximum(a, b), numpy.minimum(a, b))
+
+# (N, 35, 4) score each seat gets (from its own side's point of view) declaring each contract,
+# doubled if it goes down and undoubled if it makes
+def declarerScores(tricks, vul):
+    tricks = numpy.asarray(tricks)
+    rankTricks = tricks[:, rankDDSStrains, :]
+    levels = rankLevels[None, :, None]
+    dblFlags = (rankTricks < levels + 6).astype(int)
+    seatVul = seatVulTable[numpy.asarray(vul)][:, None, :]
+    return bboscore.rawScores(seatVul, rankStrains[None, :, None], levels, dblFlags, rankTricks)
+
+# (N, 35, 2) best N/S score when each side declares each contract (the better of its two declarers)
+def sideScores(seatScores):
+    return numpy.stack([numpy.maximum(seatScores[:, :, 0], seatScores[:, :, 2]),
+                        -numpy.maximum(seatScores[:, :, 1], seatScores[:, :, 3])], axis=2)
+
+# the par scores by backward induction over the 35 contracts.
+# values[:, k, s] is the result once side s has bid contract k and the other side is to act:
+# the other side either passes (s plays it) or bids the best of the contracts above k,
+# after which it is s's turn in the same way.
+def parScores(scores, dealer):
+    n = scores.shape[0]
+    bestBid = [numpy.full(n, -noScore), numpy.full(n, noScore)]
+    for k in range(numRanks - 1, -1, -1):
+        values = [better(1, scores[:, k, 0], bestBid[1]), better(0, scores[:, k, 1], bestBid[0])]
+        for side in (0, 1):
+            bestBid[side] = better(side, bestBid[side], values[side])
+    # the dealer's side gets first go, either side can pass the chance to bid to the other
+    # until all four hands have passed
+    dealerSide = numpy.asarray(dealer) % 2
+    otherSide = 1 - dealerSide
+    sideBest = numpy.stack(bestBid, axis=1)
+    dealerBest = numpy.take_along_axis(sideBest, dealerSide[:, None], axis=1)[:, 0]
+    otherBest = numpy.take_along_axis(sideBest, otherSide[:, None], axis=1)[:, 0]
+    par = better(otherSide, otherBest, 0)
+    par = better(dealerSide, dealerBest, par)
+    par = better(otherSide, otherBest, par)
+    return better(dealerSide, dealerBest, par)
+
+# a par contract is the lowest level in each strain where a side gets the par score
+# and the other side has no higher contract that would score better for them.
+# Returns a list per deal of (level, strain, declarers, dblFlag, overtricks) tuples,
+# strain is the letter in CDHSN and declarers the seats (eg. 'N' or 'NS') that get the par score,
+# overtricks is negative for undertricks.
+def parContracts(tricks, seatScores, scores, par):
+    n = scores.shape[0]
+    # best score for each side from the contracts above each contract
+    bestAbove = numpy.empty_like(scores)
+    bestAbove[:, numRanks - 1, 0] = -noScore
+    bestAbove[:, numRanks - 1, 1] = noScore
+    for k in range(numRanks - 2, -1, -1):
+        for side in (0, 1):
+            bestAbove[:, k, side] = better(side, bestAbove[:, k + 1, side], scores[:, k + 1, side])
+    parCol = par[:, None]
+    isPar = numpy.stack([(scores[:, :, 0] == parCol) & (bestAbove[:, :, 1] >= parCol),
+                         (scores[:, :, 1] == parCol) & (bestAbove[:, :, 0] <= parCol)], axis=2)
+    nsSeatScores = seatScores * numpy.array([1, -1, 1, -1])
+    contracts = [[] for i in range(n)]
+    seen = set()
+    for (deal, k, side) in zip(*numpy.nonzero(isPar)):
+        (level, strain) = (int(rankLevels[k]), int(rankStrains[k]))
+        if (deal, side, strain) in seen:
+            continue
+        seen.add((deal, side, strain))
+        seats = [seat for seat in sideSeats[side] if nsSeatScores[deal, k, seat] == par[deal]]
+        trix = int(tricks[deal, rankDDSStrains[k], seats[0]])
+        dblFlag = 1 if trix < level + 6 else 0
+        declarers = ''.join([hands[seat] for seat in seats])
+        contracts[deal].append((level, bboscore.strains[strain], declarers, dblFlag, trix - 6 - level))
+    # in the same order as DealerPar
+    for dealContracts in contracts:
+        dealContracts.sort(key=contractOrder)
+    return contracts
+
+def contractOrder(contract):
+    (level, strain, declarers, dblFlag, overtricks) = contract
+    # sacrifices by strain, making contracts by most tricks then the higher strain
+    strainIdx = bboscore.strainIdxs[strain]
+    return (strainIdx, ) if dblFlag else (-(level + overtricks), -strainIdx)
+
+# the best each side can do declaring on its own (in its best strain and level, doubled if down),
+# from that side's point of view, as an (N, 2) array
+def sideBestScores(scores):
+    return numpy.stack([scores[:, :, 0].max(axis=1), -scores[:, :, 1].min(axis=1)], axis=1)
+
+# a par contract in the same form as the DDS contract strings, eg. 4S-NS+1 or 3N*-E-2
+def contractString(contract):
+    (level, strain, declarers, dblFlag, overtricks) = contract
+    dblStr = '*' if dblFlag else ''
+    overStr = '' if overtricks == 0 else f'{overtricks:+}'
+    return f'{level}{strain}{dblStr}-{declarers}{overStr}'
+
+# the tricks array from a list of dds.ddTableResults
+def tricksFromDDTables(ddTables):
+    return numpy.array([[list(row) for row in ddTable.resTable] for ddTable in ddTables])
+
+# just the par scores
+def calcParScores(tricks, dealer, vul):
+    return parScores(sideScores(declarerScores(tricks, vul)), dealer)
+
+# everything at once, returns (par scores, par contracts, side best scores)
+def calcPars(tricks, dealer, vul):
+    tricks = numpy.asarray(tricks)
+    seatScores = declarerScores(tricks, vul)
+    scores = sideScores(seatScores)
+    par = parScores(scores, dealer)
+    return (par, parContracts(tricks, seatScores, scores, par), sideBestScores(scores))
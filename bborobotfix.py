@@ -7,7 +7,6 @@ import bbobase
 
 gibName = 'GiB'
 vsstr = ' vs. '
-robotData = {}
 
 
 class BboRobotFixer(object):
@@ -32,7 +31,7 @@ class BboRobotFixer(object):
 
         if self.args.debug:
             print('----- snapshot of robotData ----')
-            print(robotData)
+            print(self.robotData)
 
         # this maps a robot score to a list of possible keysets
         # ideally this maps to 1 (0 or >1 would be an error)
@@ -76,8 +75,10 @@ class BboRobotFixer(object):
 
 
     def initRobotData(self):
+        # robotData is per fixer so separate runs never share it
+        self.robotData = {}
         for rndnum in range(1, int(self.args.boards/self.args.bpr) + 1):
-            robotData[rndnum] = {}
+            self.robotData[rndnum] = {}
 
 
     def addRobotScores(self, bdnum, row, dir):
@@ -86,14 +87,14 @@ class BboRobotFixer(object):
         rndnum = int((bdnum-1)/self.args.bpr) + 1
         oppdir = 'East' if dir == 'North' else 'North'
         key = f'{dir}{vsstr}{row[oppdir].lower()}'
-        if robotData[rndnum].get(key) == None:
-            robotData[rndnum][key] = []
+        if self.robotData[rndnum].get(key) == None:
+            self.robotData[rndnum][key] = []
         # add the score
         fscore = float(row['Score'][:-1])  # strip % sign off end
         if dir == 'East':
             fscore = 100.0 - fscore
-        robotData[rndnum][key].append(fscore)
-        # print(bdnum, dir, robotData)
+        self.robotData[rndnum][key].append(fscore)
+        # print(bdnum, dir, self.robotData)
 
     def buildRobotData(self, bdnum, row):
         # only do this if one of the two pairs is a robot pair
@@ -116,7 +117,7 @@ class BboRobotFixer(object):
         # use itertools to get all the combinations
         keysets = []
         for rndnum in range(1, int(self.args.boards/self.args.bpr) + 1):
-            keysets.append(list(robotData[rndnum].keys()))
+            keysets.append(list(self.robotData[rndnum].keys()))
         if self.args.debug:
             pprint(keysets)
 
@@ -134,7 +135,7 @@ class BboRobotFixer(object):
         rndnum = 1
         scores = []
         for key in keylist:
-            scores.extend(robotData[rndnum][key])
+            scores.extend(self.robotData[rndnum][key])
             rndnum += 1
         avg = round(sum(scores) / len(scores), 2)
         return avg
@@ -0,0 +1,78 @@
+# duplicate bridge contract scores, all computed once at import into
+#    scoreTable[vul][strain][level][dblFlag][tricks]
+# vul is 1 if the declaring side is vulnerable, else 0
+# strain is the index in 'CDHSN' (the same order as rankedSuits in bbobidparcalc)
+# level is 1-7 (level 0 is all zeros, like a passout)
+# dblFlag is 0 undoubled, 1 doubled, 2 redoubled
+# tricks is the number taken by declarer, 0-13
+# Scores are from the declaring side's point of view, negative when going down.
+# If numpy is available the same table is also scoreArray, for vectorized lookups with rawScores.
+
+# numpy is only needed for the vectorized lookups
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+strains = 'CDHSN'
+strainIdxs = {suit : i for (i, suit) in enumerate(strains)}
+
+# per undertrick doubled, for the 1st, 2nd and 3rd, 4th on
+downDblNotVul = (100, 200, 200, 300)
+downDblVul    = (200, 300, 300, 300)
+
+def downScore(vul, down, dblFlag):
+    if dblFlag == 0:
+        return down * (100 if vul else 50)
+    perTrick = downDblVul if vul else downDblNotVul
+    return dblFlag * sum([perTrick[min(n, 3)] for n in range(down)])
+
+def makeScore(vul, strain, level, dblFlag, tricks):
+    suit = strains[strain]
+    ptsPerTrick = 20 if suit in 'CD' else 30
+    contractPts = (level * ptsPerTrick + (10 if suit == 'N' else 0)) * (2 ** dblFlag)
+    overtricks = tricks - 6 - level
+    if dblFlag == 0:
+        overtrickPts = overtricks * ptsPerTrick
+    else:
+        overtrickPts = overtricks * (200 if vul else 100) * dblFlag
+    if contractPts >= 100:
+        gameBonus = 500 if vul else 300
+    else:
+        gameBonus = 50
+    slamBonus = {6 : (500, 750), 7 : (1000, 1500)}.get(level, (0, 0))[vul]
+    insult = 50 * dblFlag
+    return contractPts + overtrickPts + gameBonus + slamBonus + insult
+
+def tableScore(vul, strain, level, dblFlag, tricks):
+    if level == 0:
+        return 0
+    if tricks < level + 6:
+        return -downScore(vul, level + 6 - tricks, dblFlag)
+    return makeScore(vul, strain, level, dblFlag, tricks)
+
+scoreTable = [[[[[tableScore(vul, strain, level, dblFlag, tricks) for tricks in range(14)]
+                 for dblFlag in range(3)]
+                for level in range(8)]
+               for strain in range(len(strains))]
+              for vul in range(2)]
+
+scoreArray = None if numpy is None else numpy.array(scoreTable, dtype=numpy.int32)
+
+# vulIndex as in DealInfo.getVulIndex (0 None, 1 Both, 2 N/S, 3 E/W),
+# player a direction or a pair (eg. 'N' or 'NS')
+def isVul(vulIndex, player):
+    return vulIndex == 1 or (vulIndex == 2 and player in 'NS') or (vulIndex == 3 and player in 'EW')
+
+# vulIndex -> player -> 0/1 vul for the table
+vulTable = [{player : int(isVul(vulIndex, player)) for player in ['N', 'E', 'S', 'W', 'NS', 'EW']} for vulIndex in range(4)]
+
+def rawScore(vulIndex, suit, level, dblFlag, player, tricks):
+    return scoreTable[vulTable[vulIndex][player]][strainIdxs[suit]][level][dblFlag][tricks]
+
+# vectorized lookup, each argument is an index or a numpy array of indices
+# (broadcast together as usual), returns the numpy array of scores
+def rawScores(vul, strain, level, dblFlag, tricks):
+    if scoreArray is None:
+        raise RuntimeError('vectorized score lookups need numpy')
+    return scoreArray[vul, strain, level, dblFlag, tricks]
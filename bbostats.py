@@ -56,11 +56,12 @@ class BboStatsReporter(BboBase):
             for row in self.travTableData[bdnum]:
                 tline = BboStatsTravLine(bdnum, row, self.travParser)
                 # print(f'bdnum={bdnum}')
-                # pprint(tline.__dict__)
+                # pprint(tline.slotDict())
                 # for now, we really only need North and East
-                for player in tline.playerDir[:2]:
-                    playerIdx = tline.playerDir.index(player)
-                    pard = tline.playerDir[(playerIdx+2)%4]
+                playerDir = tline.playerDir
+                for player in playerDir[:2]:
+                    playerIdx = playerDir.index(player)
+                    pard = playerDir[(playerIdx+2)%4]
                     # if names are specified check whether player or his partner are in names, skip if not
                     if self.args.names is not None and player not in self.args.names and pard not in self.args.names:
                         continue
@@ -90,7 +91,7 @@ class BboStatsReporter(BboBase):
                         bucketNames.append(f'All {gameStr}')
 
                     # append oppName buckets
-                    oppNames = f'vs. {tline.playerDir[(playerIdx + 1) % 2]} + {tline.playerDir[(playerIdx + 1) % 2 + 2]}'
+                    oppNames = f'vs. {playerDir[(playerIdx + 1) % 2]} + {playerDir[(playerIdx + 1) % 2 + 2]}'
                     bucketNames.append(oppNames)
 
                     for bucketName in bucketNames:
@@ -155,11 +156,14 @@ class BboStatsReporter(BboBase):
                     
         
 class BboStatsTravLine(BboTravLineBase):
+    __slots__ = ()
+
     def __init__(self, bdnum, row, travParser):
         super(BboStatsTravLine, self).__init__(bdnum, row, travParser)
         # nothing added here
 
 #-------- main stuff starts here -----------
 
-BboStatsReporter().genReport()
+if __name__ == '__main__':
+    BboStatsReporter().genReport()
 
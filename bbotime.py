@@ -25,12 +25,6 @@ from abc import ABC, abstractmethod
 
 from bbobase import BboBase, BboTravLineBase
 
-map = {}
-players = {}
-partners = {}
-opps = {}
-noPlays = {}
-
 class BboTimeReporter(BboBase):
     def appDescription(self):
         return 'BBO Tourney Time Analysis'
@@ -55,20 +49,13 @@ class BboTimeReporter(BboBase):
     def childStyleInfo(self):
         return (GridGen.styleInfo())
 
-    def noPlaysInit(self):
-        for player in players:
-            noPlays[player] = set()
-            
-    def noPlaysAdd(self, player, bdnum):
-        noPlays[player].add(bdnum)
-
     def tournDesc(self):
         rounds = int(self.args.boards/self.args.bpr)
         return f'{self.args.tstart}, {self.args.boards} Boards, {rounds} Rounds of {self.args.bpr}' 
 
     def createSummaryGen(self, sumName):
         sumGenClass = globals()[f'{sumName}SummaryGen']
-        return sumGenClass(self.args)
+        return sumGenClass(self.args, self.timing)
     
     def childGenReport(self):
         # check whether these datafiles support the time field which we need
@@ -76,43 +63,19 @@ class BboTimeReporter(BboBase):
             print(f'ERROR: The data files in {self.args.dir} do not support the Time Field, which we need', file=sys.stderr)
             sys.exit(1)
             
-        self.initMap()
-
         # at this point the robot names are fixed up if they could be
         # so proceed as if there was no duplication of names
         BboTimeTravLine.importArgs(self.args)
-        
-        for bdnum in range (1, self.args.boards + 1):
-            # place rows in big table indexed by boardnumber and North and East names
-            for row in self.travTableData[bdnum]:
-                self.addToMaps(bdnum, row)
-
-        self.noPlaysInit()
-
-        # With all files processed and in maps, go thru list of BboTimeTravLine objects
-        # and compute WaitEndTime (for end of round tlines)
-        # North and East point to same BboTimeTravLine object so only need to do one.
-        for bdnum in range (1, self.args.boards + 1):
-            # note only needed for end of round records and don't need last one
-            if bdnum % self.args.bpr == 0 and bdnum != self.args.boards:
-                for player in map[bdnum].keys():
-                    tline = map[bdnum][player]
-                    if player == tline.origNorth:
-                        tline.computeWaitEndTime()
 
-        # now startTimes
-        # and while we're at it, count noplays
+        # index 0 is unused so boards can be indexed by bdnum
+        tlinesByBoard = [[]]
         for bdnum in range (1, self.args.boards + 1):
-            for player in map[bdnum].keys():
-                tline = map[bdnum][player]
-                if player == tline.origNorth:
-                    tline.addStartTime()
-                    tline.iElapsed = tline.elapsed()
-                if tline.isNoPlay:
-                    self.noPlaysAdd(player, bdnum)
+            tlinesByBoard.append([BboTimeTravLine(bdnum, row, self.travParser) for row in self.travTableData[bdnum]])
+        self.timing = TournamentTiming(self.args, tlinesByBoard)
+        self.timing.computeUnclocked()
 
         if self.args.debug:
-            self.printMap()
+            self.timing.printMap()
 
         self.printHTMLOpening()
 
@@ -121,59 +84,9 @@ class BboTimeReporter(BboBase):
             summaryGen.printSummary(f'\nUnclocked Report for {self.tournDesc()}, {sumName} View')
         
         if self.args.simclocked:
-            self.noPlaysInit()
-            #  compute endTime using clocked algorithm
-            nextEndTime = {}
-
-            # for first board of each round, redo startTimes
-            for bdnum in range (1, self.args.boards + 1):
-                if bdnum % self.args.bpr == 1:
-                    bdnumFirstInRound = bdnum
-                    for player in map[bdnum].keys():
-                        tline = map[bdnum][player]
-                        tline.addStartTime()
-                        nextEndTime[player] = tline.iStartTime             
-
-                # for first and other boards, update iEndTime using existing iElapsed
-                for player in map[bdnum].keys(): 
-                    tline = map[bdnum][player]
-                    unclockedEndTime = nextEndTime[player] + tline.iElapsed * 60
-                    roundStartTime = map[bdnumFirstInRound][player].iStartTime
-                    clockedEndTimeLimit = roundStartTime + self.args.minsPerBoard * self.args.bpr * 60
-                    nextEndTime[player] = min(unclockedEndTime, clockedEndTimeLimit)
-                    tline.iEndTime = nextEndTime[player]
-                    if clockedEndTimeLimit < unclockedEndTime:
-                        if self.args.debug:
-                            print('exceed clocked time limit:', bdnum, player, (unclockedEndTime-roundStartTime)/60, (clockedEndTimeLimit-roundStartTime)/60)
-                        tline.iElapsed -= (unclockedEndTime - clockedEndTimeLimit)/60
-                        tline.clockedTruncation = True
-                        self.noPlaysAdd(player, bdnum)
-                        # also add the opponent since we won't come thru here for them
-                        self.noPlaysAdd(opps[bdnum][player], bdnum)
-                    if tline.isNoPlay:
-                        self.noPlaysAdd(player, bdnum)
-                        # also add the opponent since we won't come thru here for them
-                        self.noPlaysAdd(opps[bdnum][player], bdnum)
-                        
-                    if self.args.debug:
-                        print(f'bdnum {bdnum}, player {player}, {tline}')
-
-                # if it's the last board in the round, now have proper iEndTime
-                # and we can compute WaitEndTime for last tline in Round
-                if bdnum % self.args.bpr == 0:
-                    for player in map[bdnum].keys(): 
-                        tline = map[bdnum][player]
-                        if player == tline.origNorth:            
-                            # print(bdnum, player, (tline.iEndTime-roundStartTime)/60)
-                            tline.computeWaitEndTime(clockedAlg=True)
-
-                if False and bdnum == self.args.boards:
-                    for player in players:
-                        if len(noPlays[player]) > 0:
-                            print(player, noPlays[player], file=sys.stderr)
-                    
+            self.timing.simulateClocked()
             if self.args.debug:
-                self.printMap()
+                self.timing.printMap()
 
             for sumName in self.args.summaryType:
                 # get a new summaryGen because total tourney time might have changed
@@ -182,71 +95,239 @@ class BboTimeReporter(BboBase):
 
         self.printHTMLClosing()
 
-    def initMap(self):
-        for n in range(1, self.args.boards+1):
-            map[n] = {}
-            opps[n] = {}
 
+# All the timing state for one tournament, so several can be analyzed in one process.
+# Pairs (named by their original North or East player) get integer ids in name order,
+# and the tables of each board are numbered in traveller row order, so everything is in dense lists:
+#   per board x table, [bdnum][table]   (the two pairs at a table share these)
+#     tlines, northIds, eastIds, startTime, endTime, waitEndTime (secs), elapsed (mins),
+#     clockedTruncation, noPlay
+#   per board x pair, [bdnum][pair]
+#     tableOf  the pair's table, opps  the opponent's pair id
+#   per round x pair, [rnd-1][pair]    (built by buildRoundArrays, for the summaries)
+#     roundMins, waitMins, roundMarked (truncated or no play on the last board), roundTable
+# Index 0 of the board lists is unused so they can be indexed by bdnum.
+class TournamentTiming(object):
+    def __init__(self, args, tlinesByBoard):
+        self.args = args
+        self.boards = args.boards
+        self.bpr = args.bpr
+        self.rounds = int(args.boards / args.bpr)
+        self.pairNames = sorted(set([name for tlines in tlinesByBoard for tline in tlines
+                                     for name in (tline.origNorth, tline.origEast)]))
+        self.pairIds = {name : pair for (pair, name) in enumerate(self.pairNames)}
+        self.numPairs = len(self.pairNames)
+
+        self.tlines = tlinesByBoard
+        self.northIds = [[self.pairIds[tline.origNorth] for tline in tlines] for tlines in tlinesByBoard]
+        self.eastIds = [[self.pairIds[tline.origEast] for tline in tlines] for tlines in tlinesByBoard]
+        self.tableOf = [[None] * self.numPairs for tlines in tlinesByBoard]
+        self.opps = [[None] * self.numPairs for tlines in tlinesByBoard]
+        for bdnum in range(1, self.boards + 1):
+            for (table, (north, east)) in enumerate(zip(self.northIds[bdnum], self.eastIds[bdnum])):
+                self.tableOf[bdnum][north] = self.tableOf[bdnum][east] = table
+                self.opps[bdnum][north] = east
+                self.opps[bdnum][east] = north
+
+        self.endTime = [[tline.iEndTime for tline in tlines] for tlines in tlinesByBoard]
+        # for end of round boards this will be adjusted later
+        self.waitEndTime = [list(endTimes) for endTimes in self.endTime]
+        self.startTime = [[None] * len(tlines) for tlines in tlinesByBoard]
+        self.elapsed = [[None] * len(tlines) for tlines in tlinesByBoard]
+        self.clockedTruncation = [[False] * len(tlines) for tlines in tlinesByBoard]
+        self.noPlay = [[False] * len(tlines) for tlines in tlinesByBoard]
+
+    # (table, pair) for both pairs at each table of a board, in row order
+    def boardPairs(self, bdnum):
+        return [(table, pair) for (table, (north, east)) in enumerate(zip(self.northIds[bdnum], self.eastIds[bdnum]))
+                for pair in (north, east)]
+
+    def tableRange(self, bdnum):
+        return range(len(self.tlines[bdnum]))
+
+    # the normal unclocked times, from the end times in the travellers
+    def computeUnclocked(self):
+        # compute WaitEndTime for end of round tables, don't need the last one
+        for bdnum in range (1, self.boards + 1):
+            if bdnum % self.bpr == 0 and bdnum != self.boards:
+                for table in self.tableRange(bdnum):
+                    self.computeWaitEndTime(bdnum, table)
 
-    def addToMaps(self, bdnum, row):
-        tline = BboTimeTravLine(bdnum, row, self.travParser)
-        map[bdnum][tline.origNorth] = tline
-        map[bdnum][tline.origEast] = tline
-        players[tline.origNorth] = 1
-        players[tline.origEast] = 1
-        opps[bdnum][tline.origNorth] = tline.origEast
-        opps[bdnum][tline.origEast] = tline.origNorth
+        # now startTimes
+        # and while we're at it, count noplays
+        for bdnum in range (1, self.boards + 1):
+            for table in self.tableRange(bdnum):
+                self.addStartTime(bdnum, table)
+                self.elapsed[bdnum][table] = (self.endTime[bdnum][table] - self.startTime[bdnum][table]) / 60
+                if self.tlines[bdnum][table].isNoPlay:
+                    self.noPlay[bdnum][table] = True
+        self.buildRoundArrays()
+
+    # recompute the end times as if each round had been clocked at minsPerBoard per board
+    def simulateClocked(self):
+        self.noPlay = [[False] * len(tlines) for tlines in self.tlines]
+        #  compute endTime using clocked algorithm
+        nextEndTime = [None] * self.numPairs
+        for bdnum in range (1, self.boards + 1):
+            # for first board of each round, redo startTimes
+            if bdnum % self.bpr == 1:
+                bdnumFirstInRound = bdnum
+                for (table, pair) in self.boardPairs(bdnum):
+                    self.addStartTime(bdnum, table)
+                    nextEndTime[pair] = self.startTime[bdnum][table]
+
+            # for first and other boards, update endTime using existing elapsed
+            for (table, pair) in self.boardPairs(bdnum):
+                unclockedEndTime = nextEndTime[pair] + self.elapsed[bdnum][table] * 60
+                roundStartTime = self.startTime[bdnumFirstInRound][self.tableOf[bdnumFirstInRound][pair]]
+                clockedEndTimeLimit = roundStartTime + self.args.minsPerBoard * self.bpr * 60
+                nextEndTime[pair] = min(unclockedEndTime, clockedEndTimeLimit)
+                self.endTime[bdnum][table] = nextEndTime[pair]
+                if clockedEndTimeLimit < unclockedEndTime:
+                    if self.args.debug:
+                        print('exceed clocked time limit:', bdnum, self.pairNames[pair], (unclockedEndTime-roundStartTime)/60, (clockedEndTimeLimit-roundStartTime)/60)
+                    self.elapsed[bdnum][table] -= (unclockedEndTime - clockedEndTimeLimit)/60
+                    self.clockedTruncation[bdnum][table] = True
+                    self.noPlay[bdnum][table] = True
+                if self.tlines[bdnum][table].isNoPlay:
+                    self.noPlay[bdnum][table] = True
+
+                if self.args.debug:
+                    print(f'bdnum {bdnum}, player {self.pairNames[pair]}, {self.tableStr(bdnum, table)}')
 
+            # if it's the last board in the round, now have proper endTime
+            # and we can compute WaitEndTime for last board in Round
+            if bdnum % self.bpr == 0:
+                for table in self.tableRange(bdnum):
+                    self.computeWaitEndTime(bdnum, table, clockedAlg=True)
+        self.buildRoundArrays()
+
+    # for end of round tables, compute dependencies
+    def computeWaitEndTime(self, bdnum, table, clockedAlg=False):
+        if clockedAlg:
+            # just include everyone as a dependency
+            self.waitEndTime[bdnum][table] = max(self.endTime[bdnum])
+            return
+        # normal unclocked logic, compute dependencies
+        north = self.northIds[bdnum][table]
+        # find our opp for next round and add that to the deps list
+        deps = {north : 1, self.opps[bdnum+1][north] : 1}
+        # in the normal algorithm a pair cannot advance unless it current opps can also advance
+        anotherPass = True
+        while anotherPass:
+            startlen = len(deps.keys())
+            if self.args.debug and bdnum / self.bpr == 1:
+                print('before', self.depsNames(deps))
+            newdeps = {}
+            for dep in deps.keys():
+                thisRoundOpp = self.opps[bdnum][dep]
+                thisRoundOppsNextOpp = self.opps[bdnum+1][thisRoundOpp]
+                newdeps[thisRoundOpp] = 1
+                newdeps[thisRoundOppsNextOpp] = 1
+            deps.update(newdeps)
+            anotherPass = len(deps.keys()) > startlen
+            if self.args.debug and bdnum / self.bpr == 1:
+                print('after', self.depsNames(deps))
+
+        # now find the maximum end time for the list of deps
+        for dep in deps.keys():
+            self.waitEndTime[bdnum][table] = max(self.waitEndTime[bdnum][table], self.endTime[bdnum][self.tableOf[bdnum][dep]])
+
+    def depsNames(self, deps):
+        return {self.pairNames[dep] : 1 for dep in deps.keys()}
+
+    # addStartTime just uses prev round's end time, + any wait time for first boards in round
+    def addStartTime(self, bdnum, table):
+        if bdnum == 1:
+            self.startTime[bdnum][table] = BboTimeTravLine.readTime(self.args.tstart)
+        else:
+            prevTable = self.tableOf[bdnum-1][self.northIds[bdnum][table]]
+            self.startTime[bdnum][table] = self.waitEndTime[bdnum-1][prevTable]
+
+    def tableWaitMins(self, bdnum, table):
+        return int((self.waitEndTime[bdnum][table] - self.endTime[bdnum][table]) / 60)
+
+    # the per round arrays the summaries use
+    def buildRoundArrays(self):
+        self.roundMins = []
+        self.waitMins = []
+        self.roundMarked = []
+        self.roundTable = []
+        for rnd in range(1, self.rounds + 1):
+            bdnumLastInRound = rnd * self.bpr
+            bdnumFirstInRound = bdnumLastInRound - self.bpr + 1
+            firstTables = self.tableOf[bdnumFirstInRound]
+            lastTables = self.tableOf[bdnumLastInRound]
+            self.roundMins.append([int((self.endTime[bdnumLastInRound][lastTables[pair]] - self.startTime[bdnumFirstInRound][firstTables[pair]]) / 60)
+                                   for pair in range(self.numPairs)])
+            self.waitMins.append([self.tableWaitMins(bdnumLastInRound, lastTables[pair]) for pair in range(self.numPairs)])
+            self.roundMarked.append([self.clockedTruncation[bdnumLastInRound][lastTables[pair]] or self.tlines[bdnumLastInRound][lastTables[pair]].isNoPlay
+                                     for pair in range(self.numPairs)])
+            self.roundTable.append(list(firstTables))
+        self.numNoPlays = [0] * self.numPairs
+        for bdnum in range(1, self.boards + 1):
+            for (table, pair) in self.boardPairs(bdnum):
+                if self.noPlay[bdnum][table]:
+                    self.numNoPlays[pair] += 1
+
+    # used to get total length of tournament
+    def getElapsedMins(self, startRound, endRound):
+        startBoard = ((startRound - 1) * self.bpr) + 1
+        miniStartTime = min(self.startTime[startBoard])
+        maxiEndTime = max(self.endTime[self.boards])
+        return int(maxiEndTime - miniStartTime)/60
+
+    def showtime(self, itime):
+        return(time.strftime('%H:%M', time.localtime(itime)))
+
+    def tableStr(self, bdnum, table):
+        mystr = ('N:%15s, E:%15s, Start:%5s, End:%5s, Elapsed:%2d, Wait:%2d' % (self.pairNames[self.northIds[bdnum][table]],
+                                                                                self.pairNames[self.eastIds[bdnum][table]],
+                                                                                self.showtime(self.startTime[bdnum][table]),
+                                                                                self.showtime(self.endTime[bdnum][table]),
+                                                                                self.elapsed[bdnum][table],
+                                                                                self.tableWaitMins(bdnum, table)))
+        return mystr
 
     def printMap(self):
-        for bdnum in range(1, self.args.boards+1):
-            for k in sorted(map[bdnum].keys()):
-                print(bdnum, map[bdnum][k])
+        for bdnum in range(1, self.boards+1):
+            for pair in range(self.numPairs):
+                table = self.tableOf[bdnum][pair]
+                if table is not None:
+                    print(bdnum, self.tableStr(bdnum, table))
 
 
 class SummaryGenBase(ABC):
-    def __init__(self, args):
+    colors = ['cyan', 'pink', 'lightgreen', 'yellow', 'plum', 'orange']
+
+    def __init__(self, args, timing):
         self.args = args
-        self.numpairs = len(players)
-        self.rounds = int(self.args.boards/self.args.bpr)
-        self.tournElapsedMins = int(self.getElapsedMins(1, self.rounds))
+        self.timing = timing
+        self.numpairs = timing.numPairs
+        self.rounds = timing.rounds
+        self.tournElapsedMins = int(timing.getElapsedMins(1, self.rounds))
         self.rowNum = 1
         
     def printSummary(self, title):
         print(title)
         self.setupSummary()
         self.addHeaderInfo()
-        self.buildColorDicts()
-        for (pidx, p) in enumerate(sorted(players.keys())):
-            self.addPersonInfo(p, pidx)
+        for pidx in range(self.numpairs):
+            self.addPersonInfo(self.timing.pairNames[pidx], pidx)
         print(self.renderSummary())
         
-    def buildColorDicts(self):
-        # for each round figure out colors
-        self.colorDicts = []
-        for rnd in range(1, self.rounds + 1):
-            bdnum = (rnd-1) * self.args.bpr + 1
-            thisColorDict = {}
-            colors = ['cyan', 'pink', 'lightgreen', 'yellow', 'plum', 'orange']
-            colorIndex = 0
-            for player in map[bdnum].keys():
-                tline = map[bdnum][player]
-                if player not in thisColorDict.keys():
-                    thisColorDict[tline.origNorth] = thisColorDict[tline.origEast] = colors[colorIndex]
-                    colorIndex += 1
-            self.colorDicts.append(thisColorDict)
-        
     def addPersonInfo(self, player, pidx):
         totalPlay = 0
         totalWait = 0
         maxWait = 0
+        timing = self.timing
         for rnd in range(1, self.rounds + 1):
-            roundMins = self.roundElapsedMins(rnd, player)
-            tlineLastInRound = map[rnd * self.args.bpr][player]
-            waitMins = tlineLastInRound.waitMins()
+            roundMins = timing.roundMins[rnd-1][pidx]
+            waitMins = timing.waitMins[rnd-1][pidx]
             totalPlay += roundMins
             totalWait += waitMins
-            myColor = self.colorDicts[rnd-1][player]
+            # each table in the round's first board gets its own color
+            myColor = self.colors[timing.roundTable[rnd-1][pidx]]
             # if last round, check totals and increase last wait if needed
             # for now, we don't want to include this extra time in totalWait or maxWait
             if self.args.incLastRoundWait and rnd == self.rounds and (totalPlay + totalWait) < self.tournElapsedMins:
@@ -254,43 +335,12 @@ class SummaryGenBase(ABC):
                 waitMins += waitDelta
                 totalWait += waitDelta
             maxWait = max(maxWait, waitMins)
-            self.putPlayerRoundInfo(player, pidx, rnd, roundMins, waitMins, tlineLastInRound, myColor)
-
-        self.addPairNameAndTotals(pidx, player, totalPlay, totalWait, maxWait, len(noPlays[player]))
-        
-    # return elapsedTime and waitTime for that round for a given player
-    def roundElapsedMins(self, rnd, player):
-        bdnumLastInRound = rnd * self.args.bpr
-        bdnumFirstInRound = bdnumLastInRound - self.args.bpr + 1
-        return int((map[bdnumLastInRound][player].iEndTime - map[bdnumFirstInRound][player].iStartTime) / 60)
+            self.putPlayerRoundInfo(player, pidx, rnd, roundMins, waitMins, timing.roundMarked[rnd-1][pidx], myColor)
 
-    # used to get total length of tournament
-    def getElapsedMins(self, startRound, endRound):
-        iStartTimes = []
-        iEndTimes = []
-        startBoard = ((startRound - 1) * self.args.bpr) + 1
-        endBoard = endRound * self.args.bpr
-        # get min start
-        for player in map[startBoard].keys():
-            tline = map[startBoard][player]
-            iStartTimes.append(tline.iStartTime)
-        miniStartTime = min(iStartTimes)
+        self.addPairNameAndTotals(pidx, player, totalPlay, totalWait, maxWait, timing.numNoPlays[pidx])
         
-        # get max end
-        for player in map[self.args.boards].keys():
-            tline = map[self.args.boards][player]
-            iEndTimes.append(tline.iEndTime)
-        maxiEndTime = max(iEndTimes)
-        elapsedMins = int(maxiEndTime - miniStartTime)/60
-        if False:
-            print(iEndTimes)
-            print(maxiEndTime, miniStartTime)
-            print(elapsedMins)
-        return elapsedMins
-            
-    
     @abstractmethod
-    def putPlayerRoundInfo(self, player, pidx, rnd, roundMins, waitMins, tlineLastInRound, myColor):
+    def putPlayerRoundInfo(self, player, pidx, rnd, roundMins, waitMins, marked, myColor):
         pass
     
     def fixHtml(self, tableHtml):
@@ -351,10 +401,10 @@ class TableSummaryGen(SummaryGenBase):
         
         return tableHtml
 
-    def putPlayerRoundInfo(self, player, pidx, rnd, roundMins, waitMins, tlineLastInRound, myColor):
+    def putPlayerRoundInfo(self, player, pidx, rnd, roundMins, waitMins, marked, myColor):
         row = self.hdrRows + pidx * self.args.rowsPerPlayer
         col = rnd
-        specialChar = '*' if tlineLastInRound.clockedTruncation or tlineLastInRound.isNoPlay else ' '
+        specialChar = '*' if marked else ' '
         # add a background-color in the cell data which will later be moved into the <td> element
         # this works better than using span
         self.tab[row][col] = f'background-color:{myColor} {int(roundMins):2}{specialChar}+{int(waitMins):2}'
@@ -374,15 +424,13 @@ class GridSummaryGenBase(SummaryGenBase):
         self.html = ''
         self.html += self.gridGen.gridOpen(self.getColTemplate())
         # data structs that will hold playerRoundInfo
-        self.roundTuples = {}
-        for p in players.keys():
-            self.roundTuples[p] = []
+        self.roundTuples = [[] for pidx in range(self.numpairs)]
         
         
-    def putPlayerRoundInfo(self, player, pidx, rnd, roundMins, waitMins, tlineLastInRound, myColor):
-        specialChar = '*' if tlineLastInRound.clockedTruncation or tlineLastInRound.isNoPlay else ' '
+    def putPlayerRoundInfo(self, player, pidx, rnd, roundMins, waitMins, marked, myColor):
+        specialChar = '*' if marked else ' '
         # append a 4-tuple for this player
-        self.roundTuples[player].append((myColor, roundMins, waitMins, specialChar))
+        self.roundTuples[pidx].append((myColor, roundMins, waitMins, specialChar))
         
     def renderSummary(self):
         self.html += self.gridGen.gridClose()
@@ -397,10 +445,10 @@ class GridSummaryGenBase(SummaryGenBase):
         # when this is called, all RoundTuples for this player are complete
         # so we can call gridGen to do a row
         if False:
-            print(player, self.roundTuples[player])
+            print(player, self.roundTuples[pidx])
             sys.exit(1)
         addLabels = not self.args.noRoundLabels
-        rowHtml = self.gridRow(player, self.roundTuples[player], f'{int(totalPlay):3} + {int(totalWait):2}', maxWait, numNoPlays, addLabels)
+        rowHtml = self.gridRow(player, self.roundTuples[pidx], f'{int(totalPlay):3} + {int(totalWait):2}', maxWait, numNoPlays, addLabels)
         self.html += rowHtml
 
     @abstractmethod
@@ -601,72 +649,13 @@ class GridGen(object):
         return s + '\n'
 
 # traveller line specialization for bbotime
+# the times deduced from it are kept in TournamentTiming
 class BboTimeTravLine(BboTravLineBase):
+    __slots__ = ('iEndTime',)
+
     def __init__(self, bdnum, row, travParser):
         super(BboTimeTravLine, self).__init__(bdnum, row, travParser)
-        self.iEndTime = self.readTime(self.row['Time'])
-        self.waitEndTime = self.iEndTime  # for end of round records this will be adjusted later
-        self.clockedTruncation = False
-        
-    # for end of round tlines, compute dependenciesx
-    def computeWaitEndTime(self, clockedAlg=False):
-        deps = {}
-        if clockedAlg:
-            self.waitEndTime = 0  # will be computed from iEndTimes below
-            # just include everyone as a dependency
-            for player in map[self.bdnum].keys():
-                deps[player] = 1
-        else:
-            # normal unclocked logic, compute dependencies
-            deps[self.origNorth] = 1
-            # find our opp for next round and add that to the deps list
-            nextRoundOpp = opps[self.bdnum+1][self.origNorth]
-            deps[nextRoundOpp] = 1
-            # in the normal algorithm a pair cannot advance unless it current opps can also advance
-            anotherPass = True
-            while anotherPass:
-                startlen = len(deps.keys())
-                if self.args.debug and self.bdnum / self.args.bpr == 1:
-                    print('before', deps)
-                newdeps = {}
-                for dep in deps.keys():
-                    thisRoundOpp = opps[self.bdnum][dep]
-                    thisRoundOppsNextOpp = opps[self.bdnum+1][thisRoundOpp]
-                    newdeps[thisRoundOpp] = 1
-                    newdeps[thisRoundOppsNextOpp] = 1
-                deps.update(newdeps)
-                anotherPass = len(deps.keys()) > startlen
-                if self.args.debug and self.bdnum / self.args.bpr == 1:
-                    print('after', deps)
-
-        # now find the maximum end time for the list of deps
-        for dep in deps.keys():
-            self.waitEndTime = max(self.waitEndTime, map[self.bdnum][dep].iEndTime)
-
-                
-    # addStartTime just uses prev round's end time, + any wait time for first boards in round
-    def addStartTime(self):
-        if self.bdnum == 1:
-            self.iStartTime = self.readTime(self.args.tstart)
-        else:
-            prevTravNorth = map[self.bdnum-1][self.origNorth]
-            self.iStartTime = prevTravNorth.waitEndTime
-
-    def waitMins(self):
-        return int((self.waitEndTime - self.iEndTime) / 60)
-                
-    def showtime(self, itime):
-        return(time.strftime('%H:%M', time.localtime(itime)))
-
-    def elapsed(self):
-        return (self.iEndTime - self.iStartTime)/60
-        
-    def __str__(self):
-        mystr = ('N:%15s, E:%15s, Start:%5s, End:%5s, Elapsed:%2d, Wait:%2d' % (self.origNorth, self.origEast,
-                                                                                self.showtime(self.iStartTime),
-                                                                                self.showtime(self.iEndTime),
-                                                                                self.iElapsed, self.waitMins() ))
-        return mystr
+        self.iEndTime = self.readTime(row['Time'])
 
     
 #-------- main stuff starts here -----------
@@ -0,0 +1,123 @@
+import os
+import sys
+import pickle
+import hashlib
+
+# on-disk cache of the parsed traveller rows for a --dir.
+# The cache entry is only used if every source file the parser would read
+# still has the same path, size, mtime and content hash, so a later reporter run
+# against the same directory can skip the html/csv parsing entirely.
+# An entry records both the boards it holds (a run can ask for fewer with --boards)
+# and the number of boards in the source files, and only a complete entry can
+# supply the board count for a run that doesn't give --boards.
+class TravCache(object):
+    cacheFileName = '.bbotrav.cache'
+    # bump this if the layout of the rows or the cache entry changes
+    formatVersion = 2
+
+    def __init__(self, args, travParser):
+        self.args = args
+        self.travParser = travParser
+        self.fname = args.cacheFile if args.cacheFile is not None else os.path.join(args.dir, self.cacheFileName)
+        self.hits = 0
+        self.misses = 0
+        self.entry = None
+        self.checked = False
+
+    @staticmethod
+    def fingerprint(fname):
+        st = os.stat(fname)
+        with open(fname, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        return (os.path.abspath(fname), st.st_size, st.st_mtime_ns, digest)
+
+    def sourceFingerprints(self):
+        return [self.fingerprint(fname) for fname in self.travParser.getSourceFiles()]
+
+    def report(self, msg):
+        if self.args.cacheStats:
+            print(f'trav cache {msg}', file=sys.stderr)
+
+    def readCacheFile(self):
+        with open(self.fname, 'rb') as f:
+            contents = pickle.load(f)
+        if contents.get('version') != self.formatVersion:
+            raise ValueError('old format version')
+        return contents['entries']
+
+    # load and validate the cache entry (once), leaves self.entry None if not usable
+    # the file holds one entry per parser cache key (eg. csv parsed with or without tstart)
+    def checkEntry(self):
+        if self.checked:
+            return self.entry
+        self.checked = True
+        if self.args.refreshCache:
+            self.report(f'refresh requested, ignoring {self.fname}')
+            return None
+        try:
+            entries = self.readCacheFile()
+        except FileNotFoundError:
+            self.report(f'no cache file {self.fname}')
+            return None
+        except Exception as ex:
+            self.report(f'unreadable cache file {self.fname}: {ex}')
+            return None
+
+        entry = entries.get(self.travParser.getCacheKey())
+        if entry is None:
+            self.report('no entry for these args')
+        elif self.args.boards is not None and entry['boards'] != self.args.boards:
+            self.report(f'entry has {entry["boards"]} boards, want {self.args.boards}')
+        elif self.args.boards is None and entry['boards'] != entry['sourceBoards']:
+            self.report(f'entry has only {entry["boards"]} of {entry["sourceBoards"]} boards')
+        elif entry['sources'] != self.sourceFingerprints():
+            self.report('source files have changed')
+        else:
+            self.entry = entry
+        return self.entry
+
+    def getNumBoards(self):
+        entry = self.checkEntry()
+        return None if entry is None else entry['boards']
+
+    # fill travTableData from the cache, returns True on a hit
+    def load(self, travTableData):
+        entry = self.checkEntry()
+        if entry is None:
+            self.misses += 1
+            self.report(f'miss for {self.args.dir}')
+            return False
+        for bdnum in travTableData.keys():
+            travTableData[bdnum].extend(entry['travTableData'].get(bdnum, []))
+        if entry['title'] is not None:
+            self.args.title = entry['title']
+        self.travParser.setCacheState(entry['parserState'])
+        self.hits += 1
+        self.report(f'hit for {self.args.dir} ({len(entry["sources"])} source files)')
+        return True
+
+    def save(self, travTableData):
+        entry = {
+            'boards' : self.args.boards,
+            'sourceBoards' : self.travParser.getNumBoards(),
+            'sources' : self.sourceFingerprints(),
+            'title' : self.args.__dict__.get('title'),
+            'parserState' : self.travParser.getCacheState(),
+            'travTableData' : travTableData,
+        }
+        # keep other entries that were built from these same source files
+        try:
+            entries = self.readCacheFile()
+        except Exception:
+            entries = {}
+        entries = {key: other for (key, other) in entries.items() if other['sources'] == entry['sources']}
+        entries[self.travParser.getCacheKey()] = entry
+        tmpName = f'{self.fname}.tmp{os.getpid()}'
+        try:
+            with open(tmpName, 'wb') as f:
+                pickle.dump({'version' : self.formatVersion, 'entries' : entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpName, self.fname)
+        except OSError as ex:
+            self.report(f'could not write {self.fname}: {ex}')
+            return
+        self.report(f'saved {self.fname}')
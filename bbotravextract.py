@@ -0,0 +1,95 @@
+from html.parser import HTMLParser
+
+# streaming extractor for the traveller table in a BBO traveller html file.
+# Rather than building a full DOM (as BeautifulSoup does) this just watches the
+# parser events for the first <table> in the document and collects, for each <tr>,
+# the th/td cells with their text and the attributes of the first <a> in the cell.
+# Once the first table is closed the rest of the document is not even fed to the parser.
+
+class TravCell(object):
+    __slots__ = ('tag', 'textParts', 'anchorAttrs')
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.textParts = []
+        self.anchorAttrs = None   # attrs of first <a> inside the cell
+
+    @property
+    def text(self):
+        return ''.join(self.textParts)
+
+
+class TravTableExtractor(HTMLParser):
+    # tags whose nesting we track, others (b, span, br, etc.) are just passed thru
+    trackedTags = ('table', 'tr', 'td', 'th')
+    feedChunkSize = 16 * 1024
+
+    def __init__(self):
+        super(TravTableExtractor, self).__init__(convert_charrefs=True)
+        self.rows = []        # each row is a list of TravCell in document order
+        self.stack = []       # open tracked elements, (tag, obj) tuples
+        self.openRows = []
+        self.openCells = []
+        self.started = False
+        self.done = False
+
+    # returns a list of rows for the first table in html_doc
+    @classmethod
+    def extractRows(cls, html_doc):
+        extractor = cls()
+        for start in range(0, len(html_doc), cls.feedChunkSize):
+            extractor.feed(html_doc[start:start + cls.feedChunkSize])
+            if extractor.done:
+                break
+        if not extractor.done:
+            extractor.close()
+        return extractor.rows
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == 'table':
+            self.started = True
+        if not self.started:
+            return
+        if tag == 'tr':
+            row = []
+            self.rows.append(row)
+            self.openRows.append(row)
+            self.stack.append((tag, row))
+        elif tag in ('td', 'th'):
+            cell = TravCell(tag)
+            # like a recursive find_all, a cell belongs to every enclosing row
+            for row in self.openRows:
+                row.append(cell)
+            self.openCells.append(cell)
+            self.stack.append((tag, cell))
+        elif tag == 'table':
+            self.stack.append((tag, None))
+        elif tag == 'a':
+            for cell in self.openCells:
+                if cell.anchorAttrs is None:
+                    cell.anchorAttrs = dict(attrs)
+
+    def handle_endtag(self, tag):
+        if self.done or not self.started or tag not in self.trackedTags:
+            return
+        if tag not in [t for (t, obj) in self.stack]:
+            # stray end tag, ignore it
+            return
+        # pop everything up to and including the matching open tag
+        while True:
+            (openTag, obj) = self.stack.pop()
+            if openTag == 'tr':
+                self.openRows.remove(obj)
+            elif openTag in ('td', 'th'):
+                self.openCells.remove(obj)
+            if openTag == tag:
+                break
+        if not self.stack:
+            # first table is closed, nothing more needed
+            self.done = True
+
+    def handle_data(self, data):
+        for cell in self.openCells:
+            cell.textParts.append(data)
@@ -0,0 +1,77 @@
+import sys
+import os
+import time
+import contextlib
+
+# --watch support for a live tournament.
+# After the first report, the traveller source files are checked every args.watch seconds.
+# Only the files that are new or changed (by size and mtime) are parsed again, and only
+# boards whose rows actually changed have their saved report fragments thrown away.
+# The reporter's childGenReport is then rerun, which reuses the fragments (and any DD tables
+# already computed) for all the other boards, so a refresh costs about the number of changed boards.
+class BboWatcher(object):
+    def __init__(self, reporter):
+        self.reporter = reporter
+        self.args = reporter.args
+        self.travParser = reporter.travParser
+        self.sourceStats = self.statSources()
+
+    def statSources(self):
+        stats = {}
+        for fname in self.travParser.getSourceFiles():
+            try:
+                st = os.stat(fname)
+            except OSError:
+                # file went away (or is being replaced), catch it next time
+                continue
+            stats[fname] = (st.st_size, st.st_mtime_ns)
+        return stats
+
+    def report(self, msg):
+        print(f'watch: {msg}', file=sys.stderr)
+
+    def run(self):
+        try:
+            self.writeReport()
+            while True:
+                time.sleep(self.args.watch)
+                if self.refresh():
+                    self.writeReport()
+        except KeyboardInterrupt:
+            pass
+
+    def writeReport(self):
+        if self.args.watchOut is None:
+            self.reporter.childGenReport()
+            sys.stdout.flush()
+            return
+        # write to a temp file and rename so a browser never sees a partial report
+        tmpName = f'{self.args.watchOut}.tmp'
+        with open(tmpName, 'w') as f:
+            with contextlib.redirect_stdout(f):
+                self.reporter.childGenReport()
+        os.replace(tmpName, self.args.watchOut)
+
+    # returns True if any board changed
+    def refresh(self):
+        self.travParser.rescan()
+        newStats = self.statSources()
+        changedFiles = [fname for fname in newStats.keys() if newStats[fname] != self.sourceStats.get(fname)]
+        if len(changedFiles) == 0:
+            return False
+        self.sourceStats = newStats
+
+        travTableData = self.reporter.travTableData
+        if not self.reporter.boardsGiven:
+            self.args.boards = self.travParser.getNumBoards()
+        newTableData = {bdnum: [] for bdnum in range(1, self.args.boards + 1)}
+        bdnums = self.travParser.reparseSourceFiles(changedFiles, newTableData)
+
+        changedBoards = []
+        for bdnum in bdnums:
+            if newTableData[bdnum] != travTableData.get(bdnum):
+                travTableData[bdnum] = newTableData[bdnum]
+                changedBoards.append(bdnum)
+                self.reporter.boardFragments.pop(bdnum, None)
+        self.report(f'{len(changedFiles)} changed files, boards {changedBoards} re-processed')
+        return len(changedBoards) > 0
@@ -0,0 +1,267 @@
+import os
+import sys
+import time
+import random
+import argparse
+import bbobidparcalc
+from bbobidparcalc import BiddingParCalc
+from bidpartest import BidParTester
+from bboauctionsolver import AuctionSolver
+
+# randomized benchmark and differential test for BiddingParCalc.calcParsForBidList.
+# Makes random DD trick tables (as BidParTester DealInfos) and random legal auctions on them,
+# times calcParsForBidList over every auction and checks some invariants of the results:
+#   * there is one record before the bidding and one per bid, each with the right bidder
+#   * a call never improves the par for the side that made it
+#   * every par contract listed really scores the par
+#   * every par contract listed can still be reached, it is the current contract
+#     (with at least its doubles so far) or a higher one
+#   * once the auction is over the par is the score of the contract it ended in
+# The par after every bid of the first --oracleAuctions auctions is also compared with the exact
+# AuctionSolver.  BiddingParCalc is a heuristic, and it still gets some auctions wrong:
+#   * it lets a side declare an unbid strain from whichever partner is better at it, even when
+#     that partner won't get another turn before the auction ends (or, the other way round,
+#     misses that a double gives the partner another turn)
+#   * each side only looks for an immediate improvement on the other's contract, so it
+#     misses preemptive sacrifices, a worse contract bid now to keep the other side out of
+#     a better one (this also shows up as a call that improves the par for its own side)
+# The auctions of the default run known to differ for these reasons are listed in --knownDiffs
+# (testdata/bidparbench/knowndiffs.txt).  Every difference is printed, any auction not in that list
+# counts as a failure, and listed ones that now agree are reported so they can be taken out.
+# Other seeds or sizes aren't in the list, so their differences are all failures.
+# The same --seed gives the same tables and auctions, so timings can be compared between versions.
+# Exits nonzero if any invariant fails or any auction not in the known list differs from the oracle.
+
+parser = argparse.ArgumentParser('bidding par benchmark')
+parser.add_argument('--seed', type=int, default=1, help='random seed for the tables and auctions')
+parser.add_argument('--tables', type=int, default=200, help='number of random DD tables')
+parser.add_argument('--auctions', type=int, default=2000, help='number of random auctions, spread over the tables')
+parser.add_argument('--oracleAuctions', type=int, default=300, help='compare the pars of this many auctions with the exact AuctionSolver (0 for none)')
+parser.add_argument('--knownDiffs', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testdata', 'bidparbench', 'knowndiffs.txt'),
+                    help='file listing the auctions known to differ from the oracle')
+parser.add_argument('--strictOracle', default=False, action='store_true', help='count every auction that differs from the oracle as a failure, even known ones')
+parser.add_argument('--showFailures', type=int, default=5, help='print details of this many failures of each kind')
+args = parser.parse_args()
+
+suits = 'CDHSN'
+
+def clipTricks(trix):
+    return min(13, max(0, trix))
+
+# tricks for N/S declaring each strain are spread around 6.5, E/W get about what N/S don't,
+# and a declarer's partner usually takes the same number of tricks but sometimes one more or less
+def randomTable(rng):
+    indict = {}
+    for suit in suits:
+        nsTrix = clipTricks(round(rng.gauss(6.5, 2.2)))
+        ewTrix = clipTricks(13 - nsTrix + rng.choice([0, 0, 0, -1, 1]))
+        for (dir, pardDir, trix) in [('N', 'S', nsTrix), ('E', 'W', ewTrix)]:
+            indict[f'{dir}{suit}'] = trix
+            indict[f'{pardDir}{suit}'] = trix if rng.random() < 0.7 else clipTricks(trix + rng.choice([-1, 1]))
+    bdnum = rng.randint(1, 16)
+    return (bdnum, BidParTester(bdnum, indict, 0))
+
+# a random legal auction, competitive ones have more bids, doubles and redoubles
+def randomAuction(rng, competitive):
+    bids = []
+    (level, suitIdx) = (0, -1)
+    passes = 0
+    lastCallSide = None
+    dblFlag = 0
+    bidChance = 0.55 if competitive else 0.3
+    while True:
+        side = len(bids) % 2
+        choice = rng.random()
+        if choice < bidChance and not (level == 7 and suitIdx == 4):
+            newSuitIdx = rng.randrange(5)
+            newLevel = max(level, 1) if newSuitIdx > suitIdx else level + 1
+            if rng.random() < 0.2:
+                newLevel += 1
+            if newLevel > 7:
+                bids.append('P')
+                passes += 1
+            else:
+                bids.append(f'{newLevel}{suits[newSuitIdx]}')
+                (level, suitIdx) = (newLevel, newSuitIdx)
+                (passes, lastCallSide, dblFlag) = (0, side, 0)
+        elif choice < 0.65 and level > 0 and lastCallSide != side and dblFlag == 0:
+            bids.append('D')
+            (passes, lastCallSide, dblFlag) = (0, side, 1)
+        elif choice < 0.7 and dblFlag == 1 and lastCallSide != side:
+            bids.append('R')
+            (passes, lastCallSide, dblFlag) = (0, side, 2)
+        else:
+            bids.append('P')
+            passes += 1
+        if passes == 4 or (level > 0 and passes == 3):
+            return bids
+
+def contractScore(dealInfo, contract):
+    if contract.level == 0:
+        return 0
+    score = dealInfo.getRawScore(contract.suit, contract.level, contract.dblFlag, contract.player, contract.trix)
+    return score if contract.player in 'NS' else -score
+
+def contractRank(level, suit):
+    return 5 * (level - 1) + suits.index(suit)
+
+# the contract an auction has got to (or ended in), as (level, suit, declarer, dblFlag) or None if no bids yet
+def finalContract(dealInfo, bids):
+    (contract, dblFlag) = (None, 0)
+    firstBidders = {}
+    for (i, bid) in enumerate(bids):
+        bidder = 'NESW'[(dealInfo.getDealerIndex() + i) % 4]
+        if bid in 'DR':
+            dblFlag = 1 if bid == 'D' else 2
+        elif bid != 'P':
+            side = 'NS' if bidder in 'NS' else 'EW'
+            declarer = firstBidders.setdefault((side, bid[1]), bidder)
+            (contract, dblFlag) = ((int(bid[0]), bid[1], declarer), 0)
+    if contract is None:
+        return None
+    return contract + (dblFlag,)
+
+# whether a par contract can still come from an auction at the current contract (from finalContract).
+# A higher contract is a new bid so can be at most doubled, the current contract itself
+# can only be played by the side that bid it, and only doubled further
+def contractReachable(current, contract):
+    if contract.level == 0:
+        return current is None
+    if current is None:
+        return contract.dblFlag < 2
+    (level, suit, declarer, dblFlag) = current
+    rank = contractRank(contract.level, contract.suit)
+    currentRank = contractRank(level, suit)
+    if rank > currentRank:
+        return contract.dblFlag < 2
+    return (rank == currentRank and contract.player in ('NS' if declarer in 'NS' else 'EW')
+            and contract.dblFlag >= dblFlag)
+
+def checkInvariants(dealInfo, bids, recs):
+    problems = []
+    if len(recs) != len(bids) + 1:
+        return [f'{len(recs)} records for {len(bids)} bids']
+    for (i, rec) in enumerate(recs[1:]):
+        bidder = 'NESW'[(dealInfo.getDealerIndex() + i) % 4]
+        if rec.bidder != bidder or rec.bid != bids[i]:
+            problems.append(f'record {i+1} is {rec.bid} by {rec.bidder}, expected {bids[i]} by {bidder}')
+        prevScore = recs[i].parScore
+        if (rec.parScore > prevScore) if bidder in 'NS' else (rec.parScore < prevScore):
+            problems.append(f'{bids[i]} by {bidder} improved the par for its side, {prevScore:+} to {rec.parScore:+}')
+    for (i, rec) in enumerate(recs):
+        current = finalContract(dealInfo, bids[:i])
+        for contract in rec.contracts:
+            score = contractScore(dealInfo, contract)
+            if score != rec.parScore:
+                problems.append(f'record {i} par {rec.parScore:+} but {bbobidparcalc.contractText(contract)} scores {score:+}')
+            if not contractReachable(current, contract):
+                problems.append(f'record {i} par contract {bbobidparcalc.contractText(contract)} cannot be reached from {current}')
+    final = finalContract(dealInfo, bids)
+    if final is None:
+        finalScore = 0
+    else:
+        (level, suit, declarer, dblFlag) = final
+        trix = dealInfo.getDDTricks(suit, declarer)
+        finalScore = dealInfo.getRawScore(suit, level, dblFlag, declarer, trix) * (1 if declarer in 'NS' else -1)
+    if recs[-1].parScore != finalScore:
+        problems.append(f'auction over but par {recs[-1].parScore:+}, the contract scores {finalScore:+}')
+    return problems
+
+# an auction as (bdnum, DD tricks in NSEW rows of CDHSN, bids), the way --knownDiffs lists them
+def auctionKey(bdnum, dealInfo, bids):
+    tricks = ' '.join([','.join([str(dealInfo.getDDTricks(suit, dir)) for suit in suits]) for dir in 'NSEW'])
+    return (bdnum, tricks, ' '.join(bids))
+
+# each line of the file is a board number, the 4 rows of tricks, a colon and the bids, eg.
+#   16 7,10,7,7,7 7,10,7,8,7 6,3,7,5,6 6,3,6,5,6 : 1N 2C 3D P P P
+# blank lines and anything after a # are ignored
+def readKnownDiffs(fname):
+    known = set()
+    with open(fname) as f:
+        for line in f:
+            line = line.split('#')[0].strip()
+            if line == '':
+                continue
+            (deal, bids) = line.split(':')
+            (bdnum, tricks) = deal.split(maxsplit=1)
+            known.add((int(bdnum), tricks.strip(), ' '.join(bids.split())))
+    return known
+
+def percentile(sortedList, pct):
+    return sortedList[min(len(sortedList) - 1, int(len(sortedList) * pct / 100))]
+
+rng = random.Random(args.seed)
+tables = [randomTable(rng) for n in range(args.tables)]
+auctions = []
+for n in range(args.auctions):
+    (bdnum, dealInfo) = tables[n % len(tables)]
+    auctions.append((bdnum, dealInfo, randomAuction(rng, n % 2 == 0)))
+
+# the timed part
+latencies = []
+results = []
+for (bdnum, dealInfo, bids) in auctions:
+    startTime = time.perf_counter()
+    recs = BiddingParCalc(bdnum, dealInfo).calcParsForBidList(bids)
+    latencies.append(time.perf_counter() - startTime)
+    results.append(recs)
+
+totalSecs = sum(latencies)
+numBids = sum([len(bids) for (bdnum, dealInfo, bids) in auctions])
+latencies.sort()
+print(f'seed {args.seed}: {len(auctions)} auctions ({numBids} bids) on {len(tables)} tables in {totalSecs:.3f}s')
+print(f'{len(auctions) / totalSecs:.0f} auctions/sec, {numBids / totalSecs:.0f} bids/sec')
+print('latency (ms): ' + ', '.join([f'p{pct} {1000 * percentile(latencies, pct):.3f}' for pct in [50, 90, 99]])
+      + f', max {1000 * latencies[-1]:.3f}')
+
+numFailures = 0
+for ((bdnum, dealInfo, bids), recs) in zip(auctions, results):
+    problems = checkInvariants(dealInfo, bids, recs)
+    if len(problems) > 0:
+        numFailures += 1
+        if numFailures <= args.showFailures:
+            print(f'invariant failure, bd {bdnum}, bids {" ".join(bids)}')
+            print(dealInfo, end='')
+            for problem in problems:
+                print(f'   {problem}')
+print(f'{numFailures} auctions failed invariants')
+
+numOracle = min(args.oracleAuctions, len(auctions))
+if numOracle > 0:
+    known = set() if args.strictOracle else readKnownDiffs(args.knownDiffs)
+    solvers = {}
+    numDiffs = 0
+    numNewDiffs = 0
+    numPositions = 0
+    agreeing = []
+    startTime = time.perf_counter()
+    for ((bdnum, dealInfo, bids), recs) in zip(auctions[:numOracle], results):
+        solver = solvers.get(id(dealInfo))
+        if solver is None:
+            solver = solvers[id(dealInfo)] = AuctionSolver(bdnum, dealInfo)
+        exactScores = solver.parScoresForBidList(bids)
+        numPositions += len(exactScores)
+        diffs = [i for (i, rec) in enumerate(recs) if rec.parScore != exactScores[i]]
+        key = auctionKey(bdnum, dealInfo, bids)
+        if len(diffs) == 0:
+            if key in known:
+                agreeing.append(key)
+            continue
+        numDiffs += 1
+        i = diffs[0]
+        isKnown = key in known
+        if not isKnown:
+            numNewDiffs += 1
+        print(f'oracle differs{"" if isKnown else " (new)"}, bd {bdnum}, bids {" ".join(bids)}')
+        if not isKnown:
+            print(dealInfo, end='')
+            print(f'   known diffs line: {key[0]} {key[1]} : {key[2]}')
+        print(f'   after {" ".join(bids[:i]) or "no bids"}: {recs[i].notesString()}, exact {exactScores[i]:+}'
+              f' by {" ".join(solver.bestCalls(bids[:i]))}')
+    for (bdnum, tricks, bids) in agreeing:
+        print(f'known diff now agrees with the oracle, bd {bdnum} {tricks}, bids {bids}')
+    print(f'oracle: {numPositions} positions of {numOracle} auctions in {time.perf_counter() - startTime:.1f}s, '
+          f'{numDiffs} auctions differ, {numNewDiffs} of them not known')
+    numFailures += numNewDiffs
+
+sys.exit(1 if numFailures > 0 else 0)
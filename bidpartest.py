@@ -20,10 +20,14 @@ for dir in 'NSE':
     handStr = handStr[-1] + handStr[:-1]
 dummyDeal = BboDDParTravLine.Deal(hands)
 
+numFailures = 0
+
 def doAssert(expected, got, testStr, detail):
+    global numFailures
     try:
         assert expected == got, str
     except AssertionError:
+        numFailures += 1
         print(f'assertion error on {testStr}')
         print(f'{detail}, expected {expected}, got {got}')
         # sys.exit(1)
@@ -52,14 +56,6 @@ class BidParTester(BboDDParTravLine.DealInfo):
             str += '\n'
         return str
 
-import argparse
-
-parser = argparse.ArgumentParser('bid par tester')
-parser.add_argument('--only', type=int, default=None, help='only run this test')
-parser.add_argument('--debug', default=False, action='store_true', help='print some debug info') 
-args = parser.parse_args()
-if args.debug:
-    bbobidparcalc.DEBUG=True
 # A test is specified as a tuple with the following 4 elements:
 #   a board number (affects dealer, vulnerability, etc.)
 #   a default value for trix for any suit/player combination that is not specified
@@ -130,14 +126,15 @@ tests = [
     (1, 0, 'NS.N.7', '+90 1N D +560 [1N**-N] R P P P'),
     # test best bid being redouble
     (1, 0, 'NS.N.7', '+90 1N D +560 [1N**-N] P P P +180 [1N*-N]'),
+    # once doubled, a side can only keep its own contract or bid higher, 7S D is not a 1S par
+    (1, 0, 'NS.S.7', '+80 [1S-NS] 7S -1400 [7S*-N] D P P P'),
     # exposed bug where seeing 5C +400 blocked 3N +430
     (1, 0, 'N.C.11 S.C.10 NS.D.10 NS.H.8 NS.S.9 N.N.10 S.N.9', '+430 [3N-N] 1N P 2C P 2D P 3N P P P')
 ] 	
 
-for (testnum, testtup) in enumerate(tests):
-    if args.only is not None and testnum != args.only:
-        continue
-    if args.debug:
+# runs one test tuple, any mismatches are printed and counted in numFailures
+def runTest(testnum, testtup, debug):
+    if debug:
         print(f'test #{testnum}', file=sys.stderr)
     (bdnum, trixdefault, dictStr, bidResStr) = testtup
     # build up indict by parsing dictStr
@@ -197,7 +194,7 @@ for (testnum, testtup) in enumerate(tests):
     calc = bbobidparcalc.BiddingParCalc(bdnum, testObj)
     for (i, bidparrec) in enumerate(calc.calcParsForBidList(bidList)):
         # print(f'{i}: {bidparrec}')
-        for obj in bidparrec.scoreList:
+        for obj in bidparrec.contracts:
             pass
             # print(obj)
         # print('i=', i, exScores[i], exContracts[i])
@@ -207,11 +204,25 @@ for (testnum, testtup) in enumerate(tests):
         doAssert(exScores[i], bidparrec.parScore, testStr, 'parScore')
         # must check the contracts if any specified
         if len(exContracts[i]) > 0:
-            doAssert(len(exContracts[i]), len(bidparrec.scoreList), testStr, 'number of contracts')
+            doAssert(len(exContracts[i]), len(bidparrec.contracts), testStr, 'number of contracts')
             for (j, con) in enumerate(exContracts[i]):
                 (level, suit, dblFlag, decl) = con
-                doAssert(level, bidparrec.scoreList[j].level, testStr, f'level[{j}]')
-                doAssert(suit,  bidparrec.scoreList[j].suit,  testStr, f'suit[{j}]')
-                doAssert(dblFlag,  bidparrec.scoreList[j].dblFlag,  testStr, f'dblFlag[{j}]')
-                doAssert(decl,  bidparrec.scoreList[j].player, testStr, f'declarer[{j}]')
+                doAssert(level, bidparrec.contracts[j].level, testStr, f'level[{j}]')
+                doAssert(suit,  bidparrec.contracts[j].suit,  testStr, f'suit[{j}]')
+                doAssert(dblFlag,  bidparrec.contracts[j].dblFlag,  testStr, f'dblFlag[{j}]')
+                doAssert(decl,  bidparrec.contracts[j].player, testStr, f'declarer[{j}]')
 
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser('bid par tester')
+    parser.add_argument('--only', type=int, default=None, help='only run this test')
+    parser.add_argument('--debug', default=False, action='store_true', help='print some debug info') 
+    args = parser.parse_args()
+    if args.debug:
+        bbobidparcalc.DEBUG=True
+    for (testnum, testtup) in enumerate(tests):
+        if args.only is not None and testnum != args.only:
+            continue
+        runTest(testnum, testtup, args.debug)
+    sys.exit(1 if numFailures > 0 else 0)
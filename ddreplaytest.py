@@ -0,0 +1,92 @@
+import os
+import sys
+import argparse
+import difflib
+import subprocess
+
+# runs the double dummy reporters on the small tournament in testdata/replay with --ddBackend replay,
+# so libdds is not needed, and compares each report with the one saved when the fixture was recorded.
+# The bidding par after every auction prefix of every table is also checked against the exact
+# AuctionSolver, so the saved bidding pars don't just agree with the code that made them.
+# With --record, the fixture and the saved reports are made again using libdds
+# (needed whenever the DD result structs in dds.py change, see DDFixture).
+# Exits nonzero if any report differs.
+
+parser = argparse.ArgumentParser('double dummy replay fixture test')
+parser.add_argument('--record', default=False, action='store_true', help='re-record the fixture and expected reports with libdds')
+args = parser.parse_args()
+
+srcDir = os.path.dirname(os.path.abspath(__file__))
+testDir = os.path.join(srcDir, 'testdata', 'replay')
+fixture = os.path.join(testDir, 'ddfixture.json')
+reporters = ['bboddpar', 'bboddbid', 'bboddplay']
+
+sys.path.append(os.path.join(srcDir, 'python-dds', 'examples'))
+from bbocsvsections import CsvSectionReader
+from bbolin import parseLin
+from bboddpartravline import BboDDParTravLine
+from bboddsolver import ReplayDDSolver
+from bboddstore import DDFixture
+from bbobidparcalc import BiddingParCalc
+from bboauctionsolver import AuctionSolver
+
+def runReporter(reporter, ddArgs):
+    cmd = [sys.executable, os.path.join(srcDir, f'{reporter}.py'), '--dir', testDir, '--noCache', '--noDDStore'] + ddArgs
+    proc = subprocess.run(cmd, cwd=srcDir, capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(f'{reporter} failed:\n{proc.stderr}')
+        sys.exit(1)
+    return proc.stdout
+
+if args.record:
+    if os.path.exists(fixture):
+        os.remove(fixture)
+    for reporter in reporters:
+        with open(os.path.join(testDir, f'{reporter}.out'), 'w') as f:
+            f.write(runReporter(reporter, ['--ddRecord', fixture]))
+    print(f'recorded {fixture} and expected reports for {", ".join(reporters)}')
+    sys.exit(0)
+
+# returns the number of auction prefixes where BiddingParCalc and AuctionSolver differ
+def checkBidPars():
+    BboDDParTravLine.solver = ReplayDDSolver(DDFixture(fixture))
+    solvers = {}
+    numDiffs = 0
+    for row in CsvSectionReader(os.path.join(testDir, 't.csv')).travRows:
+        bdnum = int(row['Board'])
+        linRecord = parseLin(row['playdata'].replace('%2C', ','))
+        if bdnum not in solvers:
+            # the md record has the S, W and N hands
+            hands = {dir : BboDDParTravLine.Deal.Hand.fromPbnHandStr(handStr) for (dir, handStr) in zip('SWN', linRecord.hands)}
+            dealInfo = BboDDParTravLine.DealInfo(bdnum, BboDDParTravLine.Deal(hands))
+            dealInfo.getDDTable()
+            solvers[bdnum] = (dealInfo, AuctionSolver(bdnum, dealInfo))
+        (dealInfo, solver) = solvers[bdnum]
+        bids = list(linRecord.bids)
+        exactScores = solver.parScoresForBidList(bids)
+        for (i, rec) in enumerate(BiddingParCalc(bdnum, dealInfo).calcParsForBidList(bids)):
+            if rec.parScore != exactScores[i]:
+                numDiffs += 1
+                print(f'   board {bdnum} after {" ".join(bids[:i]) or "no bids"}: {rec.notesString()}, exact {exactScores[i]:+}')
+    BboDDParTravLine.solver = None
+    return numDiffs
+
+numFailures = 0
+for reporter in reporters:
+    got = runReporter(reporter, ['--ddBackend', 'replay', '--ddFixture', fixture])
+    with open(os.path.join(testDir, f'{reporter}.out')) as f:
+        expected = f.read()
+    if got == expected:
+        print(f'{reporter}: same')
+    else:
+        numFailures += 1
+        print(f'{reporter}: DIFFERENT')
+        diff = difflib.unified_diff(expected.splitlines(), got.splitlines(), 'expected', 'replay', lineterm='')
+        for line in list(diff)[:20]:
+            print(f'   {line}')
+
+numDiffs = checkBidPars()
+print(f'bidding pars: {numDiffs} differ from AuctionSolver')
+numFailures += numDiffs
+
+sys.exit(1 if numFailures > 0 else 0)
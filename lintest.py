@@ -0,0 +1,82 @@
+import sys
+from bbolin import parseLin, LinRecord
+import bbocards
+
+# checks bbolin.parseLin against some LIN strings of the kind BBO puts in its hand records
+
+numFailures = 0
+
+def doAssert(expected, got, testStr):
+    global numFailures
+    if expected != got:
+        numFailures += 1
+        print(f'assertion error on {testStr}')
+        print(f'   expected {expected}')
+        print(f'   got      {got}')
+
+# a played hand, with alerts in both forms, an explanation after each alerted bid and a claim
+playedLin = ('pn|Alice,robot22,Carol,~~M1234|st||md|1SAK2HQJ3D852CJT96,SQJ9HK8742DAK7C83,S8754HT96DQJ4CAK5,|'
+             'rh||ah|Board 5|sv|n|'
+             'mb|1C!|an|could be short|mb|1H|mb|1S%21|an|4+ spades|mb|p|mb|1N|mb|2H|mb|p|mb|p|mb|d|mb|p|mb|p|mb|p|'
+             'pc|SA|pc|S3|pc|S4|pc|SQ|pc|CJ|pc|C3|pc|CA|pc|C2|mc|7|')
+
+# a passed out hand, no play and no claim, dealer West and all four hands given
+passedLin = ('|pn|Alice,robot22,Carol,~~M1234|st||md|2SAK2HQJ3D852CJT96,SQJ9HK8742DAK7C83,S8754HT96DQJ4CAK5,ST63HA5DT963CQ742|'
+             'rh||ah|Board 6|sv|e|mb|p|mb|p|mb|p|mb|p|')
+
+# anything after a zz record belongs to another hand
+zzLin = 'pn|a,b,c,d|md|3SAK2HQJ3D852CJT96,,,|mb|4S|mb|P|mb|P|mb|P|pc|HA|zz|x|pc|HK|mb|5C|mc|10|'
+
+tests = [
+    ('played hand', playedLin,
+     LinRecord(players=('Alice', 'robot22', 'Carol', '~~M1234'),
+               dealer=1,
+               hands=('AK2.QJ3.852.JT96', 'QJ9.K8742.AK7.83', '8754.T96.QJ4.AK5'),
+               bids=('1C', '1H', '1S', 'P', '1N', '2H', 'P', 'P', 'D', 'P', 'P', 'P'),
+               plays=('SA', 'S3', 'S4', 'SQ', 'CJ', 'C3', 'CA', 'C2'),
+               playString='SAS3S4SQCJC3CAC2',
+               claim=7)),
+    ('passed out hand', passedLin,
+     LinRecord(players=('Alice', 'robot22', 'Carol', '~~M1234'),
+               dealer=2,
+               hands=('AK2.QJ3.852.JT96', 'QJ9.K8742.AK7.83', '8754.T96.QJ4.AK5'),
+               bids=('P', 'P', 'P', 'P'),
+               plays=(),
+               playString='',
+               claim=None)),
+    ('zz record', zzLin,
+     LinRecord(players=('a', 'b', 'c', 'd'),
+               dealer=3,
+               hands=('AK2.QJ3.852.JT96', '', ''),
+               bids=('4S', 'P', 'P', 'P'),
+               plays=('HA',),
+               playString='HA',
+               claim=None)),
+]
+
+for (testStr, linStr, expected) in tests:
+    got = parseLin(linStr)
+    for field in LinRecord._fields:
+        doAssert(getattr(expected, field), getattr(got, field), f'{testStr}, {field}')
+
+# the winner of each trick of a LIN play (bbocards.trickWinner), trumps from the last bid
+ruffLin = ('pn|a,b,c,d|md|3SAK2HQJ3D852CJT96,,,|mb|1H|mb|P|mb|4H|mb|P|mb|P|mb|P|'
+           'pc|SA|pc|S3|pc|H2|pc|S5|pc|H5|pc|H4|pc|HA|pc|H3|pc|H6|pc|C2|pc|D2|pc|S6|')
+ntLin = 'pn|a,b,c,d|md|3SAK2HQJ3D852CJT96,,,|mb|3N|mb|P|mb|P|mb|P|pc|SA|pc|S3|pc|H2|pc|S5|pc|C2|pc|CA|pc|C3|pc|S2|'
+
+trickTests = [
+    # the 2 of trumps ruffing an ace, once shown as won by the ace
+    ('ruffed with the trump 2', ruffLin, ['H2', 'HA', 'H6']),
+    ('no trumps', ntLin, ['SA', 'CA']),
+]
+
+for (testStr, linStr, expected) in trickTests:
+    linRecord = parseLin(linStr)
+    strain = [bid for bid in linRecord.bids if bid not in 'PDR'][-1][1]
+    trumpIdx = bbocards.suitIdxs.get(strain, 4)
+    plays = linRecord.plays
+    got = [bbocards.trickWinner(plays[i:i+4], trumpIdx) for i in range(0, len(plays), 4)]
+    doAssert(expected, got, f'{testStr}, trick winners')
+
+print(f'{len(tests) + len(trickTests)} LIN strings, {numFailures} failures')
+sys.exit(1 if numFailures > 0 else 0)
@@ -0,0 +1,116 @@
+import sys
+import time
+import random
+import argparse
+import numpy
+
+from bbobase import BboBase
+from bboddpartravline import BboDDParTravLine
+import bboparcalc
+from bidpartest import BidParTester
+from bboauctionsolver import AuctionSolver
+
+# checks the numpy par calculation in bboparcalc against DDS DealerPar for every board
+# of a tournament, with each board's DD table tried for all four dealers and vulnerabilities.
+# Takes the usual reporter args (--dir and the DD solver options), exits nonzero on any mismatch.
+#
+# Without --dir it needs neither libdds nor travellers: the par scores of random DD tables,
+# each tried as boards 1-16 (so all 16 dealer and vulnerability combinations),
+# are checked against the exact AuctionSolver instead.  Both partners of a side take the same
+# tricks in these tables, otherwise the declarer the auction gets can be the worse one
+# and the exact par is no longer DealerPar's.  Only the par scores are compared this way.
+
+class ParCalcTester(BboBase):
+    def appDescription(self):
+        return 'Vectorized par calculation vs. DDS DealerPar'
+
+    def addParserArgs(self, parser):
+        pass
+
+    def resetRunState(self):
+        BboDDParTravLine.resetRunState()
+
+    def childGenReport(self):
+        BboDDParTravLine.importArgs(self.args)
+        for bdnum in range(1, self.args.boards + 1):
+            BboDDParTravLine(bdnum, self.travTableData[bdnum][0], self.travParser)
+        dealInfos = [BboDDParTravLine.dealInfos[bdnum] for bdnum in range(1, self.args.boards + 1)]
+        # the DD tables are all solved in one batch by the first of these
+        ddTables = [dealInfo.getDDTable() for dealInfo in dealInfos]
+
+        cases = [(dealInfo, ddTable, dealer, vul) for (dealInfo, ddTable) in zip(dealInfos, ddTables)
+                 for dealer in range(4) for vul in range(4)]
+        startTime = time.perf_counter()
+        (pars, contracts, sideBest) = bboparcalc.calcPars(bboparcalc.tricksFromDDTables([case[1] for case in cases]),
+                                                          [case[2] for case in cases], [case[3] for case in cases])
+        vectorSecs = time.perf_counter() - startTime
+
+        solver = BboDDParTravLine.getSolver()
+        startTime = time.perf_counter()
+        ddsPars = [solver.dealerPar(dealInfo.pbnDealString, ddTable, dealer, vul) for (dealInfo, ddTable, dealer, vul) in cases]
+        ddsSecs = time.perf_counter() - startTime
+
+        self.numMismatches = 0
+        for (case, par, dealContracts, ddsPar) in zip(cases, pars, contracts, ddsPars):
+            (dealInfo, ddTable, dealer, vul) = case
+            ddsContracts = [ddsPar.contracts[i].value.decode('utf-8') for i in range(ddsPar.number)]
+            myContracts = [bboparcalc.contractString(contract) for contract in dealContracts]
+            if par != ddsPar.score or myContracts != ddsContracts:
+                self.numMismatches += 1
+                print(f'MISMATCH bd {dealInfo.bdnum} dealer {"NESW"[dealer]} vul {vul}: '
+                      f'{par} {myContracts} vs. DealerPar {ddsPar.score} {ddsContracts}')
+        print(f'{self.args.dir}: {len(cases)} pars, {self.numMismatches} mismatches, '
+              f'vectorized {vectorSecs:.4f}s, DealerPar {ddsSecs:.4f}s')
+
+def clipTricks(trix):
+    return min(13, max(0, trix))
+
+# tricks for N/S declaring each strain are spread around 6.5 and E/W get about what N/S don't.
+# In competitive tables both sides are closer to 6.5 and can often make the same strain,
+# these are the ones where the dealer matters
+def randomTable(rng, competitive):
+    indict = {}
+    for suit in 'CDHSN':
+        nsTrix = clipTricks(round(rng.gauss(6.5, 0.5 if competitive else 2.2)))
+        ewTrix = clipTricks(13 - nsTrix + rng.choice([0, 1] if competitive else [0, 0, 0, -1, 1]))
+        for (dirs, trix) in [('NS', nsTrix), ('EW', ewTrix)]:
+            for dir in dirs:
+                indict[f'{dir}{suit}'] = trix
+    return indict
+
+def checkRandomTables(args):
+    rng = random.Random(args.seed)
+    cases = [(bdnum, BidParTester(bdnum, indict, 0)) for indict in [randomTable(rng, n % 2 == 0) for n in range(args.tables)]
+             for bdnum in range(1, 17)]
+    tricks = numpy.array([[[dealInfo.getDDTricks(suit, dir) for dir in 'NESW'] for suit in bboparcalc.ddsStrains]
+                          for (bdnum, dealInfo) in cases])
+    startTime = time.perf_counter()
+    (pars, contracts, sideBest) = bboparcalc.calcPars(tricks, [dealInfo.getDealerIndex() for (bdnum, dealInfo) in cases],
+                                                      [dealInfo.getVulIndex() for (bdnum, dealInfo) in cases])
+    vectorSecs = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    exactPars = [AuctionSolver(bdnum, dealInfo).parScoresForBidList([])[0] for (bdnum, dealInfo) in cases]
+    exactSecs = time.perf_counter() - startTime
+
+    numMismatches = 0
+    for ((bdnum, dealInfo), par, dealContracts, exactPar) in zip(cases, pars, contracts, exactPars):
+        if par != exactPar:
+            numMismatches += 1
+            print(f'MISMATCH bd {bdnum} dealer {dealInfo.getDealerStr()} vul {dealInfo.getVulIndex()}: '
+                  f'{par} {[bboparcalc.contractString(contract) for contract in dealContracts]} vs. AuctionSolver {exactPar}')
+            print(dealInfo, end='')
+    print(f'seed {args.seed}: {len(cases)} pars, {numMismatches} mismatches, '
+          f'vectorized {vectorSecs:.4f}s, AuctionSolver {exactSecs:.1f}s')
+    return numMismatches
+
+if __name__ == '__main__':
+    if not any([arg == '--dir' or arg.startswith('--dir=') for arg in sys.argv[1:]]):
+        parser = argparse.ArgumentParser('Vectorized par calculation vs. AuctionSolver on random DD tables')
+        parser.add_argument('--seed', type=int, default=1, help='random seed for the tables')
+        parser.add_argument('--tables', type=int, default=100, help='number of random DD tables, each tried as boards 1-16')
+        sys.exit(1 if checkRandomTables(parser.parse_args()) > 0 else 0)
+    tester = ParCalcTester()
+    tester.genReport()
+    BboDDParTravLine.getSolver().close()
+    sys.exit(1 if tester.numMismatches > 0 else 0)
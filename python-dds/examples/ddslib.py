@@ -0,0 +1,218 @@
+"""The DDS library functions, split out of dds.py so that loading the
+library can wait until a function is actually used.
+Set DDS_LIBRARY in the environment to load libdds from somewhere else."""
+
+import os
+from ctypes import *
+from dds import *
+
+dds = cdll.LoadLibrary(os.environ.get("DDS_LIBRARY", "/usr/lib/x86_64-linux-gnu/libdds.so"))
+if False:
+    print('Loaded lib {0}'.format(dds))
+
+SetMaxThreads = dds.SetMaxThreads
+"""int userThreads"""
+SetMaxThreads.argtypes = [c_int]
+SetMaxThreads.restype = None
+
+FreeMemory = dds.FreeMemory
+FreeMemory.argtypes = None
+FreeMemory.restype = None
+
+SolveBoard = dds.SolveBoard
+"""deal dl
+int target
+int solutions
+int mode,
+pointer to struct futureTricks * futp
+int threadIndex"""
+SolveBoard.argtypes = [deal, c_int, c_int, c_int, POINTER(futureTricks), c_int]
+SolveBoard.restype = c_int
+
+SolveBoardPBN = dds.SolveBoardPBN
+"""dealPBN dlpbn
+int target
+int solutions
+int mode
+pointer to struct futureTricks * futp
+int thrId"""
+SolveBoardPBN.argtypes = [dealPBN, c_int, c_int, c_int, \
+    POINTER(futureTricks), c_int]
+SolveBoardPBN.restype = c_int
+
+CalcDDtable = dds.CalcDDtable
+"""struct ddTableDeal tableDeal
+pointer to struct ddTableResults * tablep"""
+CalcDDtable.argtypes = [ddTableDeal, POINTER(ddTableResults)]
+CalcDDtable.restype = c_int
+
+CalcDDtablePBN = dds.CalcDDtablePBN
+"""srtuct ddTableDealPBN tableDealPBN
+pointer to struct ddTableResults * tablep"""
+CalcDDtablePBN.argtypes = [ddTableDealPBN, POINTER(ddTableResults)]
+CalcDDtablePBN.restype = c_int
+
+CalcAllTables = dds.CalcAllTables
+"""pointer to struct dd TableDeals * dealsp
+int mode
+int trumpFilter[DDS_STRAINS]
+poiter to struct ddTablesRes * resp
+pointer to struct allParResults'* presp"""
+CalcAllTables.argtypes = [POINTER(ddTableDeals), c_int, c_int * DDS_STRAINS, \
+    POINTER(ddTablesRes), POINTER(allParResults)]
+CalcAllTables.restype = c_int
+
+CalcAllTablesPBN = dds.CalcAllTablesPBN
+"""pointer to struct ddTableDealsPBN * dealsp
+int mode
+int trumpFilter[DDS_STRINS]
+pointer to struct ddTablesRes *resp
+pointer to struct allParResults * presp"""
+CalcAllTablesPBN.argtypes = [POINTER(ddTableDealsPBN), c_int, c_int * DDS_STRAINS, \
+    POINTER(ddTablesRes), POINTER(allParResults)]
+CalcAllTablesPBN.restype = c_int
+
+SolveAllBoards = dds.SolveAllBoards
+"""pointer to struct boardsPBN * bop
+pointer to struct solvedBoards * solvedp"""
+SolveAllBoards.argtypes = [POINTER(boardsPBN), POINTER(solvedBoards)]
+SolveAllBoards.restype = c_int
+
+SolveAllChunks = dds.SolveAllChunks
+"""pointer to struct boardsPBN * bop
+pointer to struct solvedBoards * solvedP
+int chunkSize"""
+SolveAllChunks.argtypes = [POINTER(boardsPBN), POINTER(solvedBoards), c_int]
+SolveAllChunks.restype = c_int
+
+solveAllChunksBin = dds.SolveAllChunksBin
+"""pointer to struct boards * bop
+pointer to struct solvedBoards * solvedp
+int chunkSize"""
+solveAllChunksBin.argtypes = [POINTER(boards), POINTER(solvedBoards), c_int]
+solveAllChunksBin.restype = c_int
+
+solveAllChunksPBN = dds.SolveAllChunksPBN
+"""pointer to struct boardsPBN * bop
+pointer to struct solvedBoards * solvedp
+int chunkSize"""
+solveAllChunksPBN.argtypes = [POINTER(boardsPBN), POINTER(solvedBoards), c_int]
+solveAllChunksPBN.restype = c_int
+
+SolveAllChunksPBN = dds.SolveAllChunksPBN
+"""pointer to struct boardsPBN * bop
+pointer to struct solvedBoards * solvedp
+int chunkSize"""
+SolveAllChunksPBN.argtypes = [POINTER(boardsPBN), POINTER(solvedBoards), c_int]
+SolveAllChunksPBN.restype = c_int
+
+Par = dds.Par
+"""pointer to struct ddTableResults * tablep
+pointer to struct parResults * presp
+int vulnerable"""
+Par.argtypes = [POINTER(ddTableResults), POINTER(parResults), c_int]
+Par.restype = c_int
+
+CalcPar = dds.CalcPar
+"""struct ddTableDeal
+int ulnerable
+pointer to struct ddTablesRes * tablep
+pointer to parResults * presp"""
+CalcPar.argtypes = [ddTableDeal, c_int, POINTER(ddTableResults), POINTER(parResults)]
+CalcPar.restype = c_int
+
+CalcPar = dds.CalcPar
+"""struct ddTableDeal tableDeal
+int vulnerable
+pointer to struct ddTableResults * tablep
+pointer to parResults * presp"""
+CalcPar.argtypes = [ddTableDeal, c_int, POINTER(ddTableResults), POINTER(parResults)]
+CalcPar.restype = c_int
+
+CalcParPBN = dds.CalcParPBN
+"""struct ddTableDealPBN tableDealPBN
+pointer tostruct ddTableResults * tablep
+int vulnerable
+pointer to struct parResults * presp"""
+CalcParPBN.argtypes = [ddTableDealPBN, POINTER(ddTableResults), c_int, POINTER(parResults)]
+CalcParPBN.restype = c_int
+
+SidesPar = dds.SidesPar
+"""pointer to struct ddTableResults * tablep,
+array struct parResultsDealer sidesRes[2],
+int vulnerable"""
+SidesPar.argtypes = [POINTER(ddTableResults), parResultsDealer * 2, c_int]
+SidesPar.restypes = c_int
+
+DealerPar = dds.DealerPar
+"""pointer to struct ddTableResults * tablep
+pointer to struct parResultsDealer * presp
+int dealer
+int vulnerable"""
+DealerPar.argtypes = [POINTER(ddTableResults), POINTER(parResultsDealer), c_int, c_int]
+DealerPar.restype = c_int
+
+DealerParBin = dds.DealerParBin
+"""pointer to struct ddTableResults * tablep
+pointer to struct parResultsMaster * presp
+int dealer
+int vulnerable"""
+DealerParBin.argtypes = [POINTER(ddTableResults), POINTER(parResultsMaster), c_int, c_int]
+DealerParBin.restype = c_int
+
+SidesParBin = dds.SidesParBin
+"""pointer to struct ddTableResults * tablep
+array struct parResultsMaster sidesRes[2]
+int vulnerable"""
+SidesParBin.argtypes = [POINTER(ddTableResults), parResultsMaster * 2, c_int]
+SidesParBin.restype = c_int
+
+ConvertToDealerTextFormat = dds.ConvertToDealerTextFormat
+"""pointer to struct parResultsMaster *pres
+pointer to char *resp"""
+ConvertToDealerTextFormat.argtypes = [POINTER(parResultsMaster), c_char_p]
+ConvertToDealerTextFormat.restype = c_int
+
+ConvertToSidesTextFormat = dds.ConvertToSidesTextFormat
+"""pointer to struct parResultsMaster * pres, 
+pointer to struct parTextResults * resp"""
+ConvertToSidesTextFormat.argtypes = [POINTER(parResultsMaster), POINTER(parTextResults)]
+ConvertToSidesTextFormat.restype = c_int
+
+AnalysePlayBin = dds.AnalysePlayBin
+"""struct deal dl
+struct playTraceBin play
+pointer to struct solvedPlay * solved
+int thrId"""
+AnalysePlayBin.argtypes = [deal, playTraceBin, POINTER(solvedPlay), c_int]
+AnalysePlayBin.restype = c_int
+
+AnalysePlayPBN = dds.AnalysePlayPBN
+"""struct dealPBN dlPBN
+struct playTracePBN playPBN                                 
+pointer to struct solvedPlay * solvedp
+int thrId"""
+AnalysePlayPBN.argtypes = [dealPBN, playTracePBN, POINTER(solvedPlay), c_int]
+AnalysePlayPBN.restype = c_int
+
+AnalyseAllPlaysBin = dds.AnalyseAllPlaysBin
+"""pointer to struct boards * bop
+pointer to struct playTracesBin * plp
+pointer to struct solvedPlays * solvedp
+int chunkSize"""
+AnalyseAllPlaysBin.argtypes = [POINTER(boards), POINTER(playTracesBin), POINTER(solvedPlays), c_int]
+AnalyseAllPlaysBin.restype = c_int
+
+AnalyseAllPlaysPBN = dds.AnalyseAllPlaysPBN
+"""pointer to struct boardsPBN * bopPBN
+pointer to struct playTracesPBN * plpPBN
+pointer to struct solvedPlays * solvedp
+int chunkSize"""
+AnalyseAllPlaysPBN.argtypes = [POINTER(boardsPBN), POINTER(playTracesPBN), POINTER(solvedPlays), c_int]
+AnalyseAllPlaysPBN.restype = c_int
+
+ErrorMessage = dds.ErrorMessage
+"""int code
+char * 80"""
+ErrorMessage.argtypes = [c_int, POINTER(c_char)]
+ErrorMessage.restype = c_int
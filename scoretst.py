@@ -1,16 +1,19 @@
 import sys
+import bboscore
+
 def getVulIndex(bdnum):
     return [0,2,3,1,2,3,1,0,3,1,0,2,1,0,2,3][(bdnum-1) % 16]
         
 # get raw score possible for a suit and level and double situation
 # given that dd computed we can take trix number of tricks
 def getRawScore(bdnum, suit, level, dblFlag, pair, trix):
+    return bboscore.rawScore(getVulIndex(bdnum), suit, level, dblFlag, pair, trix)
+
+# the procedural scoring the bboscore tables replaced, kept here to check them against
+def refRawScore(isVul, suit, level, dblFlag, trix):
     downDblNotVulList = (0, 100, 300, 500, 800, 1100, 1400, 1700, 2000, 2300, 2600, 2900, 3200, 3500)
     downDblVulList    = (0, 200, 500, 800, 1100, 1400, 1700, 2000, 2300, 2600, 2900, 3200, 3500, 3800)
 
-    vulIndex = getVulIndex(bdnum)   # self.getVulIndex()
-    isVul = vulIndex == 1 or (pair == 'NS' and vulIndex == 2) or (pair == 'EW' and vulIndex == 3)
-    # print(suit, level+6, trix, file=sys.stderr)
     if trix < level+6:
         # going down
         down = (level+6) - trix
@@ -28,7 +31,7 @@ def getRawScore(bdnum, suit, level, dblFlag, pair, trix):
         overtrix = (trix-6) - level
         ptsPerTrick = 20 if suit in 'DC' else 30
         trickOneBonus = 10 if suit == 'N' else 0
-        bidTrickVal = trickOneBonus + level * ptsPerTrick * (2 ** dblFlag)
+        bidTrickVal = (trickOneBonus + level * ptsPerTrick) * (2 ** dblFlag)
         if dblFlag == 0:
             overTrickVal = overtrix * ptsPerTrick
         else:
@@ -52,3 +55,23 @@ for bdnum in range(1,5):
                             continue
                         rawscore = getRawScore(bdnum, suit, level, dblFlag, pair, trix)
                         print(bdnum, suit, level, dblFlag, pair, trix, '------>', rawscore)
+
+# check every entry of the table (and the numpy array if there is one) against the reference
+numChecked = 0
+numBad = 0
+for vul in range(2):
+    for (strain, suit) in enumerate(bboscore.strains):
+        for level in range(1,8):
+            for dblFlag in range(0,3):
+                for trix in range(0,14):
+                    expected = refRawScore(vul == 1, suit, level, dblFlag, trix)
+                    got = [bboscore.scoreTable[vul][strain][level][dblFlag][trix]]
+                    if bboscore.scoreArray is not None:
+                        got.append(int(bboscore.rawScores(vul, strain, level, dblFlag, trix)))
+                    numChecked += 1
+                    if any(score != expected for score in got):
+                        numBad += 1
+                        print(f'mismatch vul={vul} {level}{suit} dbl={dblFlag} trix={trix}, expected {expected}, got {got}')
+print(f'{numChecked} scores checked against the reference, {numBad} mismatches')
+if numBad > 0:
+    sys.exit(1)
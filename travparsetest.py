@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from bbobase import TravParserHtml
+
+# checks that the streaming html extractor returns exactly the same rows
+# as the BeautifulSoup backend for every html traveller in the given directories
+# (by default the small tournament in testdata/html)
+# and reports how long each backend took and its peak memory per file
+
+parser = argparse.ArgumentParser('traveller parser equivalence tester')
+defaultDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testdata', 'html')
+parser.add_argument('--dir', nargs='+', default=[defaultDir], help='directories containing html traveller files')
+parser.add_argument('--reps', type=int, default=1, help='times to parse each file when timing')
+args = parser.parse_args()
+
+backends = ['bs4', 'stream']
+totalSecs = {backend: 0.0 for backend in backends}
+maxPeak = {backend: 0 for backend in backends}
+numFiles = 0
+numMismatches = 0
+
+def parseBoard(dir, backend, bdnum):
+    parserArgs = argparse.Namespace(dir=dir, debug=False, htmlParser=backend)
+    return TravParserHtml(parserArgs).parseOneFile(bdnum)
+
+for dir in args.dir:
+    numBoards = TravParserHtml(argparse.Namespace(dir=dir)).getNumBoards()
+    for bdnum in range(1, numBoards + 1):
+        results = {}
+        for backend in backends:
+            startTime = time.perf_counter()
+            for n in range(args.reps):
+                results[backend] = parseBoard(dir, backend, bdnum)
+            totalSecs[backend] += time.perf_counter() - startTime
+            tracemalloc.start()
+            parseBoard(dir, backend, bdnum)
+            maxPeak[backend] = max(maxPeak[backend], tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        numFiles += 1
+        if results['bs4'] != results['stream']:
+            numMismatches += 1
+            print(f'mismatch on {dir} board {bdnum}')
+            for (bs4Row, streamRow) in zip(results['bs4'], results['stream']):
+                if bs4Row != streamRow:
+                    print(f'   bs4:    {bs4Row}')
+                    print(f'   stream: {streamRow}')
+                    break
+
+print(f'{numFiles} files, {numMismatches} mismatches')
+for backend in backends:
+    print(f'{backend:<7} {totalSecs[backend]:8.3f} secs, max peak memory per file {maxPeak[backend] // 1024} KB')
+if numMismatches > 0:
+    sys.exit(1)